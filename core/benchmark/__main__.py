@@ -0,0 +1,3 @@
+from core.benchmark.solvers import main
+
+main()
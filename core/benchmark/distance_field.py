@@ -0,0 +1,89 @@
+"""
+Check the numpy distance field against the existing bfs on random mazes, and compare their running time.
+
+For every maze the distance field must agree with a tile by tile bfs over the whole grid, and with the shortest path
+found by BFS.search_shortest_path. Cleared mazes are included, since they are where the frontier is widest.
+
+Usage: python -m core.benchmark.distance_field [--width 300] [--height 200] [--mazes 5]
+"""
+import argparse
+import sys
+import time
+from array import array
+from collections import deque
+
+from core.benchmark.mazes import generated_maze, cleared_maze
+from core.maze.distance_field import distance_field
+from core.maze.solver import solve
+from core.maze.topology import get_topology
+
+
+def bfs_distances(grid, source):
+    """
+    Reference implementation, compute the distance of every tile from the source one tile at a time.
+
+    :param grid: Grid instance
+    :param source: index of the source tile
+    :return: array of distances, -1 for walls and unreachable tiles
+    """
+    topology = get_topology(grid.box_width, grid.box_height)
+    masks, offsets, maze = topology.masks, topology.offsets, grid.colors
+
+    distances = array('l', [-1]) * grid.size
+    distances[source] = 0
+    queue = deque([source])
+
+    while queue:
+        current = queue.popleft()
+        for o in offsets[masks[current]]:
+            n = current + o
+            if maze[n] != 1 and distances[n] < 0:
+                distances[n] = distances[current] + 1
+                queue.append(n)
+
+    return distances
+
+
+def check(grid):
+    """
+    Compare the distance field of a grid with the bfs.
+
+    :param grid: Grid instance
+    :return: tuple on the form (ok, field_time, bfs_time)
+    """
+    start_time = time.perf_counter()
+    field = distance_field(grid)
+    field_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    expected = bfs_distances(grid, grid.start_idx)
+    bfs_time = time.perf_counter() - start_time
+
+    ok = field.tolist() == expected.tolist()
+
+    # every tile on the shortest path must be exactly as far from the start as its position on the path
+    result = solve(grid, 'bfs')
+    ok = ok and all(field[tile] == i for i, tile in enumerate(result.path))
+    ok = ok and (field[grid.end_idx] == result.path_length if result.path else field[grid.end_idx] == -1)
+
+    return ok, field_time, bfs_time
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check the numpy distance field against the bfs.")
+    parser.add_argument("--width", type=int, default=300, help="number of columns of the mazes")
+    parser.add_argument("--height", type=int, default=200, help="number of rows of the mazes")
+    parser.add_argument("--mazes", type=int, default=5, help="number of random mazes to check")
+    args = parser.parse_args()
+
+    grids = [('cleared', cleared_maze(args.width, args.height))]
+    grids += [(f"seed {seed}", generated_maze(args.width, args.height, seed)) for seed in range(args.mazes)]
+
+    failed = False
+    print(f"{'maze':<10}{'result':<8}{'distance field (s)':>20}{'bfs (s)':>10}")
+    for name, grid in grids:
+        ok, field_time, bfs_time = check(grid)
+        failed = failed or not ok
+        print(f"{name:<10}{'ok' if ok else 'FAILED':<8}{field_time:>20.4f}{bfs_time:>10.4f}")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,103 @@
+"""
+Microbenchmark of the search frontiers. Every solver is run with every frontier type on the same set of generated
+mazes, and the throughput (expanded tiles per second) is reported relative to the thread-synchronised queue.Queue /
+queue.PriorityQueue baseline the solvers used to be built on.
+
+Usage: python -m core.benchmark.frontier [--width 200] [--height 120] [--mazes 3] [--repeat 3]
+"""
+import argparse
+from queue import Queue, PriorityQueue
+
+from core.benchmark.mazes import generated_maze
+from core.maze.frontier import FifoFrontier, HeapFrontier, BucketFrontier
+from core.maze.solver import solve
+
+
+class QueueFrontier:
+    def __init__(self):
+        """
+        Baseline frontier wrapping the thread-synchronised queue.Queue.
+        """
+        self._queue = Queue()
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def push(self, item, priority=0):
+        self._queue.put(item)
+
+    def pop(self):
+        return self._queue.get()
+
+
+class PriorityQueueFrontier:
+    def __init__(self):
+        """
+        Baseline frontier wrapping the thread-synchronised queue.PriorityQueue.
+        """
+        self._queue = PriorityQueue()
+        self._count = 0
+
+    def __len__(self):
+        return self._queue.qsize()
+
+    def push(self, item, priority=0):
+        self._count += 1
+        self._queue.put((priority, self._count, item))
+
+    def pop(self):
+        return self._queue.get()[2]
+
+
+# algorithm -> list of (frontier name, frontier class), the first frontier is the baseline
+FRONTIERS = {
+    'bfs': [('queue.Queue', QueueFrontier), ('fifo', FifoFrontier), ('heap', HeapFrontier),
+            ('bucket', BucketFrontier)],
+    'bi_bfs': [('queue.Queue', QueueFrontier), ('fifo', FifoFrontier), ('heap', HeapFrontier),
+               ('bucket', BucketFrontier)],
+    'a_star': [('queue.PriorityQueue', PriorityQueueFrontier), ('heap', HeapFrontier), ('bucket', BucketFrontier)],
+}
+
+
+def run(box_width, box_height, mazes, repeat):
+    """
+    Run the benchmark and print a table of the results.
+
+    :param box_width: number of columns of the generated mazes
+    :param box_height: number of rows of the generated mazes
+    :param mazes: number of mazes to generate
+    :param repeat: number of times every solve is repeated, the fastest run is used
+    :return: dictionary on the form {algorithm: {frontier name: expanded tiles per second}}
+    """
+    grids = [generated_maze(box_width, box_height, seed) for seed in range(mazes)]
+    results = {}
+
+    print(f"{box_width}x{box_height} tiles, {mazes} mazes, best of {repeat}")
+    print(f"{'algorithm':<10}{'frontier':<22}{'expanded/s':>14}{'speedup':>10}")
+
+    for algorithm, frontiers in FRONTIERS.items():
+        results[algorithm] = {}
+        for name, frontier in frontiers:
+            expanded, elapsed = 0, 0.0
+            for grid in grids:
+                runs = [solve(grid, algorithm, frontier=frontier) for _ in range(repeat)]
+                expanded += runs[0].expanded
+                elapsed += min(r.elapsed for r in runs)
+
+            results[algorithm][name] = expanded / elapsed
+            baseline = results[algorithm][frontiers[0][0]]
+            print(f"{algorithm:<10}{name:<22}{results[algorithm][name]:>14,.0f}"
+                  f"{results[algorithm][name] / baseline:>9.2f}x")
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the throughput of the search frontiers.")
+    parser.add_argument("--width", type=int, default=200, help="number of columns of the mazes")
+    parser.add_argument("--height", type=int, default=120, help="number of rows of the mazes")
+    parser.add_argument("--mazes", type=int, default=3, help="number of mazes to generate")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs per solve, the fastest is used")
+    args = parser.parse_args()
+
+    run(args.width, args.height, args.mazes, args.repeat)
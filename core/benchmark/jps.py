@@ -0,0 +1,62 @@
+"""
+Compare Jump Point Search with A* on cleared, hand-drawn and generated mazes. For every kind of maze the number of
+expanded tiles and the wall clock time of both algorithms is reported, and both must find paths of equal length.
+
+JPS first finds the horizontal jump points of every tile, a cost proportional to the size of the maze that A* does not
+pay. Where A* walks almost straight to the end, as on the cleared maze, JPS is slower, and on generated mazes, where
+nearly every turn of a corridor is a jump point, both take about the same time. Kinds of mazes where JPS is slower are
+marked in the output.
+
+Usage: python -m core.benchmark.jps [--width 300] [--height 200] [--mazes 3]
+"""
+import argparse
+import sys
+
+from core.benchmark.mazes import cleared_maze, sketched_maze, generated_maze
+from core.maze.solver import solve
+
+
+def run(box_width, box_height, mazes):
+    """
+    Run the benchmark and print a table of the results.
+
+    :param box_width: number of columns of the mazes
+    :param box_height: number of rows of the mazes
+    :param mazes: number of hand-drawn and generated mazes
+    :return: True if both algorithms found paths of equal length on every maze, False otherwise
+    """
+    kinds = [('cleared', [cleared_maze(box_width, box_height)]),
+             ('hand-drawn', [sketched_maze(box_width, box_height, seed) for seed in range(mazes)]),
+             ('generated', [generated_maze(box_width, box_height, seed) for seed in range(mazes)])]
+
+    ok = True
+    print(f"{box_width}x{box_height} tiles")
+    print(f"{'maze':<12}{'algorithm':<10}{'expanded':>12}{'time (s)':>12}")
+
+    for kind, grids in kinds:
+        totals = {}
+        for grid in grids:
+            results = [solve(grid, algorithm) for algorithm in ('a_star', 'jps')]
+            ok = ok and results[0].path_length == results[1].path_length
+            for result in results:
+                expanded, elapsed = totals.get(result.algorithm, (0, 0.0))
+                totals[result.algorithm] = (expanded + result.expanded, elapsed + result.elapsed)
+
+        for algorithm, (expanded, elapsed) in totals.items():
+            print(f"{kind:<12}{algorithm:<10}{expanded / len(grids):>12,.0f}{elapsed / len(grids):>12.4f}")
+        if totals['jps'][1] > totals['a_star'][1]:
+            print(f"{'':<12}jps is slower, it takes {totals['jps'][1] / totals['a_star'][1]:.2f}x the time of a_star")
+
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare Jump Point Search with A*.")
+    parser.add_argument("--width", type=int, default=300, help="number of columns of the mazes")
+    parser.add_argument("--height", type=int, default=200, help="number of rows of the mazes")
+    parser.add_argument("--mazes", type=int, default=3, help="number of hand-drawn and generated mazes")
+    args = parser.parse_args()
+
+    if not run(args.width, args.height, args.mazes):
+        print("path lengths differ between A* and JPS")
+        sys.exit(1)
@@ -0,0 +1,59 @@
+"""
+Benchmark of the on-disk maze format: stream a large maze generated with Eller's algorithm to a maze file one row at a
+time, open it again, and solve it. With the COLORS encoding the solvers read the maze straight from the memory mapped
+file, so only the search state has to fit in memory.
+
+Usage: python -m core.benchmark.maze_file [--width 4001] [--height 2001] [--seed 0] [--bitmap] [--algorithm bfs]
+                                          [--path maze.avm]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from core.maze.generators import eller_rows
+from core.maze.maze_file import BITMAP, COLORS, MazeHeader, open_maze, write_maze_rows
+from core.maze.solver import ALGORITHMS, solve
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream a large maze to a maze file, then open and solve it.")
+    parser.add_argument("--width", type=int, default=4001, help="number of columns in the maze")
+    parser.add_argument("--height", type=int, default=2001, help="number of rows in the maze")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the maze generation")
+    parser.add_argument("--bitmap", action='store_true', help="store one bit per tile instead of one byte")
+    parser.add_argument("--algorithm", choices=list(ALGORITHMS), default='bfs', help="algorithm to solve the maze with")
+    parser.add_argument("--path", default="maze.avm", help="path of the maze file")
+    args = parser.parse_args()
+
+    # the start and end tiles are placed like in the gui, at both ends of the middle row
+    start_idx = args.height // 2 * args.width
+    header = MazeHeader(args.width, args.height, start_idx, start_idx + args.width - 1, args.seed,
+                        BITMAP if args.bitmap else COLORS)
+
+    start_time = time.perf_counter()
+    write_maze_rows(args.path, header, eller_rows(args.width, args.height, np.random.default_rng(args.seed)))
+    write_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    grid, _ = open_maze(args.path)
+    open_time = time.perf_counter() - start_time
+
+    result = solve(grid, args.algorithm)
+
+    print(f"maze:  {args.width}x{args.height} tiles, {os.path.getsize(args.path):,} bytes on disk")
+    print(f"write: {write_time * 1000:.1f} ms")
+    print(f"open:  {open_time * 1000:.1f} ms")
+    print(f"solve: {result.elapsed * 1000:.1f} ms with {args.algorithm}, path length {result.path_length}, "
+          f"{result.expanded:,} tiles expanded")
+
+    # write_maze_rows connects the endpoints to the maze, so a path must exist
+    if result.path_length < 0:
+        print("the start and end tiles are not connected")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
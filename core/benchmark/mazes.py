@@ -0,0 +1,55 @@
+import random
+
+from core.maze.maze_builder import MazeBuilder
+
+
+def generated_maze(box_width, box_height, seed, algorithm='dfs'):
+    """
+    Generate a random maze with the MazeBuilder, without animating it.
+
+    :param box_width: number of columns in the maze
+    :param box_height: number of rows in the maze
+    :param seed: seed of the random generator, equal seeds give equal mazes
+    :param algorithm: name of the maze generation algorithm, see core.maze.maze_builder.GENERATORS
+    :return: Grid instance
+    """
+    return MazeBuilder(box_width, box_height, seed).build(algorithm)
+
+
+def cleared_maze(box_width, box_height):
+    """
+    Create a maze without any walls, as if the user pressed 'c'.
+
+    :param box_width: number of columns in the maze
+    :param box_height: number of rows in the maze
+    :return: Grid instance
+    """
+    return MazeBuilder(box_width, box_height).get_maze()
+
+
+def sketched_maze(box_width, box_height, seed, lines=12):
+    """
+    Create a mostly open maze with a few straight walls, as if the user cleared the maze and drew some lines.
+
+    :param box_width: number of columns in the maze
+    :param box_height: number of rows in the maze
+    :param seed: seed of the random generator, equal seeds give equal mazes
+    :param lines: number of wall lines to draw
+    :return: Grid instance
+    """
+    rng = random.Random(seed)
+    grid = cleared_maze(box_width, box_height)
+
+    for _ in range(lines):
+        x, y = rng.randrange(box_width), rng.randrange(box_height)
+        if rng.random() < 0.5:
+            tiles = range(y * box_width + x, y * box_width + min(x + rng.randint(1, box_width // 2), box_width))
+        else:
+            tiles = range(y * box_width + x, min(y + rng.randint(1, box_height // 2), box_height) * box_width,
+                          box_width)
+
+        for i in tiles:
+            if i not in (grid.start_idx, grid.end_idx):
+                grid.colors[i] = 1
+
+    return grid
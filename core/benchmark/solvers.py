@@ -0,0 +1,165 @@
+"""
+Batch benchmark of every solver in core.maze.solver.ALGORITHMS, run headlessly on random mazes of several sizes, built
+by every maze generator in core.maze.maze_builder.GENERATORS. The mazes are spread over a process pool, and for every
+maze the time to build it is recorded, and for every algorithm the number of expanded tiles, the wall clock and cpu
+time, the peak memory allocated by the search and the path length. The results can be written to CSV and/or JSON, to
+serve as a baseline for later changes.
+
+Usage: python -m core.benchmark [--sizes 50x30 100x60 200x120] [--mazes 10] [--algorithms bfs a_star ...]
+                                [--generators dfs eller ...] [--workers N] [--csv results.csv] [--json results.json]
+"""
+import argparse
+import csv
+import json
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from core.benchmark.mazes import generated_maze
+from core.maze.maze_builder import GENERATORS
+from core.maze.solver import ALGORITHMS, solve
+
+FIELDS = ['box_width', 'box_height', 'generator', 'seed', 'build_time', 'algorithm', 'path_length', 'expanded',
+          'elapsed', 'cpu_time', 'peak_memory']
+
+
+def parse_size(size):
+    """
+    Parse a maze size given on the command line.
+
+    :param size: string on the form WIDTHxHEIGHT, e.g. 100x60
+    :return: tuple on the form (box_width, box_height)
+    """
+    try:
+        box_width, box_height = (int(n) for n in size.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size '{size}', expected WIDTHxHEIGHT")
+    if box_width < 3 or box_height < 3:
+        raise argparse.ArgumentTypeError(f"invalid size '{size}', the maze must be at least 3x3")
+    return box_width, box_height
+
+
+def benchmark_maze(box_width, box_height, generator, seed, algorithms):
+    """
+    Generate a maze and run every algorithm on it. Executed in the worker processes.
+
+    :param box_width: number of columns in the maze
+    :param box_height: number of rows in the maze
+    :param generator: name of the maze generation algorithm, see GENERATORS
+    :param seed: seed of the maze generation
+    :param algorithms: list of algorithm names, see ALGORITHMS
+    :return: list of result rows, dictionaries with the keys in FIELDS
+    """
+    start_time = time.perf_counter()
+    grid = generated_maze(box_width, box_height, seed, generator)
+    build_time = time.perf_counter() - start_time
+    rows = []
+
+    for algorithm in algorithms:
+        # tracemalloc slows down every allocation, so the time is measured in a separate untraced run
+        result = solve(grid, algorithm)
+
+        tracemalloc.start()
+        solve(grid, algorithm)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        rows.append({'box_width': box_width, 'box_height': box_height, 'generator': generator, 'seed': seed,
+                     'build_time': build_time, 'algorithm': algorithm, 'path_length': result.path_length,
+                     'expanded': result.expanded, 'elapsed': result.elapsed, 'cpu_time': result.cpu_time,
+                     'peak_memory': peak_memory})
+
+    return rows
+
+
+def run(sizes, mazes, algorithms, generators=('dfs',), workers=None):
+    """
+    Benchmark the algorithms on a number of mazes of every size.
+
+    :param sizes: list of tuples on the form (box_width, box_height)
+    :param mazes: number of mazes per size and generator, seeded 0 to mazes - 1
+    :param algorithms: list of algorithm names, see ALGORITHMS
+    :param generators: list of maze generation algorithms, see GENERATORS
+    :param workers: number of worker processes, defaults to the number of cpus
+    :return: list of result rows, dictionaries with the keys in FIELDS
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(benchmark_maze, box_width, box_height, generator, seed, algorithms)
+                   for box_width, box_height in sizes for generator in generators for seed in range(mazes)]
+        return [row for future in futures for row in future.result()]
+
+
+def summarize(rows):
+    """
+    Print the mean of every measurement per maze size, generator and algorithm.
+
+    :param rows: list of result rows
+    :return: None
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['box_width'], row['box_height'], row['generator'], row['algorithm']), []).append(row)
+
+    print(f"{'size':<12}{'generator':<10}{'build (ms)':>12}  {'algorithm':<10}{'path':>8}{'expanded':>12}"
+          f"{'time (ms)':>12}{'cpu (ms)':>12}{'peak (KiB)':>12}")
+    for (box_width, box_height, generator, algorithm), group in groups.items():
+        def mean(field):
+            return sum(row[field] for row in group) / len(group)
+
+        print(f"{f'{box_width}x{box_height}':<12}{generator:<10}{mean('build_time') * 1000:>12.2f}  {algorithm:<10}"
+              f"{mean('path_length'):>8.1f}{mean('expanded'):>12,.0f}{mean('elapsed') * 1000:>12.2f}"
+              f"{mean('cpu_time') * 1000:>12.2f}{mean('peak_memory') / 1024:>12,.1f}")
+
+
+def write_csv(rows, path):
+    """
+    Write the result rows to a CSV file.
+
+    :param rows: list of result rows
+    :param path: path of the file
+    :return: None
+    """
+    with open(path, 'w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_json(rows, path):
+    """
+    Write the result rows to a JSON file.
+
+    :param rows: list of result rows
+    :param path: path of the file
+    :return: None
+    """
+    with open(path, 'w') as file:
+        json.dump(rows, file, indent=2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the solvers on random mazes of several sizes.")
+    parser.add_argument("--sizes", type=parse_size, nargs='+', default=[(50, 30), (100, 60), (200, 120)],
+                        help="maze sizes on the form WIDTHxHEIGHT")
+    parser.add_argument("--mazes", type=int, default=10, help="number of random mazes per size")
+    parser.add_argument("--algorithms", nargs='+', choices=list(ALGORITHMS), default=list(ALGORITHMS),
+                        help="algorithms to benchmark, defaults to all of them")
+    parser.add_argument("--generators", nargs='+', choices=GENERATORS, default=['dfs'],
+                        help="maze generation algorithms, defaults to dfs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--csv", help="write the results to this CSV file")
+    parser.add_argument("--json", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    rows = run(args.sizes, args.mazes, args.algorithms, args.generators, args.workers)
+    summarize(rows)
+
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.json:
+        write_json(rows, args.json)
+
+
+if __name__ == '__main__':
+    main()
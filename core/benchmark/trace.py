@@ -0,0 +1,105 @@
+"""
+Benchmark of trace recording and replay: generate a maze and solve it with every search algorithm while recording the
+events, then replay the traces to the end and seek to random positions in them, without running the algorithms again.
+
+Usage: python -m core.benchmark.trace [--width 1001] [--height 601] [--seed 0] [--generator dfs] [--seeks 100]
+                                      [--save DIR]
+"""
+import argparse
+import os
+import random
+import time
+
+from core.maze.a_star import AStar
+from core.maze.bfs import BFS
+from core.maze.jps import JumpPointSearch
+from core.maze.maze_builder import MazeBuilder, GENERATORS
+from core.maze.trace import MAZE, SEARCH, TraceRecorder
+
+
+def run(events):
+    """
+    Run an algorithm to completion.
+
+    :param events: generator of the algorithm
+    :return: number of seconds it took
+    """
+    start_time = time.perf_counter()
+    for _ in events:
+        pass
+    return time.perf_counter() - start_time
+
+
+def measure_replay(trace, seeks, rng):
+    """
+    Replay a trace to the end, then seek to random positions.
+
+    :param trace: Trace instance
+    :param seeks: number of random seeks
+    :param rng: random.Random instance choosing the positions
+    :return: tuple on the form (replay seconds, mean seconds per seek)
+    """
+    trace.bind()
+    start_time = time.perf_counter()
+    trace.seek(len(trace))
+    replay_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for _ in range(seeks):
+        trace.seek(rng.randrange(len(trace) + 1))
+    return replay_time, (time.perf_counter() - start_time) / max(seeks, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record traces of the maze algorithms, then replay and seek in them.")
+    parser.add_argument("--width", type=int, default=1001, help="number of columns in the maze")
+    parser.add_argument("--height", type=int, default=601, help="number of rows in the maze")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the maze generation")
+    parser.add_argument("--generator", choices=GENERATORS, default='dfs', help="maze generation algorithm")
+    parser.add_argument("--seeks", type=int, default=100, help="number of random seeks per trace")
+    parser.add_argument("--save", help="directory to write the traces to, named after their algorithm")
+    args = parser.parse_args()
+
+    maze_builder = MazeBuilder(args.width, args.height, args.seed)
+    bfs = BFS(*maze_builder.export_maze())
+    a_star = AStar(*maze_builder.export_maze())
+    jps = JumpPointSearch(*maze_builder.export_maze())
+    searches = {'bfs': bfs.bfs_shortest_path, 'bi_bfs': bfs.bidirectional_bfs, 'a_star': a_star.a_star,
+                'jps': jps.jump_point_search}
+
+    # the same maze is generated twice, with and without recording, by builders with the same seed. The generators
+    # only yield the carved tiles, the maze is built a third time to be searched.
+    plain_time = run(MazeBuilder(args.width, args.height, args.seed).generate(args.generator))
+    recorder = TraceRecorder(maze_builder.get_maze(), args.generator, MAZE, args.seed)
+    traces = [(recorder, plain_time, run(recorder.record(maze_builder.generate(args.generator))))]
+    grid = MazeBuilder(args.width, args.height, args.seed).build(args.generator)
+
+    for name, search in searches.items():
+        grid.replace((2, 3, 4, 5, 6), 0)
+        plain_time = run(search(grid))
+
+        grid.replace((2, 3, 4, 5, 6), 0)
+        recorder = TraceRecorder(grid, name, SEARCH, args.seed)
+        traces.append((recorder, plain_time, run(recorder.record(search(grid)))))
+
+    print(f"maze: {args.width}x{args.height} tiles, {args.generator}, seed {args.seed}")
+    print(f"{'algorithm':<10}{'events':>12}{'bytes':>13}{'B/event':>9}{'run ms':>10}{'record ms':>11}"
+          f"{'replay ms':>11}{'seek ms':>9}")
+
+    rng = random.Random(args.seed)
+    for recorder, plain_time, record_time in traces:
+        trace = recorder.get_trace()
+        header = trace.header
+        if args.save:
+            os.makedirs(args.save, exist_ok=True)
+            trace.save(os.path.join(args.save, f"{header.algorithm}.avt"))
+
+        size = trace.get_size()
+        replay_time, seek_time = measure_replay(trace, args.seeks, rng)
+        print(f"{header.algorithm:<10}{len(trace):>12,}{size:>13,}{size / max(len(trace), 1):>9.2f}"
+              f"{plain_time * 1000:>10.1f}{record_time * 1000:>11.1f}{replay_time * 1000:>11.1f}"
+              f"{seek_time * 1000:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
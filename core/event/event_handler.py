@@ -1,13 +1,29 @@
+import threading
+import time
+
+import numpy as np
+
+from core.event.ring_buffer import RingBuffer
+from core.maze.solve_cache import solve_key
+from core.maze.trace import MAZE, SEARCH, TraceFileError, TraceRecorder, open_trace
+from core.timing.profiler import profiler
+
+# maximum number of steps to process between checks of the time budget
+CHUNK_SIZE = 64
+
+
 class EventHandler:
-    def __init__(self, maze, maze_handler, maze_builder, bfs, a_star, indexes, text_table, screen):
+    def __init__(self, maze, maze_handler, maze_builder, bfs, a_star, jps, lpa_star, indexes, text_table, screen):
         """
         Initialize a new EventHandler instance.
 
-        :param maze: _maze list
+        :param maze: Grid instance shared with the maze_handler and the algorithms
         :param maze_handler: MazeHandler instance
         :param maze_builder: MazeBuilder instance
         :param bfs: BFS instance
         :param a_star: AStar instance
+        :param jps: JumpPointSearch instance
+        :param lpa_star: LPAStar instance, used for the live path
         :param indexes: dictionary of algorithms and their respective text_table indexes
         :param text_table: TextTable instance
         :param screen pygame screen instance
@@ -17,6 +33,8 @@ class EventHandler:
         self._maze_builder = maze_builder
         self._bfs = bfs
         self._a_star = a_star
+        self._jps = jps
+        self._lpa_star = lpa_star
 
         self.__indexes = indexes
         self.__text_table = text_table
@@ -24,8 +42,18 @@ class EventHandler:
 
         self.__current_table_index = 0
         self.__active = False
-        self._event_queue = lambda: None
-        self._generator = None
+        self._event_queue = lambda steps: 0
+        # events produced by the worker thread running the generator of the active event
+        self.__events = None
+
+        # tiles of the live path currently drawn to the maze, None if the live path is turned off
+        self.__live_path = None
+
+        # recorder of the events of the active event, and the trace of the last finished or replayed event
+        self.__recorder = None
+        self.__trace = None
+        # key of the active search in the solve cache of the maze_handler, the trace is cached when it finishes
+        self.__cache_key = None
 
     def is_active(self):
         """
@@ -43,107 +71,186 @@ class EventHandler:
         :return: None
         """
         self.__active = False
-        self._generator = None
-        self._event_queue = lambda: None
+        self.__events = None
+        self._event_queue = lambda steps: 0
         self._maze_handler.unlock()
 
-    def next(self):
-        """
-        Calls the next generator call from the current active event.
+        if self.__recorder is not None:
+            self.__trace = self.__recorder.get_trace()
+            self.__recorder = None
 
-        :return: None
+            if self.__cache_key is not None:
+                # the tiles the search left colored, e.g. its path, are cached along with a copy of the trace without
+                # the keyframes, which is only replayed if the cached search is scrubbed. Neither grows once cached.
+                tiles = np.flatnonzero(self._maze.get_view() > 1)
+                colors = self._maze.get_view()[tiles]
+                self._maze_handler.solve_cache.put(self.__cache_key, (self.__trace.copy(), tiles, colors),
+                                                   self.__trace.get_size() + tiles.nbytes + colors.nbytes)
+                self.__cache_key = None
+
+    def next(self, steps=1, budget=None):
         """
-        self._event_queue()
+        Advance the current active event by a number of steps. The steps are taken from the events produced by the
+        worker thread in chunks, the grid is updated in bulk, and each touched tile and the text table are only redrawn
+        once per chunk. Returns early if the worker has not produced enough events yet.
+
+        :param steps: number of steps (tiles) to advance
+        :param budget: maximum number of seconds to spend, None for no limit. Steps that do not fit in the budget are
+        dropped, so speeds higher than the machine can keep up with run as fast as possible instead of lagging behind.
+        :return: number of steps performed
+        """
+        deadline = time.perf_counter() + budget if budget is not None else None
+        performed = 0
+
+        while performed < steps and self.__active:
+            chunk = min(steps - performed, CHUNK_SIZE)
+            taken = self._event_queue(chunk)
+            performed += taken
 
-    def __next_new_maze_event(self):
+            if taken < chunk or deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        return performed
+
+    def __next_new_maze_event(self, steps):
         """
-        This is the generator function for the new_maze_event. Update the next tile to color from the
-        maze generation.
+        This is the step function for the new_maze_event. Update the next tiles to color from the maze generation.
 
-        :return: None
+        :param steps: number of tiles to take from the generator
+        :return: number of tiles taken
         """
-        # get the next tile to color, and number of increments
-        next_tile, increments = next(self._generator, (-1, 0))
-        if next_tile >= 0:
-            # increment the value of the text_table
-            self.__text_table.increment_value(self.__current_table_index, increments)
-            self.__text_table.draw_table_element(self.__screen, self.__current_table_index)
+        # get the next tiles to color, along with their number of increments
+        events = self.__events.pop_many(steps)
 
-            # update the maze
-            self._maze[next_tile][2] = 0
-            self._maze_handler.draw_box_by_idx(next_tile)
-        else:
-            # reset event handler
+        colors = self._maze.colors
+        increments = 0
+        for next_tile, tile_increments in events:
+            colors[next_tile] = 0
+            increments += tile_increments
+
+        self.__draw_step(events, increments)
+
+        if self.__events.is_exhausted():
+            # the generator is exhausted, reset event handler
             self._maze_handler.remove_grey_tiles()
             self.__reset()
 
-    def __next_bfs_or_a_star_event(self):
+        return len(events)
+
+    def __next_trace_event(self, steps):
         """
-        This is the generator function for the new_bfs_event or new_a_star_event. Update the next tile to color from
-        the bfs.
+        This is the step function for the events showing the trace of a search algorithm (bfs, bidirectional bfs, A*
+        and jump point search). Update the next tiles to color from the search.
 
-        :return: None
+        :param steps: number of tiles to take from the generator
+        :return: number of tiles taken
         """
-        # get the next tile to color
-        next_tile = next(self._generator, [-1])
+        # get the next tiles to color
+        events = self.__events.pop_many(steps)
 
-        if next_tile[0] >= 0:
-            # 5 iterations per step to give similar speed to baseline random maze generation
-            for i in range(5):
-                # increment the value of the text_table
-                self.__text_table.increment_value(self.__current_table_index)
-                self.__text_table.draw_table_element(self.__screen, self.__current_table_index)
+        colors = self._maze.colors
+        for next_tile, color in events:
+            colors[next_tile] = color
 
-                # update the maze
-                self._maze[next_tile[0]][2] = next_tile[1]
-                self._maze_handler.draw_box_by_idx(next_tile[0])
-        else:
-            # reset event handler
+        # 5 increments per step to give similar speed to baseline random maze generation
+        self.__draw_step(events, 5 * len(events))
+
+        if self.__events.is_exhausted():
+            # the generator is exhausted, reset event handler
             self._maze_handler.remove_grey_tiles()
             self.__reset()
 
-    def __next_bi_bfs_event(self):
+        return len(events)
+
+    def __start_worker(self, generator, algorithm, kind=SEARCH):
         """
-        This is the generator function for the new_bfs_event. Update the next tile to color from the
-        bfs.
+        Start running the generator of a new event in a worker thread, so the work of the algorithm does not hold up
+        the application main loop. The worker only runs ahead of the drawing by the capacity of the ring buffer. The
+        events are recorded to a trace, which can be saved with save_trace once the event has finished. The recorder
+        copies the grid on the worker, when the first event is recorded.
+
+        Searches the maze has been solved with before are not run again, the trace of the earlier search is shown
+        right away instead.
 
+        :param generator: generator yielding tuples on the form (idx, value)
+        :param algorithm: name of the algorithm, stored in the trace
+        :param kind: SEARCH or MAZE, see core.maze.trace
         :return: None
         """
-        # get the next tile to color
-        next_tile = next(self._generator, [-1])
+        if kind == SEARCH:
+            self.__cache_key = solve_key(self._maze, algorithm)
+            cached = self._maze_handler.solve_cache.get(self.__cache_key)
+            if cached is not None:
+                self.__show_cached_trace(*cached)
+                return
+
+        self.__events = RingBuffer()
+        # searches run on mazes that may have been edited or loaded since they were generated, their walls are stored
+        # in the trace instead
+        seed = self._maze_builder.maze_seed if kind == MAZE else None
+        self.__recorder = TraceRecorder(self._maze, algorithm, kind, seed)
+        generator = self.__recorder.record(generator)
+        if profiler.enabled:
+            # measure the time the algorithm itself takes, without the time spent waiting for the main loop
+            generator = profiler.timed(generator, 'worker')
+        threading.Thread(target=run_worker, args=(generator, self.__events), daemon=True).start()
+
+    def __show_cached_trace(self, trace, tiles, colors):
+        """
+        Show the result of a cached search, instead of running the search again.
 
-        if next_tile[0] >= 0:
-            # 5 iterations per step to give similar speed to baseline random _maze generation
-            for i in range(5):
-                # increment the value in the text_table
-                self.__text_table.increment_value(self.__current_table_index)
-                self.__text_table.draw_table_element(self.__screen, self.__current_table_index)
+        :param trace: Trace instance of the earlier search, without keyframes
+        :param tiles: numpy array of the indexes of the tiles the earlier search left colored
+        :param colors: numpy array of the color codes of the tiles
+        :return: None
+        """
+        self.__cache_key = None
+        # a copy of its own, the keyframes and decoded blocks it collects when it is scrubbed are not kept in the cache
+        self.__trace = trace.copy()
 
-                # update maze
-                self._maze[next_tile[0]][2] = next_tile[1]
-                self._maze_handler.draw_box_by_idx(next_tile[0])
-        else:
-            # reset event_handler
-            self._maze_handler.remove_grey_tiles()
-            self.__reset()
+        # the maze is in the state the search started from, only the tiles it colored are set
+        self._maze.get_view()[tiles] = colors
+        self._maze_handler.draw_changed_tiles(tiles)
+        self.__text_table.increment_value(self.__current_table_index, self.__trace.get_increments(len(trace)))
+        self.__text_table.draw_table_element(self.__screen, self.__current_table_index)
+
+        self.__reset()
+
+    def __draw_step(self, events, increments):
+        """
+        Redraw the tiles touched by a step, and update the text table.
 
-    def new_maze_event(self):
+        :param events: list of tuples on the form (idx, ...) taken from the generator
+        :param increments: number to increment the value of the text table with
+        :return: None
+        """
+        if events:
+            # a tile may be touched more than once, e.g. discovered then processed, only its final color is drawn
+            self._maze_handler.draw_changed_tiles(dict.fromkeys(event[0] for event in events))
+
+            self.__text_table.increment_value(self.__current_table_index, increments)
+            self.__text_table.draw_table_element(self.__screen, self.__current_table_index)
+
+    def new_maze_event(self, algorithm='dfs'):
         """
         Create a new event for building a randomized maze.
 
+        :param algorithm: name of the maze generation algorithm, see core.maze.maze_builder.GENERATORS
         :return: None
         """
         if not self.__active:
+            self.__stop_live_path()
             self.__active = True
             self.__current_table_index = self.__indexes['random_maze']
             self.__text_table.reset_value(self.__current_table_index)
 
-            self._generator = self._maze_builder.generate_random_maze()
             self._event_queue = self.__next_new_maze_event
 
             self._maze_handler.reset_maze()
             self._maze_handler.lock()
-            self._maze = self._maze_handler.maze
+
+            # the worker carves a private grid, the shared one is only changed by applying its events to the walls
+            self.__start_worker(self._maze_builder.generate(algorithm), algorithm, MAZE)
 
     def new_bfs_event(self):
         """
@@ -152,17 +259,16 @@ class EventHandler:
         :return: None
         """
         if not self.__active:
+            self.__stop_live_path()
             self.__active = True
             self.__current_table_index = self.__indexes['bfs']
             self.__text_table.reset_value(self.__current_table_index)
 
             self._maze_handler.remove_all_colored_tiles()
-            self._maze = self._maze_handler.maze
-
-            self._generator = self._bfs.bfs_shortest_path(self._maze)
 
             self._maze_handler.lock()
-            self._event_queue = self.__next_bfs_or_a_star_event
+            self._event_queue = self.__next_trace_event
+            self.__start_worker(self._bfs.bfs_shortest_path(self._maze), 'bfs')
 
     def new_bidirectional_bfs_event(self):
         """
@@ -171,17 +277,16 @@ class EventHandler:
         :return: None
         """
         if not self.__active:
+            self.__stop_live_path()
             self.__active = True
             self.__current_table_index = self.__indexes['bi_bfs']
             self.__text_table.reset_value(self.__current_table_index)
 
             self._maze_handler.remove_all_colored_tiles()
-            self._maze = self._maze_handler.maze
-
-            self._generator = self._bfs.bidirectional_bfs(self._maze)
 
             self._maze_handler.lock()
-            self._event_queue = self.__next_bi_bfs_event
+            self._event_queue = self.__next_trace_event
+            self.__start_worker(self._bfs.bidirectional_bfs(self._maze), 'bi_bfs')
 
     def new_a_star_event(self):
         """
@@ -190,14 +295,271 @@ class EventHandler:
         :return: None
         """
         if not self.__active:
+            self.__stop_live_path()
             self.__active = True
             self.__current_table_index = self.__indexes['a_star']
             self.__text_table.reset_value(self.__current_table_index)
 
             self._maze_handler.remove_all_colored_tiles()
-            self._maze = self._maze_handler.maze
 
-            self._generator = self._a_star.a_star(self._maze)
+            self._maze_handler.lock()
+            self._event_queue = self.__next_trace_event
+            self.__start_worker(self._a_star.a_star(self._maze), 'a_star')
+
+    def new_jps_event(self):
+        """
+        Create a new event for finding the shortest path with jump point search.
+
+        :return: None
+        """
+        if not self.__active:
+            self.__stop_live_path()
+            self.__active = True
+            self.__current_table_index = self.__indexes['jps']
+            self.__text_table.reset_value(self.__current_table_index)
+
+            self._maze_handler.remove_all_colored_tiles()
 
             self._maze_handler.lock()
-            self._event_queue = self.__next_bfs_or_a_star_event
+            self._event_queue = self.__next_trace_event
+            self.__start_worker(self._jps.jump_point_search(self._maze), 'jps')
+
+    def save_trace(self, path):
+        """
+        Save the trace of the last finished or replayed event to a trace file.
+
+        :param path: path of the trace file
+        :return: None
+        """
+        if self.__active or self.__trace is None:
+            return
+
+        try:
+            self.__trace.save(path)
+        except OSError as e:
+            print(f"Could not save the trace to {path}: {e}")
+
+    def new_replay_event(self, path):
+        """
+        Create a new event replaying a trace saved with save_trace, without running the algorithm. The trace must have
+        been recorded on a maze of the same size as the current one. While the replay is active, it can be moved
+        backward and forward with scrub.
+
+        :param path: path of the trace file
+        :return: None
+        """
+        if self.__active:
+            return
+
+        try:
+            trace = open_trace(path)
+        except (OSError, TraceFileError) as e:
+            print(f"Could not load the trace from {path}: {e}")
+            return
+
+        header, maze = trace.header, self._maze
+        if (header.box_width, header.box_height) != (maze.box_width, maze.box_height):
+            print(f"Could not load the trace from {path}: the trace is {header.box_width}x{header.box_height} tiles, "
+                  f"expected {maze.box_width}x{maze.box_height}")
+            return
+        if (header.start_idx, header.end_idx) != (maze.start_idx, maze.end_idx):
+            print(f"Could not load the trace from {path}: the trace has its endpoints at tiles {header.start_idx} and "
+                  f"{header.end_idx}, expected {maze.start_idx} and {maze.end_idx}")
+            return
+        if header.kind != MAZE and header.algorithm not in self.__indexes:
+            print(f"Could not load the trace from {path}: unknown algorithm '{header.algorithm}'")
+            return
+
+        self.__start_replay(trace, 0)
+
+    def __start_replay(self, trace, position):
+        """
+        Start replaying a trace on the maze from a position.
+
+        :param trace: Trace instance recorded on a maze of the same size and with the same endpoints as the current one
+        :param position: number of events applied when the replay starts
+        :return: None
+        """
+        self.__stop_live_path()
+        self.__active = True
+        self.__trace = trace
+        header = trace.header
+        self.__current_table_index = self.__indexes['random_maze' if header.kind == MAZE else header.algorithm]
+
+        self._maze_handler.lock()
+        self._event_queue = self.__next_replay_event
+        # the maze is put back in the state it was in when the trace was recorded, then moved from the closest
+        # keyframe to the position
+        self.__move_replay(lambda: np.union1d(trace.bind(self._maze), trace.seek(position)))
+
+    def __next_replay_event(self, steps):
+        """
+        This is the step function for the replay event. Apply the next events of the trace.
+
+        :param steps: number of events to apply
+        :return: number of events applied
+        """
+        position = self.__trace.position
+        if not self.__move_replay(lambda: self.__trace.step(steps)):
+            return 0
+
+        if self.__trace.position == len(self.__trace):
+            self._maze_handler.remove_grey_tiles()
+            self.__reset()
+
+        return self.__trace.position - position
+
+    def scrub(self, fraction):
+        """
+        Move the active replay backward or forward. Without an active replay, the last finished event is replayed from
+        its end, reusing the keyframes taken while it was recorded.
+
+        :param fraction: fraction of the length of the trace to move, negative to move backward
+        :return: None
+        """
+        if not self.__active and self.__trace is not None:
+            self.__start_replay(self.__trace, len(self.__trace))
+
+        if self.__active and self._event_queue == self.__next_replay_event:
+            trace = self.__trace
+            self.__move_replay(lambda: trace.step(int(fraction * len(trace)) or (1 if fraction > 0 else -1)))
+
+    def seek(self, fraction):
+        """
+        Jump to a position of the active replay. The trace restores the closest keyframe and only applies the events
+        after it, so any position is reached in about the same time. Without an active replay, the last finished
+        event is replayed from the position.
+
+        :param fraction: position as a fraction of the length of the trace, 0 for the start and 1 for the end
+        :return: None
+        """
+        if not self.__active and self.__trace is not None:
+            self.__start_replay(self.__trace, int(fraction * len(self.__trace)))
+        elif self.__active and self._event_queue == self.__next_replay_event:
+            trace = self.__trace
+            self.__move_replay(lambda: trace.seek(int(fraction * len(trace))))
+
+    def __move_replay(self, move):
+        """
+        Move the active replay and redraw the changed tiles. If the trace turns out to be damaged, the replay is
+        ended and the trace dropped instead.
+
+        :param move: function moving the trace, returning a numpy array of the changed tile indexes
+        :return: True if the replay was moved, False if it was ended
+        """
+        try:
+            tiles = move()
+        except TraceFileError as e:
+            print(f"Could not replay the trace: {e}")
+            self.__trace = None
+            self._maze.replace((2, 3, 4, 5, 6), 0)
+            self._maze_handler.draw_maze()
+            self.__reset()
+            return False
+
+        self.__draw_replay(tiles)
+        return True
+
+    def __draw_replay(self, tiles):
+        """
+        Redraw the tiles changed by moving a replay, and show the increments at the new position.
+
+        :param tiles: numpy array of the changed tile indexes
+        :return: None
+        """
+        self._maze_handler.draw_changed_tiles(tiles)
+
+        self.__text_table.reset_value(self.__current_table_index)
+        self.__text_table.increment_value(self.__current_table_index, self.__trace.get_increments())
+        self.__text_table.draw_table_element(self.__screen, self.__current_table_index)
+
+    def toggle_live_path(self):
+        """
+        Turn the live path on or off. While it is on, the shortest path is kept up to date with LPA* every time the
+        user adds or removes walls, repairing only the part of the search affected by the edit.
+
+        :return: None
+        """
+        if self.__active:
+            return
+
+        if self.__live_path is None:
+            self._maze_handler.remove_all_colored_tiles()
+            self.__live_path = []
+            self._maze_handler.set_on_edit(self.__on_maze_edit)
+            self.__on_maze_edit(None)
+        else:
+            self.__stop_live_path()
+
+    def __stop_live_path(self):
+        """
+        Turn the live path off and remove it from the maze.
+
+        :return: None
+        """
+        if self.__live_path is not None:
+            self._maze_handler.set_on_edit(lambda tiles: None)
+            self.__draw_live_path([])
+            self.__live_path = None
+
+    def __on_maze_edit(self, tiles):
+        """
+        Repair the live path after the user edited the maze.
+
+        :param tiles: list of tiles that changed between wall and walkable, None if the entire maze changed
+        :return: None
+        """
+        with profiler.measure('live_path'):
+            if tiles is None:
+                self._lpa_star.initialize(self._maze.colors)
+            else:
+                for i in tiles:
+                    self._lpa_star.update_tile(i)
+            expanded = self._lpa_star.compute_shortest_path()
+
+        # show the number of tiles the repair had to process
+        index = self.__indexes['lpa_star']
+        self.__text_table.reset_value(index)
+        self.__text_table.increment_value(index, expanded)
+        self.__text_table.draw_table_element(self.__screen, index)
+
+        # the start and end tiles keep their own color
+        self.__draw_live_path(self._lpa_star.get_path()[1:-1])
+
+    def __draw_live_path(self, path):
+        """
+        Replace the live path drawn to the maze, only redrawing the tiles that changed.
+
+        :param path: list of tile indexes of the new path
+        :return: None
+        """
+        colors = self._maze.colors
+        new_path = set(path)
+
+        # tiles that are no longer on the path, unless the user has drawn over them
+        for i in self.__live_path:
+            if i not in new_path and colors[i] == 6:
+                colors[i] = 0
+                self._maze_handler.draw_box_by_idx(i)
+
+        for i in path:
+            if colors[i] != 6:
+                colors[i] = 6
+                self._maze_handler.draw_box_by_idx(i)
+
+        self.__live_path = path
+
+
+def run_worker(generator, events):
+    """
+    Run a generator to completion, passing every event it yields to the ring buffer.
+
+    :param generator: generator yielding tuples on the form (idx, value)
+    :param events: RingBuffer instance
+    :return: None
+    """
+    try:
+        for idx, value in generator:
+            events.push(idx, value)
+    finally:
+        events.close()
@@ -0,0 +1,78 @@
+import time
+from array import array
+
+
+class RingBuffer:
+    def __init__(self, capacity=1 << 16):
+        """
+        Initialize a new RingBuffer instance, a fixed size queue of (idx, value) events passed from a single producer
+        thread to a single consumer thread without locks. Only the producer writes to the head, and only the consumer
+        writes to the tail, so neither can see the other half way through an update.
+
+        :param capacity: maximum number of events in the buffer, rounded up to a power of two
+        """
+        self.__capacity = 1 << max(capacity - 1, 1).bit_length()
+        self.__mask = self.__capacity - 1
+
+        # preallocated storage, the events are stored as two parallel arrays
+        self.__indexes = array('l', [0]) * self.__capacity
+        self.__values = array('l', [0]) * self.__capacity
+
+        # total number of events written and read, the positions in the arrays are these modulo the capacity
+        self.__head = 0
+        self.__tail = 0
+
+        self.__closed = False
+
+    def __len__(self):
+        return self.__head - self.__tail
+
+    def push(self, idx, value):
+        """
+        Add an event to the buffer, waiting for the consumer if the buffer is full. Producer only.
+
+        :param idx: index of the tile
+        :param value: value of the event, e.g. a color code
+        :return: None
+        """
+        head = self.__head
+        while head - self.__tail >= self.__capacity:
+            time.sleep(0.001)
+
+        self.__indexes[head & self.__mask] = idx
+        self.__values[head & self.__mask] = value
+        # publish the event only after it has been written
+        self.__head = head + 1
+
+    def close(self):
+        """
+        Mark that the producer will not add any more events. Producer only.
+
+        :return: None
+        """
+        self.__closed = True
+
+    def pop_many(self, n):
+        """
+        Take up to n events from the buffer, without waiting for the producer. Consumer only.
+
+        :param n: maximum number of events to take
+        :return: list of tuples on the form (idx, value)
+        """
+        tail = self.__tail
+        end = min(self.__head, tail + n)
+        indexes, values, mask = self.__indexes, self.__values, self.__mask
+
+        events = [(indexes[i & mask], values[i & mask]) for i in range(tail, end)]
+        # free the slots only after they have been read
+        self.__tail = end
+        return events
+
+    def is_exhausted(self):
+        """
+        Check if the producer is done and every event has been taken. Consumer only.
+
+        :return: True if no more events will arrive, False otherwise
+        """
+        # the closed flag must be read before the head, the producer sets it after its last push
+        return self.__closed and self.__head == self.__tail
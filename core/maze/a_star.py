@@ -1,12 +1,12 @@
-from queue import PriorityQueue
-
-from core.maze.bfs import BFS
+from core.maze.bfs import BFS, run_search
+from core.maze.frontier import BucketFrontier
+from core.maze.state import BitSet, index_array
 
 
 class AStar(BFS):
-    def __init__(self, start_idx, end_idx, size, box_height, box_width):
-        # initialize maze constants
-        super().__init__(start_idx, end_idx, size, box_height, box_width)
+    def __init__(self, start_idx, end_idx, size, box_height, box_width, frontier=BucketFrontier):
+        # initialize maze constants, f_scores are small integers so the bucket frontier pops in O(1)
+        super().__init__(start_idx, end_idx, size, box_height, box_width, frontier)
 
     def h(self, idx1, idx2):
         """
@@ -20,77 +20,108 @@ class AStar(BFS):
         x2, y2 = idx2 % self._box_width, idx2 // self._box_width
         return abs(x1 - x2) + abs(y1 - y2)
 
-    def a_star(self, maze):
+    def _search_steps(self, maze, traced=False):
         """
-        Find the shortest path in the maze using the principles of the A* algorithm.
-
-        :param maze: _maze list
-        :return: None
+        Run the A* algorithm from start to end to completion. The color buffer is only read, all search state is kept
+        in separate arrays.
+
+        :param maze: color buffer of the grid
+        :param traced: if True, every (idx, color) step of the search is yielded as it happens
+        :return: yields the steps, and returns a tuple on the form (path, expanded), where path is the list of tile
+        indexes from start to end (empty if no path exists) and expanded is the number of tiles taken out of the
+        priority queue.
         """
-        maze = [box[2] for box in maze]
-
-        count = 0
+        masks, coded_offsets, steps = self._topology.masks, self._topology.coded_offsets, self._topology.steps
+        end_x, end_y = self._end_idx % self._box_width, self._end_idx // self._box_width
 
-        # create a new priority queue and insert the start into it, with f_score and count 0
-        open_set = PriorityQueue()
-        open_set.put((0, count, self._start_idx))
+        # create a new priority queue and insert the start into it, with f_score 0
+        open_set = self._frontier()
+        open_set.push(self._start_idx, 0)
 
-        # keep track of where we came from
-        parents = [None for i in range(self._size)]
+        # keep track of where we came from, as the direction code of the previous tile (see Topology.coded_offsets)
+        came_from = bytearray(self._size)
 
-        # create g and f scores for tiles
-        g_score = [float("inf") for i in range(self._size)]
+        # create g scores for tiles, no path can be longer than the number of tiles in the maze
+        g_score = index_array(self._size, self._size)
         g_score[self._start_idx] = 0
 
-        f_score = [float("inf") for i in range(self._size)]
-        f_score[self._start_idx] = self.h(self._start_idx, self._end_idx)
-
-        # in addition to the open_set, store all index values in a separate set to avoid unnecessary iterations
-        open_set_hash = {self._start_idx}
+        # a tile is added to the open set again every time its g_score improves, so remember which tiles are done
+        closed = BitSet(self._size)
         path_exists = False
+        expanded = 0
 
         # iterate whilst priority queue has element
-        while not open_set.empty():
+        while open_set:
 
-            # get the current element from the priority queue and remove it from the open_set_hash
-            current = open_set.get()[2]
-            open_set_hash.remove(current)
+            # get the current element from the priority queue, skipping tiles we have already expanded
+            current = open_set.pop()
+            if current in closed:
+                continue
+            closed.add(current)
 
             # break and backtrack if we encountered the end
             if current == self._end_idx:
                 path_exists = True
                 break
 
-            # get the neighbours of the current tile
-            neighbours = self.get_unvisited_neighbours(current, maze)
-
-            for n in neighbours:
-                tmp_g_score = g_score[current] + 1
+            expanded += 1
+            tmp_g_score = g_score[current] + 1
 
-                # check if neighbour has a lower g_score
-                if tmp_g_score < g_score[n]:
-                    parents[n] = current
-                    g_score[n] = tmp_g_score
-                    f_score[n] = tmp_g_score + self.h(n, self._end_idx)
+            # iterate over the walkable neighbours of the current tile
+            for o, code in coded_offsets[masks[current]]:
+                n = current + o
 
+                # check if neighbour is walkable and has a lower g_score
+                if maze[n] != 1 and tmp_g_score < g_score[n]:
                     # we have not yet discovered this tile
-                    if n not in open_set_hash:
-                        count += 1
-                        open_set.put((f_score[n], count, n))
-                        open_set_hash.add(n)
+                    if traced and g_score[n] == self._size:
                         yield n, 3
 
-            if current != self._start_idx:
-                yield n, 4
+                    came_from[n] = code
+                    g_score[n] = tmp_g_score
+
+                    # f_score = g_score + h(n, end)
+                    open_set.push(n, tmp_g_score + abs(n % self._box_width - end_x) + abs(n // self._box_width - end_y))
+
+            if traced and current != self._start_idx:
+                yield current, 4
+
+        path = []
 
         # backtrack path
         if path_exists:
-            tile = parents[self._end_idx]
-
+            tile = self._end_idx
             while tile != self._start_idx:
-                yield tile, 6
-                tile = parents[tile]
+                path.append(tile)
+                tile -= steps[came_from[tile]]
+                if traced and tile != self._start_idx:
+                    yield tile, 6
+            path.append(self._start_idx)
+            path.reverse()
 
         # finally, make sure start and end tiles get the correct color
-        yield self._start_idx, -1
-        yield self._end_idx, -2
+        if traced:
+            yield self._start_idx, -1
+            yield self._end_idx, -2
+
+        return path, expanded
+
+    def search(self, maze, trace=None):
+        """
+        Run the search to completion, see _search_steps.
+
+        :param maze: color buffer of the grid
+        :param trace: optional list, if given every (idx, color) step of the search is appended to it
+        :return: tuple on the form (path, expanded)
+        """
+        return run_search(self._search_steps(maze, trace is not None), trace)
+
+    def a_star(self, grid):
+        """
+        Find the shortest path in the maze using the principles of the A* algorithm. The steps are yielded while
+        the search runs.
+
+        :param grid: Grid instance
+        :return: yields a tuple on the form (idx, color)
+        """
+        yield from self._search_steps(grid.colors, True)
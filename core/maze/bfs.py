@@ -1,8 +1,25 @@
-from queue import Queue
+from core.maze.frontier import FifoFrontier
+from core.maze.topology import get_topology
+
+
+def run_search(steps, trace=None):
+    """
+    Run a search generator to completion.
+
+    :param steps: generator yielding the (idx, color) steps of a search and returning its result
+    :param trace: optional list, if given every step of the search is appended to it
+    :return: the result returned by the generator
+    """
+    while True:
+        try:
+            step = next(steps)
+        except StopIteration as stop:
+            return stop.value
+        trace.append(step)
 
 
 class BFS:
-    def __init__(self, start_idx, end_idx, size, box_height, box_width):
+    def __init__(self, start_idx, end_idx, size, box_height, box_width, frontier=FifoFrontier):
         """
         Initialize BFS instance.
 
@@ -11,244 +28,236 @@ class BFS:
         :param size: length of the maze list
         :param box_height: number of rows in our maze
         :param box_width: number of columns in our maze
+        :param frontier: frontier class used for the search queues, see core.maze.frontier
         """
+        self._frontier = frontier
         self._start_idx = start_idx
         self._end_idx = end_idx
         self._size = size
         self._box_height = box_height
         self._box_width = box_width
 
-    def get_unvisited_neighbours(self, i, maze):
+        # neighbour table shared by all solvers and maze builders working on grids of this size
+        self._topology = get_topology(box_width, box_height)
+
+    def get_walkable_neighbours(self, i, maze):
         """
-        Get all the neighbours of a tile that are unvisited and not a black wall.
+        Get all the neighbours of a tile that are not a black wall.
 
         :param i: index of the current node
-        :param maze: maze list
-        :return: list of unvisited neighbours
-        """
-        neighbours = []
-        if i - self._box_width >= 0 and maze[i - self._box_width] < 1:  # north
-            neighbours.append(i - self._box_width)
-        if i + self._box_width < self._size and maze[i + self._box_width] < 1:  # south
-            neighbours.append(i + self._box_width)
-        if i - 1 >= 0 and i % self._box_width != 0 and maze[i - 1] < 1:  # west
-            neighbours.append(i - 1)
-        if i + 1 < self._size and (i + 1) % self._box_width != 0 and maze[i + 1] < 1:  # east
-            neighbours.append(i + 1)
-
-        return neighbours
-
-    def get_unvisited_equal_neighbours(self, i, maze, od, op):
-        """
-        Get all the neighbours of a tile that are either unvisited, or visited by the other bfs queue,
-        in which case we only return the other tile index as the bfs is complete.
-
-        :param i: index of current tile
-        :param maze: maze list
-        :param od: other discovered color code
-        :param op: other processed color code
-        :return: a tuple on the form (terminate, neighbour_list), where terminate is true if we found a tile that has
-        been visited by the other bfs queue, and thus we can terminate the bfs search.
-        """
-        neighbours = []
-
-        if i - 1 >= 0 and i % self._box_width != 0:  # west
-            if maze[i - 1] < 1:
-                neighbours.append(i - 1)
-            elif maze[i - 1] in (od, op):
-                return True, i - 1
-        if i + 1 < self._size and (i + 1) % self._box_width != 0:  # east
-            if maze[i + 1] < 1:
-                neighbours.append(i + 1)
-            elif maze[i + 1] in (od, op):
-                return True, i + 1
-        if i - self._box_width >= 0:  # north
-            if maze[i - self._box_width] < 1:
-                neighbours.append(i - self._box_width)
-            elif maze[i - self._box_width] in (od, op):
-                return True, i - self._box_width
-        if i + self._box_width < self._size:  # south
-            if maze[i + self._box_width] < 1:
-                neighbours.append(i + self._box_width)
-            elif maze[i + self._box_width] in (od, op):
-                return True, i + self._box_width
-
-        return False, neighbours
-
-    def bfs(self, queue, maze, parents, q1=False):
-        # d: discovered, od: other_discovered, op = other_processed
-        d, od, p, op = (2, 3, 4, 5) if q1 else (3, 2, 5, 4)
-
-        current = queue.get()
-
-        # get the adjacent, walkable tiles along with the terminate bool
-        terminate, neighbours = self.get_unvisited_equal_neighbours(current, maze, od, op)
-
-        # one of the neighbours has already been discovered by the other bfs queue
-        if terminate:
-            # in this case, neighbours contain the index of the tile discovered by the other queue
-            yield True, (current, neighbours), None
-
-        # iterate over the neighbours, mark them as discovered and add them to the queue
-        for n in neighbours:
-            maze[n] = d
-            parents[n] = current
-            queue.put(n)
-
-            # yield tile index and color 2 (discovered)
-            yield False, n, d
-
-        maze[current] = p
-        yield False, current, p
-
-    def bidirectional_bfs(self, maze):
-        """
-        Perform a bidirectional bfs to find the shortest path in the maze.
-
-        :param maze: maze list
-        :return: yields a tuple on the form (idx, color)
+        :param maze: color buffer of the grid
+        :return: list of walkable neighbours
+        """
+        return [i + o for o in self._topology.offsets[self._topology.masks[i]] if maze[i + o] != 1]
+
+    def _bidirectional_steps(self, maze, traced=False):
         """
-        # Create empty queues
-        queue1 = Queue()
-        queue2 = Queue()
+        Run a bidirectional bfs to completion. The color buffer is only read, all search state is kept in separate
+        arrays.
 
-        parents = [None for i in range(self._size)]
+        :param maze: color buffer of the grid
+        :param traced: if True, every (idx, color) step of the search is yielded as it happens
+        :return: yields the steps, and returns a tuple on the form (path, expanded), where path is the list of tile
+        indexes from start to end (empty if no path exists) and expanded is the number of tiles taken out of the queues.
+        """
+        masks, coded_offsets, steps = self._topology.masks, self._topology.coded_offsets, self._topology.steps
 
-        # compress the _maze to only contain color codes (more memory efficient)
-        maze = [box[2] for box in maze]
+        # one byte per tile, holding the queue that discovered it (1 for the start queue and 2 for the end queue) in
+        # the upper bits, and the direction code of the tile it was discovered from in the lower three bits
+        reached = bytearray(self._size)
+        reached[self._start_idx] = 1 << 3
+        reached[self._end_idx] = 2 << 3
 
         # Add start tile in queue1 and finish tile in queue2
-        queue1.put(self._start_idx)
-        queue2.put(self._end_idx)
+        queue1 = self._frontier()
+        queue2 = self._frontier()
+        queue1.push(self._start_idx)
+        queue2.push(self._end_idx)
 
-        # idx1 and idx2 will contain the indexes in the meeting point
+        # idx1 and idx2 will contain the indexes in the meeting point, idx1 on the start side and idx2 on the end side
         idx1, idx2 = None, None
-
-        while not (queue1.empty() or queue2.empty()):
-            # TODO: This section could be dried up to remove two similar iterations
-
-            # create a _generator to iterate over the neighbours of queue1
-            gen1 = self.bfs(queue1, maze, parents, True)
-            while True:
-                # get the next neighbour
-                terminate, neighbour, color = next(gen1, (None, None, None))
-
-                # we have iterated over all neighbours, break
-                if terminate is None:
+        expanded = 0
+
+        while queue1 and queue2:
+            # d: discovered color, p: processed color
+            for queue, side, d, p in ((queue1, 1, 2, 4), (queue2, 2, 3, 5)):
+                current = queue.pop()
+                expanded += 1
+
+                # iterate over the adjacent, walkable tiles, mark them as discovered and add them to the queue
+                for o, code in coded_offsets[masks[current]]:
+                    n = current + o
+                    if maze[n] == 1:
+                        continue
+
+                    # the neighbour has already been discovered by the other bfs queue, the search is complete
+                    if reached[n]:
+                        if reached[n] >> 3 != side:
+                            idx1, idx2 = (current, n) if side == 1 else (n, current)
+                            break
+                        continue
+
+                    reached[n] = side << 3 | code
+                    queue.push(n)
+                    if traced:
+                        yield n, d
+
+                if idx1 is not None:
                     break
 
-                # we found a common tile, exit and backtrack
-                elif terminate:
-                    idx1, idx2 = neighbour
-                    break
+                if traced:
+                    yield current, p
 
-                yield neighbour, color
-
-            if idx1:
+            if idx1 is not None:
                 break
 
-            # same procedure for queue2
-            gen2 = self.bfs(queue2, maze, parents, False)
-            while True:
-                terminate, neighbour, color = next(gen2, (None, None, None))
-                if terminate is None:
-                    break
-                elif terminate:
-                    idx2, idx1 = neighbour
-                    break
-
-                yield neighbour, color
-
-            if idx1:
-                break
+        path = []
 
         # does a path between start and finish exist?
-        if idx1:
+        if idx1 is not None:
+            first, second = [idx1], [idx2]
 
-            # assign and yield the indexes where the paths met
+            # backtrack both paths, alternating between the two sides
             tile1, tile2 = idx1, idx2
-            maze[tile1] = 6
-            maze[tile2] = 6
-            yield tile1, 6
-            yield tile2, 6
-
-            # backtrack both paths
-            while True:
+            while tile1 != self._start_idx or tile2 != self._end_idx:
                 if tile1 != self._start_idx:
-                    tile1 = parents[tile1]
-                    maze[tile1] = 6
-                    yield tile1, 6
+                    tile1 -= steps[reached[tile1] & 7]
+                    first.append(tile1)
                 if tile2 != self._end_idx:
-                    tile2 = parents[tile2]
-                    maze[tile2] = 6
-                    yield tile2, 6
-                if tile1 == self._start_idx and tile2 == self._end_idx:
-                    break
+                    tile2 -= steps[reached[tile2] & 7]
+                    second.append(tile2)
+
+            if traced:
+                yield idx1, 6
+                yield idx2, 6
+                for i in range(1, max(len(first), len(second))):
+                    if i < len(first):
+                        yield first[i], 6
+                    if i < len(second):
+                        yield second[i], 6
+
+            first.reverse()
+            path = first + second
 
         # finally, color the start and end index correctly.
-        yield self._start_idx, -1
-        yield self._end_idx, -2
+        if traced:
+            yield self._start_idx, -1
+            yield self._end_idx, -2
+
+        return path, expanded
 
-    def bfs_shortest_path(self, maze):
+    def search_bidirectional(self, maze, trace=None):
         """
-        Perform a bfs to find the shortest path between start and end in the maze.
+        Run a bidirectional bfs to completion, see _bidirectional_steps.
 
-        :param maze: maze list
-        :return: None
+        :param maze: color buffer of the grid
+        :param trace: optional list, if given every (idx, color) step of the search is appended to it
+        :return: tuple on the form (path, expanded)
         """
-        # create empty queue
-        queue = Queue()
+        return run_search(self._bidirectional_steps(maze, trace is not None), trace)
+
+    def bidirectional_bfs(self, grid):
+        """
+        Perform a bidirectional bfs to find the shortest path in the maze. The steps are yielded while the search runs.
+
+        :param grid: Grid instance
+        :return: yields a tuple on the form (idx, color)
+        """
+        yield from self._bidirectional_steps(grid.colors, True)
 
-        # initialize distance and parents list for each tile
-        distances = [float("inf") for i in range(self._size)]
-        parents = [None for i in range(self._size)]
+    def _shortest_path_steps(self, maze, traced=False):
+        """
+        Run a bfs from start to end to completion. The color buffer is only read, all search state is kept in
+        separate arrays.
+
+        :param maze: color buffer of the grid
+        :param traced: if True, every (idx, color) step of the search is yielded as it happens
+        :return: yields the steps, and returns a tuple on the form (path, expanded), where path is the list of tile
+        indexes from start to end (empty if no path exists) and expanded is the number of tiles taken out of the queue.
+        """
+        masks, coded_offsets, steps = self._topology.masks, self._topology.coded_offsets, self._topology.steps
 
-        # compress the _maze to only contain color codes (more memory efficient)
-        maze = [box[2] for box in maze]
+        # create empty queue
+        queue = self._frontier()
+
+        # direction code of the tile each tile was discovered from, 0 for undiscovered tiles. The start tile is marked
+        # as discovered, its code is never followed.
+        came_from = bytearray(self._size)
+        came_from[self._start_idx] = 1
 
         # enqueue start tile
-        queue.put(self._start_idx)
+        queue.push(self._start_idx)
 
         # used to break out of the loop if we discover the final tile
         discovered_final_tile = False
+        expanded = 0
 
         # iterate while there are still undiscovered tiles
-        while not queue.empty():
-            current = queue.get()
+        while queue:
+            current = queue.pop()
+            expanded += 1
+
+            # iterate over the adjacent, walkable and undiscovered tiles, mark them as discovered and enqueue them
+            for o, code in coded_offsets[masks[current]]:
+                n = current + o
+                if maze[n] == 1 or came_from[n]:
+                    continue
 
-            # get the adjacent, walkable tiles (white tiles with color code 0)
-            neighbours = self.get_unvisited_neighbours(current, maze)
+                came_from[n] = code
 
-            # iterate over the neighbours, mark them as discovered and add them to the queue
-            for n in neighbours:
                 # We reached the endpoint
-                if maze[n] == -2:
-                    parents[n] = current
+                if n == self._end_idx:
                     discovered_final_tile = True
                     break
 
-                maze[n] = 2
-                distances[n] = distances[current] + 1
-                parents[n] = current
-                queue.put(n)
+                queue.push(n)
 
-                # yield tile index and color 2 (discovered)
-                yield n, 2
+                # tile index and color 2 (discovered)
+                if traced:
+                    yield n, 2
 
             # break out of the loop prematurely if we found the final tile, this means we have found the shortest path
             if discovered_final_tile:
                 break
 
-            maze[current] = 3
-            yield current, 4
+            if traced:
+                yield current, 4
 
-        if parents[self._end_idx]:
+        path = []
+
+        if discovered_final_tile:
             # Backtracking the shortest path
-            tile = parents[self._end_idx]
+            tile = self._end_idx
             while tile != self._start_idx:
-                yield tile, 6
-                tile = parents[tile]
-                maze[tile] = 6
+                path.append(tile)
+                tile -= steps[came_from[tile]]
+                if traced and tile != self._start_idx:
+                    yield tile, 6
+            path.append(self._start_idx)
+            path.reverse()
 
         # finally, color the start index correctly.
-        yield self._start_idx, -1
+        if traced:
+            yield self._start_idx, -1
+
+        return path, expanded
+
+    def search_shortest_path(self, maze, trace=None):
+        """
+        Run a bfs from start to end to completion, see _shortest_path_steps.
+
+        :param maze: color buffer of the grid
+        :param trace: optional list, if given every (idx, color) step of the search is appended to it
+        :return: tuple on the form (path, expanded)
+        """
+        return run_search(self._shortest_path_steps(maze, trace is not None), trace)
+
+    def bfs_shortest_path(self, grid):
+        """
+        Perform a bfs to find the shortest path between start and end in the maze. The steps are yielded while the
+        search runs.
+
+        :param grid: Grid instance
+        :return: yields a tuple on the form (idx, color)
+        """
+        yield from self._shortest_path_steps(grid.colors, True)
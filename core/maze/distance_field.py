@@ -0,0 +1,66 @@
+import numpy as np
+
+# when the frontier covers less than 1/SPARSE_RATIO of the grid, it is expanded as an index array instead of a mask
+SPARSE_RATIO = 64
+
+
+def distance_field(grid, source=None):
+    """
+    Compute the bfs distance from a source tile to every tile of the grid. The whole frontier is expanded at once
+    with numpy: while the frontier is wide it is a boolean mask shifted in the four directions over the grid, and
+    while it is narrow (e.g. the corridors of a generated maze) it is an array of tile indexes, so a step never costs
+    more than the frontier requires.
+
+    :param grid: Grid instance
+    :param source: index of the source tile, defaults to the start tile of the grid
+    :return: dense int32 numpy array of length grid.size, containing the distance of each tile from the source,
+    or -1 if the tile is a wall or cannot be reached
+    """
+    if source is None:
+        source = grid.start_idx
+
+    w, h, size = grid.box_width, grid.box_height, grid.size
+
+    # zero copy view of the color buffer, everything except walls (color code 1) can be walked on
+    colors = np.frombuffer(grid.colors, dtype=np.int8)
+    unvisited = colors != 1
+    unvisited[source] = False
+
+    distances = np.full(size, -1, dtype=np.int32)
+    distances[source] = 0
+
+    # column of every tile, used to stop the frontier from wrapping around the west and east edges
+    columns = np.arange(size, dtype=np.int64) % w
+    sparse_limit = max(size // SPARSE_RATIO, 1)
+
+    frontier = np.array([source], dtype=np.int64)
+    distance = 0
+
+    while frontier.size:
+        distance += 1
+
+        if frontier.size < sparse_limit:
+            # expand the frontier as an index array
+            x = columns[frontier]
+            candidates = np.concatenate((frontier[x > 0] - 1, frontier[x < w - 1] + 1,
+                                         frontier[frontier >= w] - w, frontier[frontier < size - w] + w))
+            candidates = np.unique(candidates[unvisited[candidates]])
+        else:
+            # expand the frontier as a mask, by shifting it one tile in each direction
+            mask = np.zeros(size, dtype=bool)
+            mask[frontier] = True
+            mask2d = mask.reshape(h, w)
+            shifted = np.zeros((h, w), dtype=bool)
+            shifted[1:, :] |= mask2d[:-1, :]
+            shifted[:-1, :] |= mask2d[1:, :]
+            shifted[:, 1:] |= mask2d[:, :-1]
+            shifted[:, :-1] |= mask2d[:, 1:]
+            shifted = shifted.reshape(size)
+            shifted &= unvisited
+            candidates = np.flatnonzero(shifted)
+
+        unvisited[candidates] = False
+        distances[candidates] = distance
+        frontier = candidates
+
+    return distances
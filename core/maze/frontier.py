@@ -0,0 +1,110 @@
+from collections import deque
+from heapq import heappush, heappop
+
+
+class FifoFrontier:
+    def __init__(self):
+        """
+        Create a new first-in-first-out frontier backed by a collections deque. Priorities are ignored.
+        """
+        self._queue = deque()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def push(self, item, priority=0):
+        """
+        Add an item to the back of the frontier.
+
+        :param item: tile index to add
+        :param priority: unused, only present to share the interface of the other frontiers
+        :return: None
+        """
+        self._queue.append(item)
+
+    def pop(self):
+        """
+        Remove and return the oldest item of the frontier.
+
+        :return: tile index
+        """
+        return self._queue.popleft()
+
+
+class HeapFrontier:
+    def __init__(self):
+        """
+        Create a new priority frontier backed by a binary heap (heapq). Items with equal priority are returned in the
+        order they were pushed.
+        """
+        self._heap = []
+        self._count = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, item, priority=0):
+        """
+        Add an item to the frontier.
+
+        :param item: tile index to add
+        :param priority: priority of the item, lower values are returned first
+        :return: None
+        """
+        self._count += 1
+        heappush(self._heap, (priority, self._count, item))
+
+    def pop(self):
+        """
+        Remove and return the item with the lowest priority.
+
+        :return: tile index
+        """
+        return heappop(self._heap)[2]
+
+
+class BucketFrontier:
+    def __init__(self):
+        """
+        Create a new priority frontier for small, non-negative integer priorities, such as the f_score on a unit-cost
+        grid. Every priority has its own bucket (deque), so items with equal priority are returned in the order they
+        were pushed. Since the priorities of A* on our grid never decrease, popping is O(1) amortized.
+        """
+        self._buckets = []
+        self._current = 0
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def push(self, item, priority=0):
+        """
+        Add an item to the frontier.
+
+        :param item: tile index to add
+        :param priority: non-negative integer priority of the item, lower values are returned first
+        :return: None
+        """
+        while len(self._buckets) <= priority:
+            self._buckets.append(deque())
+        self._buckets[priority].append(item)
+
+        # priorities are expected to be monotone, but we stay correct if they are not
+        if priority < self._current:
+            self._current = priority
+        self._len += 1
+
+    def pop(self):
+        """
+        Remove and return the item with the lowest priority.
+
+        :return: tile index
+        """
+        if not self._len:
+            raise IndexError("pop from an empty frontier")
+
+        # skip empty buckets until we find the lowest priority item
+        while not self._buckets[self._current]:
+            self._current += 1
+        self._len -= 1
+        return self._buckets[self._current].popleft()
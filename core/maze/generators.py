@@ -0,0 +1,285 @@
+"""
+Maze generators working on a lattice of cells, where the cells are the tiles at even columns and rows, and the tiles
+between two cells are the walls that can be carved to connect them. Every generator produces a perfect maze, in which
+any two cells are connected by exactly one path.
+
+Like MazeBuilder.generate_random_maze, the generators work directly on the color buffer of a grid filled with walls,
+and yield a tuple on the form (idx, increments) every time a tile is carved. When they are not animated the tiles are
+carved without being yielded, which is how MazeBuilder.build generates a maze at once.
+"""
+from array import array
+
+import numpy as np
+
+from core.maze.state import BitSet, index_typecode
+
+
+def _carve(maze, i, increments):
+    """
+    Carve a tile, unless it is the start or end tile.
+
+    :param maze: color buffer of the grid
+    :param i: index of the tile
+    :param increments: number of increments to report
+    :return: yields (i, increments) if the tile was carved
+    """
+    if maze[i] == 1:
+        maze[i] = 0
+        yield i, increments
+
+
+def connect_endpoints(grid):
+    """
+    Make sure the start and end tiles are connected to the maze. The lattice may not reach the endpoints, e.g. the end
+    tile lies in the last column, which is all walls when the number of columns is even. In that case we carve from
+    the endpoint towards the middle of the maze until we reach an open tile.
+
+    :param grid: Grid instance
+    :return: yields a tuple on the form (idx, 1) for every carved tile
+    """
+    maze, w = grid.colors, grid.box_width
+
+    for idx, step in ((grid.start_idx, 1), (grid.end_idx, -1)):
+        x = idx % w
+        neighbours = [n for n, inside in ((idx - 1, x > 0), (idx + 1, x < w - 1), (idx - w, idx >= w),
+                                          (idx + w, idx + w < grid.size)) if inside]
+        if all(maze[n] == 1 for n in neighbours):
+            idx += step
+            while maze[idx] == 1:
+                maze[idx] = 0
+                yield idx, 1
+                idx += step
+
+
+def kruskal_maze(grid, rng, animated=True):
+    """
+    Generate a maze with randomized Kruskal's algorithm: visit the walls between neighbouring cells in random order,
+    and carve every wall whose two cells are not connected yet. A union-find over the tile indexes keeps track of
+    which cells are connected.
+
+    :param grid: Grid instance filled with walls
+    :param rng: numpy Generator
+    :param animated: if False, the tiles are carved without being yielded, only the tiles connecting the endpoints are
+    :return: yields a tuple on the form (idx, increments)
+    """
+    maze, w, h = grid.colors, grid.box_width, grid.box_height
+
+    # the walls between horizontal (step 1) and vertical (step w) neighbouring cells
+    ys, xs = np.mgrid[0:h:2, 1:w - 1:2]
+    horizontal = (ys * w + xs).ravel()
+    ys, xs = np.mgrid[1:h - 1:2, 0:w:2]
+    vertical = (ys * w + xs).ravel()
+
+    walls = np.concatenate((horizontal, vertical))
+    steps = np.concatenate((np.ones(len(horizontal), dtype=walls.dtype), np.full(len(vertical), w, walls.dtype)))
+    order = rng.permutation(len(walls))
+    walls, steps = walls[order].tolist(), steps[order].tolist()
+
+    # every cell starts out as its own set
+    parent = array(index_typecode(grid.size), range(grid.size))
+
+    increments = 0
+    for wall, step in zip(walls, steps):
+        increments += 1
+
+        # find the sets of both cells, with path halving: every visited tile is pointed to its grandparent. The loops
+        # are inlined, saving two function calls per wall.
+        a, b = wall - step, wall + step
+        while parent[a] != a:
+            parent[a] = a = parent[parent[a]]
+        while parent[b] != b:
+            parent[b] = b = parent[parent[b]]
+
+        if a != b:
+            parent[b] = a
+            if animated:
+                yield from _carve(maze, wall - step, increments)
+                yield from _carve(maze, wall, 1)
+                yield from _carve(maze, wall + step, 1)
+            else:
+                maze[wall - step] = maze[wall] = maze[wall + step] = 0
+            increments = 0
+
+    # the endpoints may have been carved over when not animated
+    grid.set_endpoints(grid.start_idx, grid.end_idx)
+    yield from connect_endpoints(grid)
+
+
+def prim_maze(grid, rng, animated=True):
+    """
+    Generate a maze with randomized Prim's algorithm: grow the maze from a random cell, by repeatedly picking a random
+    cell from the frontier (the cells next to the maze), and carving the wall to one of its neighbours in the maze.
+
+    :param grid: Grid instance filled with walls
+    :param rng: numpy Generator
+    :param animated: if False, the tiles are carved without being yielded, only the tiles connecting the endpoints are
+    :return: yields a tuple on the form (idx, increments)
+    """
+    maze, w, h = grid.colors, grid.box_width, grid.box_height
+    cells = ((w + 1) // 2) * ((h + 1) // 2)
+
+    # two random numbers per cell added to the maze, one to pick it from the frontier and one to pick its neighbour
+    random = iter(rng.random(2 * cells).tolist())
+
+    # cells in the frontier or the maze, and cells in the maze. The bits are read directly, saving a method call per
+    # lookup.
+    seen = BitSet(grid.size).bits
+    in_maze = BitSet(grid.size).bits
+    frontier = []
+
+    def neighbours(i):
+        # cells two tiles away, paired with the step towards them
+        x, y = i % w, i // w
+        return [(i + step, step) for step, inside in ((-2, x >= 2), (2, x + 2 < w), (-2 * w, y >= 2),
+                                                      (2 * w, y + 2 < h)) if inside]
+
+    def add_to_maze(i, cell_neighbours):
+        seen[i >> 3] |= 1 << (i & 7)
+        in_maze[i >> 3] |= 1 << (i & 7)
+        for n, _ in cell_neighbours:
+            if not seen[n >> 3] >> (n & 7) & 1:
+                seen[n >> 3] |= 1 << (n & 7)
+                frontier.append(n)
+
+    first = int(rng.integers(0, (h + 1) // 2)) * 2 * w + int(rng.integers(0, (w + 1) // 2)) * 2
+    add_to_maze(first, neighbours(first))
+    if animated:
+        yield from _carve(maze, first, 1)
+    else:
+        maze[first] = 0
+
+    while frontier:
+        # remove a random cell from the frontier in constant time, by swapping it with the last one
+        k = int(next(random) * len(frontier))
+        frontier[k], frontier[-1] = frontier[-1], frontier[k]
+        cell = frontier.pop()
+
+        # the neighbours are computed once per cell, for picking the wall to carve and for growing the frontier
+        cell_neighbours = neighbours(cell)
+        options = [(n, step) for n, step in cell_neighbours if in_maze[n >> 3] >> (n & 7) & 1]
+        _, step = options[int(next(random) * len(options))]
+
+        add_to_maze(cell, cell_neighbours)
+        if animated:
+            yield from _carve(maze, cell + step // 2, len(options))
+            yield from _carve(maze, cell, 1)
+        else:
+            maze[cell + step // 2] = maze[cell] = 0
+
+    # the endpoints may have been carved over when not animated
+    grid.set_endpoints(grid.start_idx, grid.end_idx)
+    yield from connect_endpoints(grid)
+
+
+def eller_rows(box_width, box_height, rng):
+    """
+    Generate a maze with Eller's algorithm, one row of tiles at a time. Only the sets of the cells in the current row
+    are kept in memory, so the memory use is proportional to the width of the maze regardless of its height, and mazes
+    larger than what fits in memory can be streamed to a file.
+
+    For every row of cells, neighbouring cells in different sets are randomly joined, and then every set is extended
+    down to the next row by at least one cell. In the last row all cells in different sets are joined.
+
+    :param box_width: number of columns in the maze
+    :param box_height: number of rows in the maze
+    :param rng: numpy Generator
+    :return: yields a bytearray for every row of tiles, where 1 is a wall and 0 is open
+    """
+    cells = (box_width + 1) // 2
+    rows = (box_height + 1) // 2
+
+    # set of every cell in the current row, None for cells not connected to the row above
+    sets = [None] * cells
+    next_set = 0
+
+    for r in range(rows):
+        last = r == rows - 1
+        # three random numbers per cell: whether to join it with its right neighbour, whether to extend its set down
+        # through it, and, for the first cell of a set none of whose cells were extended down, which cell to use
+        random = rng.random(3 * cells).tolist()
+
+        # cells not connected to the row above start out in new sets
+        for c in range(cells):
+            if sets[c] is None:
+                sets[c] = next_set
+                next_set += 1
+
+        # union-find over the sets of this row, the sets are joined while walking the row left to right
+        parent = {}
+
+        def find(s):
+            while s in parent:
+                s = parent[s]
+            return s
+
+        row = bytearray([1]) * box_width
+        row[0:cells * 2:2] = bytes(cells)
+        for c in range(cells - 1):
+            a, b = find(sets[c]), find(sets[c + 1])
+            if a != b and (last or random[c] < 0.5):
+                parent[b] = a
+                row[2 * c + 1] = 0
+        sets = [find(s) for s in sets]
+        yield row
+
+        if last:
+            break
+
+        # every set continues down through at least one of its cells
+        members = {}
+        for c, s in enumerate(sets):
+            members.setdefault(s, []).append(c)
+
+        below = bytearray([1]) * box_width
+        next_sets = [None] * cells
+        for s, group in members.items():
+            down = [c for c in group if random[cells + c] < 0.5] or \
+                [group[int(random[2 * cells + group[0]] * len(group))]]
+            for c in down:
+                below[2 * c] = 0
+                next_sets[c] = s
+        sets = next_sets
+        yield below
+
+    # when the number of rows is even, the last row of tiles lies below the lattice
+    if box_height % 2 == 0:
+        yield bytearray([1]) * box_width
+
+
+def eller_maze(grid, rng):
+    """
+    Generate a maze with Eller's algorithm, see eller_rows.
+
+    :param grid: Grid instance filled with walls
+    :param rng: numpy Generator
+    :return: yields a tuple on the form (idx, increments)
+    """
+    maze, w = grid.colors, grid.box_width
+
+    for y, row in enumerate(eller_rows(w, grid.box_height, rng)):
+        increments = 0
+        for x, tile in enumerate(row):
+            increments += 1
+            if not tile:
+                for carved in _carve(maze, y * w + x, increments):
+                    yield carved
+                    increments = 0
+
+    yield from connect_endpoints(grid)
+
+
+def build_eller_maze(grid, rng):
+    """
+    Generate a maze with Eller's algorithm without animating it, copying the rows straight into the color buffer.
+
+    :param grid: Grid instance
+    :param rng: numpy Generator
+    :return: None
+    """
+    w = grid.box_width
+    for y, row in enumerate(eller_rows(w, grid.box_height, rng)):
+        grid.colors[y * w:(y + 1) * w] = array('b', row)
+
+    grid.set_endpoints(grid.start_idx, grid.end_idx)
+    for _ in connect_endpoints(grid):
+        pass
@@ -0,0 +1,117 @@
+from array import array
+
+import numpy as np
+
+from core.maze.state import pack_walls
+
+
+class Grid:
+    def __init__(self, box_width, box_height, box_size=1, origin=(0, 0), colors=None):
+        """
+        Create a new Grid instance. The grid stores the color code of every tile in one contiguous signed byte array,
+        where tile i is located at column i % box_width and row i // box_width. Pixel positions are computed from the
+        index when needed instead of being stored per tile.
+
+        :param box_width: number of columns in the grid
+        :param box_height: number of rows in the grid
+        :param box_size: width/height of each tile in pixels
+        :param origin: pixel position (x,y) of the first tile
+        :param colors: existing color buffer to use, any buffer of box_width * box_height signed bytes, e.g. a
+        memoryview of a memory mapped maze file (see core.maze.maze_file). By default a new buffer is created.
+        """
+        self.box_width = box_width
+        self.box_height = box_height
+        self.size = box_width * box_height
+
+        self.box_size = box_size
+        self.origin = origin
+
+        # one signed byte per tile, initialized to color code 0 (white)
+        self.colors = array('b', bytes(self.size)) if colors is None else colors
+        if len(self.colors) != self.size:
+            raise ValueError(f"color buffer has {len(self.colors)} tiles, expected {self.size}")
+
+        self.start_idx = 0
+        self.end_idx = 0
+
+    def __len__(self):
+        return self.size
+
+    def set_endpoints(self, start_idx, end_idx):
+        """
+        Set the start and end tile of the grid and give them their respective color codes.
+
+        :param start_idx: index of start tile
+        :param end_idx: index of end tile
+        :return: None
+        """
+        self.start_idx = start_idx
+        self.end_idx = end_idx
+        self.colors[start_idx] = -1
+        self.colors[end_idx] = -2
+
+    def get_pos(self, i):
+        """
+        Get the pixel position of a tile.
+
+        :param i: index of the tile
+        :return: tuple on the form (x, y)
+        """
+        return (self.origin[0] + (i % self.box_width) * self.box_size,
+                self.origin[1] + (i // self.box_width) * self.box_size)
+
+    def get_endpoints(self):
+        """
+        Get the pixel positions of the start and end tiles.
+
+        :return: Tuple on the form ((sx, sy), (ex, ey))
+        """
+        return self.get_pos(self.start_idx), self.get_pos(self.end_idx)
+
+    def get_view(self):
+        """
+        Get a numpy view of the color buffer, writing to the view writes directly to the grid.
+
+        :return: numpy int8 array of length size
+        """
+        return np.frombuffer(self.colors, dtype=np.int8)
+
+    def get_walls(self):
+        """
+        Get the walls of the grid packed one bit per tile.
+
+        :return: BitSet instance, with the bits of the walls set
+        """
+        return pack_walls(self.colors)
+
+    def fill(self, color_code):
+        """
+        Set every tile except the start and end tiles to the given color code, and give the start and end tiles their
+        respective color codes.
+
+        :param color_code: color code to fill the grid with
+        :return: numpy array of the indexes of the tiles that changed
+        """
+        colors = self.get_view()
+
+        target = np.full(self.size, color_code, dtype=np.int8)
+        target[self.start_idx] = -1
+        target[self.end_idx] = -2
+
+        changed = np.flatnonzero(colors != target)
+        colors[changed] = target[changed]
+        return changed
+
+    def replace(self, color_codes, color_code):
+        """
+        Replace every tile with a color code in color_codes by color_code.
+
+        :param color_codes: collection of color codes to replace
+        :param color_code: new color code
+        :return: numpy array of the indexes of the tiles that changed
+        """
+        colors = self.get_view()
+
+        changed = np.flatnonzero(np.isin(colors, color_codes))
+        colors[changed] = color_code
+        return changed
@@ -0,0 +1,221 @@
+from array import array
+
+import numpy as np
+
+from core.maze.a_star import AStar
+from core.maze.bfs import run_search
+from core.maze.frontier import FifoFrontier
+from core.maze.state import BitSet, index_array, index_typecode
+from core.maze.topology import WEST, EAST, NORTH, SOUTH
+
+
+class JumpPointSearch(AStar):
+    def __init__(self, *args, **kwargs):
+        # initialize maze constants, see AStar
+        super().__init__(*args, **kwargs)
+
+        # jump points lie at different distances from the current tile, so they must be taken out of the open set in
+        # order of f_score, or a jump point can be closed before its shortest path is found
+        if self._frontier is FifoFrontier:
+            raise ValueError("Jump Point Search needs a priority frontier, not FifoFrontier")
+
+        # the directions to search from a jump point as (offset, neighbour flag) pairs, by the direction the search
+        # arrived from (0 at the start tile). The search continues straight ahead and to both sides, it never needs to
+        # turn back.
+        w = self._box_width
+        self._turns = {0: ((-1, WEST), (1, EAST), (-w, NORTH), (w, SOUTH)),
+                       EAST: ((-w, NORTH), (w, SOUTH), (1, EAST)), WEST: ((-w, NORTH), (w, SOUTH), (-1, WEST)),
+                       SOUTH: ((-1, WEST), (1, EAST), (w, SOUTH)), NORTH: ((-1, WEST), (1, EAST), (-w, NORTH))}
+
+    def _horizontal_jumps(self, maze):
+        """
+        Find the jump point of a horizontal walk from every tile, in both directions. Walking horizontally in the
+        direction dx, the jump point is the first tile that is the end tile, or that has an opening north or south
+        that was walled off on the previous tile, where the optimal path may turn. The vertical jumps look for
+        horizontal jump points on every row they pass, so instead of walking the rows over and over in Python, the
+        jump points of all tiles are found once per search with numpy.
+
+        :param maze: color buffer of the grid
+        :return: tuple on the form (west, east) of index arrays, holding the index of the jump point found by walking
+        from a tile in that direction, -1 if the walk runs into a wall or out of the maze
+        """
+        h, w = self._box_height, self._box_width
+        typecode = index_typecode(self._size)
+        walls = np.frombuffer(maze, dtype=np.int8).reshape(h, w) == 1
+        columns = np.arange(w, dtype=typecode)
+        rows = np.arange(h, dtype=typecode)[:, None]
+        end_y, end_x = divmod(self._end_idx, w)
+
+        jumps = []
+        # the west walk is the east walk on the mirrored maze
+        for flip in (slice(None, None, -1), slice(None)):
+            mirrored = walls[:, flip]
+
+            # forced neighbours north or south, the previous tile is the one to the west, and the end tile
+            stops = np.zeros((h, w), dtype=bool)
+            stops[1:, 1:] = ~mirrored[:-1, 1:] & mirrored[:-1, :-1]
+            stops[:-1, 1:] |= ~mirrored[1:, 1:] & mirrored[1:, :-1]
+            stops[end_y, columns[flip][end_x]] = True
+
+            # the walk stops at the first wall or jump point to the east, a column of w means it leaves the maze
+            stops = np.where(mirrored | stops, columns, w)
+            stops = np.minimum.accumulate(stops[:, ::-1], axis=1)[:, ::-1]
+            found = stops < w
+            stops[~found] = w - 1
+            found &= ~mirrored[rows, stops]
+
+            jump = np.where(found, rows * w + columns[flip][stops], -1)[:, flip]
+            jumps.append(array(typecode, jump.astype(typecode, copy=False).tobytes()))
+
+        return tuple(jumps)
+
+    def _jump_vertical(self, i, step, maze, west_jumps, east_jumps):
+        """
+        Walk vertically from a tile until we find a jump point: the end tile, a tile with an opening west or east that
+        was walled off on the previous tile, or a tile from which a horizontal walk finds a jump point. Horizontal
+        walks are looked up, see _horizontal_jumps.
+
+        :param i: index of the first tile to walk on
+        :param step: offset of the next tile, -box_width to walk north or box_width to walk south
+        :param maze: color buffer of the grid
+        :param west_jumps: index array of the horizontal jump points to the west, see _horizontal_jumps
+        :param east_jumps: index array of the horizontal jump points to the east
+        :return: index of the jump point, -1 if we walked into a wall or out of the maze
+        """
+        x = i % self._box_width
+        west, east = x > 0, x < self._box_width - 1
+
+        while 0 <= i < self._size and maze[i] != 1:
+            if i == self._end_idx:
+                return i
+
+            # forced neighbours west or east, the previous tile (i - step) is always inside the maze, and horizontal
+            # jump points
+            if west and (maze[i - 1] != 1 and maze[i - 1 - step] == 1 or west_jumps[i - 1] >= 0) or \
+                    east and (maze[i + 1] != 1 and maze[i + 1 - step] == 1 or east_jumps[i + 1] >= 0):
+                return i
+
+            i += step
+
+        return -1
+
+    def _search_steps(self, maze, traced=False):
+        """
+        Run Jump Point Search from start to end to completion. Like A*, but instead of adding every neighbour to the
+        open set, we walk in straight lines and only add the jump points where the shortest path may turn. The color
+        buffer is only read, all search state is kept in separate arrays.
+
+        :param maze: color buffer of the grid
+        :param traced: if True, every (idx, color) step of the search is yielded as it happens
+        :return: yields the steps, and returns a tuple on the form (path, expanded), where path is the list of tile
+        indexes from start to end (empty if no path exists) and expanded is the number of jump points taken out of the
+        priority queue.
+        """
+        w, masks, turns = self._box_width, self._topology.masks, self._turns
+        end_x, end_y = self._end_idx % w, self._end_idx // w
+
+        open_set = self._frontier()
+        open_set.push(self._start_idx, 0)
+
+        # jump points can lie far apart, so unlike A* the index of the previous jump point is stored
+        parents = index_array(self._size, -1)
+        g_score = index_array(self._size, self._size)
+        g_score[self._start_idx] = 0
+
+        # a jump point can be added to the open set several times, every time its g_score improves
+        closed = BitSet(self._size)
+        closed_bits = closed.bits
+        west_jumps, east_jumps = self._horizontal_jumps(maze)
+        path_exists = False
+        expanded = 0
+
+        while open_set:
+            current = open_set.pop()
+            if current in closed:
+                continue
+            closed.add(current)
+
+            if current == self._end_idx:
+                path_exists = True
+                break
+
+            expanded += 1
+            mask = masks[current]
+
+            # the direction we came from the previous jump point in, always a straight line
+            parent = parents[current]
+            if parent < 0:
+                arrival = 0
+            elif current // w == parent // w:
+                arrival = EAST if current > parent else WEST
+            else:
+                arrival = SOUTH if current > parent else NORTH
+
+            for o, flag in turns[arrival]:
+                n = current + o
+                if not mask & flag or maze[n] == 1:
+                    continue
+
+                if flag == EAST:
+                    jump_point = east_jumps[n]
+                elif flag == WEST:
+                    jump_point = west_jumps[n]
+                else:
+                    jump_point = self._jump_vertical(n, o, maze, west_jumps, east_jumps)
+                if jump_point < 0 or closed_bits[jump_point >> 3] >> (jump_point & 7) & 1:
+                    continue
+
+                # jump points are always in a straight line from the current tile
+                tmp_g_score = g_score[current] + abs(jump_point - current) // (1 if flag & (WEST | EAST) else w)
+                if tmp_g_score < g_score[jump_point]:
+                    if traced and g_score[jump_point] == self._size:
+                        yield jump_point, 3
+                    parents[jump_point] = current
+                    g_score[jump_point] = tmp_g_score
+                    open_set.push(jump_point, tmp_g_score + abs(jump_point % w - end_x) + abs(jump_point // w - end_y))
+
+            if traced and current != self._start_idx:
+                yield current, 4
+
+        path = []
+
+        # backtrack the jump points, and fill in the straight lines between them
+        if path_exists:
+            tile = self._end_idx
+            while tile != self._start_idx:
+                parent = parents[tile]
+                step = (1 if tile > parent else -1) * (1 if tile // w == parent // w else w)
+                while tile != parent:
+                    path.append(tile)
+                    tile -= step
+                    if traced and tile != self._start_idx:
+                        yield tile, 6
+            path.append(self._start_idx)
+            path.reverse()
+
+        # finally, make sure start and end tiles get the correct color
+        if traced:
+            yield self._start_idx, -1
+            yield self._end_idx, -2
+
+        return path, expanded
+
+    def search(self, maze, trace=None):
+        """
+        Run the search to completion, see _search_steps.
+
+        :param maze: color buffer of the grid
+        :param trace: optional list, if given every (idx, color) step of the search is appended to it
+        :return: tuple on the form (path, expanded)
+        """
+        return run_search(self._search_steps(maze, trace is not None), trace)
+
+    def jump_point_search(self, grid):
+        """
+        Find the shortest path in the maze using Jump Point Search. The steps are yielded while the search
+        runs.
+
+        :param grid: Grid instance
+        :return: yields a tuple on the form (idx, color)
+        """
+        yield from self._search_steps(grid.colors, True)
@@ -0,0 +1,131 @@
+"""
+Keyframes of the color buffer of a grid, so a replay can jump to any position by restoring the nearest keyframe and
+applying the few events after it, instead of every event from the start (see core.maze.trace).
+
+The color buffer of a keyframe is split into pages of PAGE_TILES tiles. A page that is equal to the same page of the
+previous keyframe is shared with it rather than copied, so keyframes taken while a search only changes a small part of
+the maze cost little more than the pages it touched. The memory of the keyframes is bounded, the least recently used
+keyframes are dropped first.
+"""
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+
+import numpy as np
+
+# number of tiles per page
+PAGE_TILES = 4096
+# default memory limit of the keyframes of one trace in bytes
+MAX_KEYFRAME_BYTES = 64 << 20
+
+
+class KeyframeCache:
+    def __init__(self, size, max_bytes=MAX_KEYFRAME_BYTES):
+        """
+        Initialize a new KeyframeCache instance.
+
+        :param size: number of tiles of the grid
+        :param max_bytes: memory limit of the pages of the keyframes, the least recently used keyframes are dropped
+        once it is exceeded. The most recent keyframe is always kept.
+        """
+        self.size = size
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+
+        # keyframe position -> tuple of pages, in the order they were last used, and the positions in sorted order
+        self.__keyframes = OrderedDict()
+        self.__positions = []
+        # id of a page -> [page, number of keyframes using it]
+        self.__pages = {}
+
+    def __len__(self):
+        return len(self.__keyframes)
+
+    def __contains__(self, position):
+        return position in self.__keyframes
+
+    def add(self, position, colors):
+        """
+        Take a keyframe of a color buffer. Pages equal to those of the closest earlier keyframe are shared with it.
+
+        :param position: position of the replay the color buffer belongs to
+        :param colors: numpy int8 array, the color buffer
+        :return: None
+        """
+        if position in self.__keyframes:
+            return
+
+        i = bisect_left(self.__positions, position)
+        previous = self.__keyframes[self.__positions[i - 1]] if i else None
+
+        pages = []
+        for n, start in enumerate(range(0, self.size, PAGE_TILES)):
+            page = colors[start:start + PAGE_TILES]
+            if previous is not None and np.array_equal(page, np.frombuffer(previous[n], dtype=np.int8)):
+                page = previous[n]
+            else:
+                page = page.tobytes()
+            self._ref(page)
+            pages.append(page)
+
+        self.__keyframes[position] = tuple(pages)
+        insort(self.__positions, position)
+
+        while self.nbytes > self.max_bytes and len(self.__keyframes) > 1:
+            self._evict()
+
+    def _ref(self, page):
+        """
+        Count a use of a page.
+
+        :param page: bytes of the page
+        :return: None
+        """
+        entry = self.__pages.get(id(page))
+        if entry is None:
+            self.__pages[id(page)] = [page, 1]
+            self.nbytes += len(page)
+        else:
+            entry[1] += 1
+
+    def _evict(self):
+        """
+        Drop the least recently used keyframe, and the pages no other keyframe uses.
+
+        :return: None
+        """
+        position, pages = self.__keyframes.popitem(last=False)
+        del self.__positions[bisect_left(self.__positions, position)]
+
+        for page in pages:
+            entry = self.__pages[id(page)]
+            entry[1] -= 1
+            if not entry[1]:
+                del self.__pages[id(page)]
+                self.nbytes -= len(page)
+
+    def nearest(self, position):
+        """
+        Find the keyframes closest to a position.
+
+        :param position: position of the replay
+        :return: tuple on the form (before, after), the positions of the closest keyframes at or before and at or
+        after the position, None where there is none
+        """
+        positions = self.__positions
+        i = bisect_right(positions, position)
+        before = positions[i - 1] if i else None
+        j = bisect_left(positions, position)
+        after = positions[j] if j < len(positions) else None
+        return before, after
+
+    def restore(self, position, colors):
+        """
+        Copy a keyframe into a color buffer.
+
+        :param position: position of the keyframe
+        :param colors: numpy int8 array, the color buffer to write to
+        :return: None
+        """
+        pages = self.__keyframes[position]
+        self.__keyframes.move_to_end(position)
+        colors[:] = np.frombuffer(b''.join(pages), dtype=np.int8)
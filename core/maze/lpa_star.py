@@ -0,0 +1,161 @@
+from heapq import heappush, heappop
+
+from core.maze.a_star import AStar
+from core.maze.state import index_array
+
+
+class LPAStar(AStar):
+    def __init__(self, *args, **kwargs):
+        """
+        Initialize a new LPAStar (Lifelong Planning A*) instance. Unlike the other solvers, the search state is kept
+        between runs: after walls are added or removed, update_tile repairs the state locally, and the next call to
+        compute_shortest_path only revisits the tiles whose distance from the start actually changed.
+
+        See AStar for the parameters.
+        """
+        super().__init__(*args, **kwargs)
+
+        # no path can be longer than the number of tiles, so size + 1 serves as infinity
+        self._inf = self._size + 1
+        self._maze = None
+        self._g = None
+        self._rhs = None
+        self._heap = []
+
+    def _key(self, i):
+        """
+        Compute the priority of a tile, on the form (f_score, g_score) where g_score is the smallest of g and rhs.
+
+        :param i: index of the tile
+        :return: priority tuple
+        """
+        g = min(self._g[i], self._rhs[i])
+        return g + self.h(i, self._end_idx), g
+
+    def initialize(self, maze):
+        """
+        Reset the search state. Must be called before the first compute_shortest_path, and whenever most of the maze
+        has changed (e.g. it was cleared or regenerated).
+
+        :param maze: color buffer of the grid, kept as a reference so wall changes can be read by update_tile
+        :return: None
+        """
+        self._maze = maze
+
+        # g is the distance found so far, rhs is the one step lookahead distance based on the neighbours' g
+        self._g = index_array(self._size, self._inf)
+        self._rhs = index_array(self._size, self._inf)
+        self._rhs[self._start_idx] = 0
+
+        self._heap = [(*self._key(self._start_idx), self._start_idx)]
+
+    def _update_vertex(self, i):
+        """
+        Recompute the rhs value of a tile from its neighbours, and add it to the priority queue if it became
+        locally inconsistent (g != rhs).
+
+        :param i: index of the tile
+        :return: None
+        """
+        g, rhs, maze = self._g, self._rhs, self._maze
+
+        if i != self._start_idx:
+            best = self._inf
+            if maze[i] != 1:
+                for o in self._topology.offsets[self._topology.masks[i]]:
+                    if maze[i + o] != 1 and g[i + o] + 1 < best:
+                        best = g[i + o] + 1
+            rhs[i] = best
+
+        # the queue may hold outdated entries of this tile, they are skipped when popped
+        if g[i] != rhs[i]:
+            heappush(self._heap, (*self._key(i), i))
+
+    def update_tile(self, i):
+        """
+        Repair the search state after the tile changed between wall and walkable. Call compute_shortest_path
+        afterwards to update the shortest path.
+
+        :param i: index of the changed tile
+        :return: None
+        """
+        self._update_vertex(i)
+        for o in self._topology.offsets[self._topology.masks[i]]:
+            self._update_vertex(i + o)
+
+    def compute_shortest_path(self, trace=None):
+        """
+        Process locally inconsistent tiles until the shortest path to the end tile is known.
+
+        :param trace: optional list, if given every processed tile is appended to it as (idx, 4)
+        :return: number of tiles processed
+        """
+        emit = trace.append if trace is not None else None
+        g, rhs, heap, end = self._g, self._rhs, self._heap, self._end_idx
+        masks, offsets = self._topology.masks, self._topology.offsets
+        expanded = 0
+
+        while heap and ((heap[0][0], heap[0][1]) < self._key(end) or rhs[end] != g[end]):
+            k1, k2, current = heappop(heap)
+
+            # skip outdated entries, every inconsistent tile has an entry with its current key in the queue
+            if g[current] == rhs[current] or (k1, k2) != self._key(current):
+                continue
+
+            expanded += 1
+            if g[current] > rhs[current]:
+                # the tile got closer to the start, this may improve its neighbours
+                g[current] = rhs[current]
+            else:
+                # the tile got further away from the start (or was walled off), reevaluate it along with its neighbours
+                g[current] = self._inf
+                self._update_vertex(current)
+
+            for o in offsets[masks[current]]:
+                self._update_vertex(current + o)
+
+            if emit and current != self._start_idx:
+                emit((current, 4))
+
+        return expanded
+
+    def get_path(self):
+        """
+        Get the shortest path found by the last compute_shortest_path, by walking from the end tile to the neighbour
+        with the lowest g value until we reach the start.
+
+        :return: list of tile indexes from start to end, empty if no path exists
+        """
+        if self._g[self._end_idx] >= self._inf:
+            return []
+
+        g, masks, offsets, maze = self._g, self._topology.masks, self._topology.offsets, self._maze
+        path = [self._end_idx]
+        tile = self._end_idx
+
+        while tile != self._start_idx:
+            tile = min((tile + o for o in offsets[masks[tile]] if maze[tile + o] != 1), key=g.__getitem__)
+            path.append(tile)
+
+        path.reverse()
+        return path
+
+    def search(self, maze, trace=None):
+        """
+        Run LPA* from scratch to completion. The color buffer is only read.
+
+        :param maze: color buffer of the grid
+        :param trace: optional list, if given every (idx, color) step of the search is appended to it
+        :return: tuple on the form (path, expanded), where path is the list of tile indexes from start to end (empty
+        if no path exists) and expanded is the number of tiles processed.
+        """
+        self.initialize(maze)
+        expanded = self.compute_shortest_path(trace)
+        path = self.get_path()
+
+        if trace is not None:
+            trace.extend((tile, 6) for tile in path[1:-1])
+            trace.append((self._start_idx, -1))
+            trace.append((self._end_idx, -2))
+
+        return path, expanded
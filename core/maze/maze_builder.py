@@ -1,20 +1,37 @@
 import random
+from array import array
 from collections import deque
-from random import shuffle, randint
+from itertools import permutations
+
+import numpy as np
 
 import gui.constants as c
+from core.maze.generators import kruskal_maze, prim_maze, eller_maze, build_eller_maze
+from core.maze.grid import Grid
+from core.maze.state import BitSet
+from core.maze.topology import get_topology
+
+# every order in which the (up to four) neighbours of a tile can be visited
+NEIGHBOUR_ORDERS = tuple(permutations(range(4)))
 
-# Uncomment to replicate random _maze generations
-# random.seed(0)
+# names of the maze generation algorithms, see MazeBuilder.generate
+GENERATORS = ('dfs', 'kruskal', 'prim', 'eller')
 
 
 class MazeBuilder:
 
-    def __init__(self):
+    def __init__(self, box_width=None, box_height=None, seed=None):
         """
         Create a new MazeBuilder instance, which handles maze initialization and random generation.
+
+        :param box_width: number of columns in the maze, defaults to c.MAZE_WIDTH, or the number of columns that fit
+        in c.WIDTH if it is not set
+        :param box_height: number of rows in the maze, defaults to c.MAZE_HEIGHT, or the number of rows that fit in
+        c.HEIGHT if it is not set
+        :param seed: seed of the random mazes, an int, a random.Random or a numpy Generator. Builders created with the
+        same seed generate the same sequence of mazes. None gives different mazes every run.
         """
-        self._maze = []
+        self._grid = None
         self._start_pos = (0, 0)
         self._end_pos = (0, 0)
 
@@ -22,8 +39,25 @@ class MazeBuilder:
         self._end_idx = 0
         self._size = 0
 
-        self._box_width = c.WIDTH // c.BOX_SIZE
-        self._box_height = c.HEIGHT // c.BOX_SIZE
+        self._box_width = box_width if box_width is not None else c.MAZE_WIDTH or c.WIDTH // c.BOX_SIZE
+        self._box_height = box_height if box_height is not None else c.MAZE_HEIGHT or c.HEIGHT // c.BOX_SIZE
+        self._topology = get_topology(self._box_width, self._box_height)
+
+        # the seed only reproduces the first maze generated by the builder, whose seed is recorded in its trace (see
+        # core.maze.trace). maze_seed is the seed of the current maze, None if it can not be reproduced from a seed.
+        self.seed = seed if isinstance(seed, int) else None
+        self.maze_seed = None
+        self._generated = False
+        if isinstance(seed, random.Random):
+            seed = seed.getrandbits(128)
+        self._rng = np.random.default_rng(seed)
+
+        # the (offset, direction) pairs of the neighbours given by a mask, in every order of NEIGHBOUR_ORDERS. The
+        # neighbours of tile i in order k are found at ordered_directions[masks[i] * len(NEIGHBOUR_ORDERS) + k].
+        all_directions = self._topology.directions[15]
+        self._ordered_directions = tuple(
+            tuple(all_directions[n] for n in order if all_directions[n] in self._topology.directions[mask])
+            for mask in range(16) for order in NEIGHBOUR_ORDERS)
 
         self.initialize_maze()
 
@@ -37,56 +71,44 @@ class MazeBuilder:
 
     def initialize_maze(self):
         """
-        Creates a 2d list where each element in the list contains its x and y position, along with its current color
-        code which signifies what color it should be. => Each element in the list is on the form [x, y, color].
+        Creates the Grid holding the color code of every tile, and computes the start and end tiles of the maze.
 
         :return: None
         """
-        # instantiate the maze in a 2D list, where each element contains x_pos, y_pos and color_code
-        self._maze = [[x + c.MAZE_LOC[0], y + c.MAZE_LOC[1], 0] for y in range(0, c.HEIGHT, c.BOX_SIZE) for x in
-                      range(0, c.WIDTH, c.BOX_SIZE)]
+        # the config is not loaded when running without the gui, in which case each tile is one pixel
+        self._grid = Grid(self._box_width, self._box_height, c.BOX_SIZE or 1, c.MAZE_LOC)
 
-        self._size = len(self._maze)
+        self._size = self._grid.size
 
         half_len = self._size // 2
 
         # compute the start and end index of the maze
         self._start_idx = half_len if self._box_height % 2 == 0 else half_len - self._box_width // 2
         self._end_idx = self._start_idx + self._box_width - 1
-        self._maze[self._start_idx][2] = -1
-        self._maze[self._end_idx][2] = -2
+        self._grid.set_endpoints(self._start_idx, self._end_idx)
 
         # compute the start and end position
-        self._start_pos = (self._maze[self._start_idx][0], self._maze[self._start_idx][1])
-        self._end_pos = (self._maze[self._end_idx][0], self._maze[self._end_idx][1])
+        self._start_pos, self._end_pos = self._grid.get_endpoints()
 
     def get_maze(self):
         """
-        Get the active maze list.
+        Get the active maze grid.
 
-        :return: None
+        :return: Grid instance
         """
-        return self._maze
+        return self._grid
 
-    def get_unvisited_neighbours(self, i, visited):
+    def _new_carving_grid(self):
         """
-        Get all the neighbours of a tile.
+        Create a private grid filled with walls for a maze generator to carve. The generators run in a worker thread
+        while the main thread draws the shared grid, so they never write to it, the carved tiles are only yielded and
+        applied to the shared grid by the consumer of the events.
 
-        :param i: index of the current tile
-        :param visited: visited array
-        :return: list of unvisited neighbours, where each element contains [index, direction]
+        :return: Grid instance
         """
-        neighbours = []
-        if i - 1 >= 0 and i % self._box_width != 0 and not visited[i - 1]:  # west
-            neighbours.append([i - 1, -2])
-        if i + 1 < self._size and (i + 1) % self._box_width != 0 and not visited[i + 1]:  # east
-            neighbours.append([i + 1, -1])
-        if i - self._box_width >= 0 and not visited[i - self._box_width]:  # north
-            neighbours.append([i - self._box_width, 1])
-        if i + self._box_width < self._size and not visited[i + self._box_width]:  # south
-            neighbours.append([i + self._box_width, 2])
-
-        return neighbours
+        grid = Grid(self._box_width, self._box_height, colors=array('b', [1]) * self._size)
+        grid.set_endpoints(self._start_idx, self._end_idx)
+        return grid
 
     def process_neighbour(self, ci, ni, maze, visited, stack):
         """
@@ -97,7 +119,7 @@ class MazeBuilder:
         :param ci: current index of the tile
         :param ni: new index to check weather valid neighbour or not
         :param maze: maze list
-        :param visited: visited list
+        :param visited: BitSet of the visited tiles
         :param stack: dfs stack
         :return: None
         """
@@ -105,11 +127,11 @@ class MazeBuilder:
             # If the new tile forms a 2x2 white square, mark it as visited and block it
             if ci + self._box_width < self._size and maze[ni + self._box_width] <= 0 \
                     and maze[ci + self._box_width] <= 0:
-                visited[ni] = True
+                visited.add(ni)
                 maze[ni] = 1
             # If the new tile forms a 2x2 white square, mark it as visited and block it
             elif ci - self._box_width >= 0 and maze[ni - self._box_width] <= 0 and maze[ci - self._box_width] <= 0:
-                visited[ni] = True
+                visited.add(ni)
                 maze[ni] = 1
             # No 2x2 square will be created by the new tile, add it to the stack
             else:
@@ -119,28 +141,28 @@ class MazeBuilder:
         elif ci - ni == -1:  # Going east
             if ni + self._box_width < self._size and maze[ni + self._box_width] <= 0 \
                     and maze[ci + self._box_width] <= 0:
-                visited[ni] = True
+                visited.add(ni)
                 maze[ni] = 1
             elif ni - self._box_width >= 0 and maze[ni - self._box_width] <= 0 and maze[ci - self._box_width] <= 0:
-                visited[ni] = True
+                visited.add(ni)
                 maze[ni] = 1
             else:
                 stack.append(ni)
         elif ci - ni > 0:  # Going north
             if ni - 1 >= 0 and maze[ni - 1] <= 0 and maze[ci - 1] <= 0:
-                visited[ni] = True
+                visited.add(ni)
                 maze[ni] = 1
             elif ci + 1 < self._size and maze[ni + 1] <= 0 and maze[ci + 1] <= 0:
-                visited[ni] = True
+                visited.add(ni)
                 maze[ni] = 1
             else:
                 stack.append(ni)
         else:  # Going south
             if ni + 1 < self._size and maze[ni + 1] <= 0 and maze[ci + 1] <= 0:
-                visited[ni] = True
+                visited.add(ni)
                 maze[ni] = 1
             elif ci - 1 >= 0 and maze[ni - 1] <= 0 and maze[ci - 1] <= 0:
-                visited[ni] = True
+                visited.add(ni)
                 maze[ni] = 1
             else:
                 stack.append(ni)
@@ -160,7 +182,7 @@ class MazeBuilder:
 
         :param i: index of current white tile.
         :param maze: maze list
-        :param visited: visited list
+        :param visited: BitSet of the visited tiles
         :return: None
         """
 
@@ -169,10 +191,10 @@ class MazeBuilder:
         if wi >= 0 and wi % self._box_width != 0 and maze[wi] <= 0:
             vis = False
             if wi - self._box_width >= 0:
-                visited[wi - self._box_width] = True
+                visited.add(wi - self._box_width)
                 vis = True
             if wi + self._box_width >= 0:
-                visited[wi - self._box_width] = True
+                visited.add(wi - self._box_width)
                 vis = True
             if vis:
                 return
@@ -181,10 +203,10 @@ class MazeBuilder:
         if ei < self._size and ei % self._box_width != 0 and maze[ei] <= 0:
             vis = False
             if ei - self._box_width >= 0:
-                visited[ei - self._box_width] = True
+                visited.add(ei - self._box_width)
                 vis = True
             if wi + self._box_width >= 0:
-                visited[ei - self._box_width] = True
+                visited.add(ei - self._box_width)
                 vis = True
             if vis:
                 return
@@ -194,10 +216,10 @@ class MazeBuilder:
         if si >= 0 and maze[si] <= 0:
             vis = False
             if si - 1 >= 0 and (si - 1) % self._box_width != 0:
-                visited[si - 1] = True
+                visited.add(si - 1)
                 vis = True
             if si + 1 < self._size and si % self._box_width != 0:
-                visited[si + 1] = True
+                visited.add(si + 1)
                 vis = True
             if vis:
                 return
@@ -207,10 +229,10 @@ class MazeBuilder:
         if ni < self._size and maze[ni] <= 0:
             vis = False
             if ni - 1 >= 0 and (ni - 1) % self._box_width != 0:
-                visited[ni - 1] = True
+                visited.add(ni - 1)
                 vis = True
             if ni + 1 < self._size and ni % self._box_width != 0:
-                visited[ni + 1] = True
+                visited.add(ni + 1)
                 vis = True
             if vis:
                 return
@@ -218,55 +240,83 @@ class MazeBuilder:
     def generate_random_maze(self):
         """
         Uses the principles of depth-first-search with randomized neighbour selection to generate an organic looking
-        maze. The dfs is implemented using a stack (collections deque).
+        maze, see _dfs_maze. The maze is carved on a private grid, see _new_carving_grid.
 
         :return: yields the wall to remove every time next() is called on this function.
         """
-        # Create a list containing the color code of the _maze tiles
-        maze = [box[2] if box[2] < 0 else 1 for box in self._maze]
-        # Create a list to remember which vertices (or tiles) have already been visited.
-        visited = [False for i in range(self._size)]
+        yield from self._dfs_maze(self._new_carving_grid())
+
+    def _dfs_maze(self, grid, animated=True):
+        """
+        Generate a maze with randomized depth-first-search. The dfs is implemented using a stack (collections deque).
+
+        :param grid: Grid instance filled with walls, carved in place
+        :param animated: if False, the tiles are carved without being yielded, only the tiles connecting the end tile
+        are
+        :return: yields a tuple on the form (idx, increments) every time a tile is carved
+        """
+        maze = grid.colors
+        # Create a bitset to remember which vertices (or tiles) have already been visited. The hot loop below reads
+        # its bits directly, saving a method call per lookup.
+        visited = BitSet(self._size)
+        visited_bits = visited.bits
         stack = deque()
         sx = self._start_idx
 
         stack.append(sx)
 
+        # Every tile is expanded at most once, so all random choices are drawn up front: the order in which to visit
+        # the neighbours of each tile, and whether to keep walking the same direction as last time (70% chance).
+        # They are stored as bytes, one byte per tile rather than an 8 byte reference in a list.
+        orders = self._rng.integers(0, len(NEIGHBOUR_ORDERS), self._size, dtype=np.uint8).tobytes()
+        same_direction = (self._rng.integers(0, 101, self._size, dtype=np.uint8) <= 70).tobytes()
+
+        masks, ordered_directions, num_orders = self._topology.masks, self._ordered_directions, len(NEIGHBOUR_ORDERS)
+        process_neighbour, backtrack_visitors = self.process_neighbour, self._backtrack_visitors
+
         # Remember the direction we came from
         prev_dir = 0
 
         # counter variable to keep track of how many increments has been executed (reset on every yield)
         increments = 1
 
-        while len(stack) != 0:
+        while stack:
             cur = stack.pop()
-            if not visited[cur]:
-                self._backtrack_visitors(cur, maze, visited)
+            if not visited_bits[cur >> 3] >> (cur & 7) & 1:
+                backtrack_visitors(cur, maze, visited)
 
                 # start and end tiles must not be yielded
                 if maze[cur] >= 0:
                     maze[cur] = 0
-                    yield cur, increments
+                    if animated:
+                        yield cur, increments
 
                 # reset increments after yield
                 increments = 1
 
-                neighbours = self.get_unvisited_neighbours(cur, visited)
-                shuffle(neighbours)
-                # Go the same direction as last time
-                if randint(0, 100) <= 70:  # We want a 70% chance to walk the same path as last time
-                    for i, n in enumerate(neighbours):
-                        if n[1] == prev_dir:
-                            neighbours.append(neighbours.pop(i))
-                        increments += 1
-                        break
+                # the unvisited neighbours in random order, where each element contains [index, direction]
+                neighbours = [[cur + o, direction] for o, direction in
+                              ordered_directions[masks[cur] * num_orders + orders[cur]]
+                              if not visited_bits[cur + o >> 3] >> (cur + o & 7) & 1]
+
+                # Go the same direction as last time, by moving it to the end of the list so it is added to the stack
+                # last. Only the first neighbour is considered.
+                if same_direction[cur] and neighbours:
+                    if neighbours[0][1] == prev_dir:
+                        neighbours.append(neighbours.pop(0))
+                    increments += 1
 
                 # Iterate over the neighbours and add them to the stack if they are unvisited
                 for n in neighbours:
                     increments += 1
-                    self.process_neighbour(cur, n[0], maze, visited, stack)
+                    process_neighbour(cur, n[0], maze, visited, stack)
 
                 prev_dir = neighbours[-1][1] if neighbours else prev_dir
-                visited[cur] = True
+                visited_bits[cur >> 3] |= 1 << (cur & 7)
+
+        # process_neighbour may have blocked the start or end tile, which only served as a wall for the 2x2 square
+        # checks above. Give them back their color codes.
+        grid.set_endpoints(self._start_idx, self._end_idx)
 
         # Check to see that we have a path going from the start to the end of the _maze, if not, the issue is resolved
         # by going east until we encounter a path.
@@ -274,10 +324,67 @@ class MazeBuilder:
                 maze[self._end_idx - self._box_width] == 1:
             idx = self._end_idx - 1
             while maze[idx] != 0:
-                maze[idx] = -2
+                maze[idx] = 0
                 yield idx, 1
                 idx -= 1
 
+    def generate(self, algorithm='dfs'):
+        """
+        Generate a random maze with the given algorithm, one tile at a time. The maze is carved on a private grid, the
+        grid of the builder is left untouched; the consumer applies the carved tiles to a grid filled with walls.
+
+        :param algorithm: name of the algorithm, one of GENERATORS. 'dfs' is generate_random_maze, the others are
+        found in core.maze.generators and generate perfect mazes.
+        :return: yields a tuple on the form (idx, increments) every time a tile is carved
+        """
+        if algorithm not in GENERATORS:
+            raise ValueError(f"unknown maze generator '{algorithm}', expected one of {', '.join(GENERATORS)}")
+
+        self._start_maze()
+        if algorithm == 'dfs':
+            return self.generate_random_maze()
+
+        # generators are lazy, the private grid is only allocated once the first tile is requested
+        def generator():
+            yield from {'kruskal': kruskal_maze, 'prim': prim_maze, 'eller': eller_maze}[algorithm](
+                self._new_carving_grid(), self._rng)
+        return generator()
+
+    def _start_maze(self):
+        """
+        Set the seed of the maze about to be generated, only the first maze of the builder is reproduced by its seed.
+
+        :return: None
+        """
+        self.maze_seed = None if self._generated else self.seed
+        self._generated = True
+
+    def build(self, algorithm='dfs'):
+        """
+        Generate a random maze at once, without animating it. For the same seed, the maze is the same as the one
+        generated tile by tile with generate.
+
+        :param algorithm: name of the algorithm, one of GENERATORS
+        :return: Grid instance holding the maze
+        """
+        if algorithm not in GENERATORS:
+            raise ValueError(f"unknown maze generator '{algorithm}', expected one of {', '.join(GENERATORS)}")
+
+        self._start_maze()
+        if algorithm == 'eller':
+            # the rows can be copied straight into the grid
+            build_eller_maze(self._grid, self._rng)
+        else:
+            # the tiles are carved straight into the grid, only the few tiles connecting the endpoints are yielded
+            self._grid.fill(1)
+            if algorithm == 'dfs':
+                carved = self._dfs_maze(self._grid, animated=False)
+            else:
+                carved = {'kruskal': kruskal_maze, 'prim': prim_maze}[algorithm](self._grid, self._rng, animated=False)
+            for _ in carved:
+                pass
+        return self._grid
+
     def export_maze(self):
         """
         export the relevant attributes of the generated _maze to be used by other algorithms.
@@ -0,0 +1,252 @@
+"""
+Binary maze file format. A file starts with a fixed size header, followed by the tiles in one of two encodings:
+
+* COLORS: one signed byte per tile holding its color code, exactly like the color buffer of a Grid. These files are
+  opened with mmap and used as the color buffer directly, so a maze is never read into memory as a whole, the
+  operating system only pages in the parts the solvers and the gui actually look at.
+* BITMAP: one bit per tile, set for walls, eight times smaller. These files are unpacked into memory when opened.
+
+Header (little endian): magic b'AVMZ', version (u8), encoding (u8), reserved (u16), box_width (u32), box_height (u32),
+start_idx (u64), end_idx (u64), seed (i64, -1 if unknown).
+"""
+import mmap
+import struct
+from array import array
+from collections import deque
+
+import numpy as np
+
+from core.maze.grid import Grid
+
+MAGIC = b'AVMZ'
+VERSION = 1
+
+COLORS = 0
+BITMAP = 1
+
+HEADER = struct.Struct('<4sBBHIIQQq')
+
+
+class MazeFileError(ValueError):
+    pass
+
+
+class MazeHeader:
+    def __init__(self, box_width, box_height, start_idx, end_idx, seed=None, encoding=COLORS):
+        """
+        Initialize a new MazeHeader instance, describing the maze stored in a file.
+
+        :param box_width: number of columns in the maze
+        :param box_height: number of rows in the maze
+        :param start_idx: index of the start tile
+        :param end_idx: index of the end tile
+        :param seed: seed the maze was generated with, None if unknown
+        :param encoding: COLORS or BITMAP
+        """
+        self.box_width = box_width
+        self.box_height = box_height
+        self.size = box_width * box_height
+        self.start_idx = start_idx
+        self.end_idx = end_idx
+        self.seed = seed
+        self.encoding = encoding
+
+    def pack(self):
+        """
+        Encode the header.
+
+        :return: bytes of length HEADER.size
+        """
+        seed = -1 if self.seed is None else self.seed
+        return HEADER.pack(MAGIC, VERSION, self.encoding, 0, self.box_width, self.box_height, self.start_idx,
+                           self.end_idx, seed)
+
+    @staticmethod
+    def unpack(data):
+        """
+        Decode a header.
+
+        :param data: the first HEADER.size bytes of a maze file
+        :return: MazeHeader instance
+        """
+        if len(data) < HEADER.size:
+            raise MazeFileError("file is too short to be a maze file")
+
+        magic, version, encoding, _, box_width, box_height, start_idx, end_idx, seed = HEADER.unpack(data)
+        if magic != MAGIC:
+            raise MazeFileError("not a maze file")
+        if version != VERSION:
+            raise MazeFileError(f"unsupported maze file version {version}")
+        if encoding not in (COLORS, BITMAP):
+            raise MazeFileError(f"unknown maze file encoding {encoding}")
+
+        return MazeHeader(box_width, box_height, start_idx, end_idx, None if seed < 0 else seed, encoding)
+
+    def data_size(self):
+        """
+        Get the number of bytes of tile data following the header.
+
+        :return: number of bytes
+        """
+        return self.size if self.encoding == COLORS else (self.size + 7) // 8
+
+
+def read_header(path):
+    """
+    Read the header of a maze file without reading the tiles.
+
+    :param path: path of the maze file
+    :return: MazeHeader instance
+    """
+    with open(path, 'rb') as file:
+        return MazeHeader.unpack(file.read(HEADER.size))
+
+
+def save_maze(path, grid, seed=None, encoding=COLORS):
+    """
+    Write a grid to a maze file.
+
+    :param path: path of the maze file
+    :param grid: Grid instance
+    :param seed: seed the maze was generated with, None if unknown
+    :param encoding: COLORS to store the color codes, BITMAP to only store the walls
+    :return: None
+    """
+    header = MazeHeader(grid.box_width, grid.box_height, grid.start_idx, grid.end_idx, seed, encoding)
+
+    with open(path, 'wb') as file:
+        file.write(header.pack())
+        if encoding == COLORS:
+            file.write(grid.colors)
+        else:
+            file.write(grid.get_walls().bits)
+
+
+def _connect_endpoint(window, first, endpoint):
+    """
+    Connect an endpoint to the maze like core.maze.generators.connect_endpoints: if all its neighbours are walls, its
+    row is carved from it towards the middle of the maze until an open tile is reached.
+
+    :param window: deque of the rows around the endpoint, as int8 numpy arrays
+    :param first: row number of the first row in the window
+    :param endpoint: tuple on the form (row, column, color code, step towards the middle)
+    :return: None
+    """
+    y, x, _, step = endpoint
+    row = window[y - first]
+    w = len(row)
+
+    neighbours = [row[n] for n, inside in ((x - 1, x > 0), (x + 1, x < w - 1)) if inside]
+    neighbours += [window[i][x] for i in (y - 1 - first, y + 1 - first) if 0 <= i < len(window)]
+    if all(n == 1 for n in neighbours):
+        x += step
+        while 0 <= x < w and row[x] == 1:
+            row[x] = 0
+            x += step
+
+
+def _endpoint_rows(header, rows):
+    """
+    Set the start and end tiles in a stream of rows and connect them to the maze, see _connect_endpoint. Whether an
+    endpoint is connected depends on the rows above and below it, so the rows are held back until the row below the
+    endpoint is read, and not longer.
+
+    :param header: MazeHeader instance describing the maze
+    :param rows: iterable of rows, see write_maze_rows
+    :return: yields the rows as int8 numpy arrays
+    """
+    w = header.box_width
+    start = (header.start_idx // w, header.start_idx % w, -1, 1)
+    end = (header.end_idx // w, header.end_idx % w, -2, -1)
+
+    # connect_endpoints connects the start first, which matters when the end lies next to the row carved from the
+    # start. Otherwise the endpoints are connected in the order of their rows, so the rows between them are not held.
+    pending = [start, end] if start[0] <= end[0] + 1 else [end, start]
+    # rows read but not yielded yet, starting at row first
+    window, first = deque(), 0
+
+    for y, row in enumerate(rows):
+        row = np.frombuffer(row, dtype=np.int8).copy()
+        for endpoint in (start, end):
+            if endpoint[0] == y:
+                row[endpoint[1]] = endpoint[2]
+        window.append(row)
+
+        while pending and pending[0][0] < y:
+            _connect_endpoint(window, first, pending.pop(0))
+
+        # the rows above the pending endpoints are still needed
+        keep = min([endpoint[0] - 1 for endpoint in pending] + [y + 1])
+        while first < keep:
+            yield window.popleft()
+            first += 1
+
+    # endpoints in the last row have no row below them
+    for endpoint in pending:
+        _connect_endpoint(window, first, endpoint)
+    yield from window
+
+
+def write_maze_rows(path, header, rows):
+    """
+    Write a maze file one row of tiles at a time, e.g. from core.maze.generators.eller_rows, so mazes larger than what
+    fits in memory can be created. Like core.maze.generators.connect_endpoints, the start and end tiles are connected
+    to the maze by carving their row from them towards the middle of the maze until an open tile is reached, if they
+    are walled in. Only the rows around the endpoints are held in memory while that is decided.
+
+    :param path: path of the maze file
+    :param header: MazeHeader instance describing the maze
+    :param rows: iterable of header.box_height rows, each a bytes-like object of header.box_width wall flags (1 for a
+    wall, 0 for an open tile)
+    :return: None
+    """
+    # bits of the previous rows that did not fill a whole byte yet
+    pending = np.zeros(0, dtype=bool)
+
+    with open(path, 'wb') as file:
+        file.write(header.pack())
+
+        # the start and end tiles keep their color codes, and are connected to the maze
+        for row in _endpoint_rows(header, rows):
+            if header.encoding == COLORS:
+                file.write(row.tobytes())
+            else:
+                pending = np.concatenate((pending, row == 1))
+                full = len(pending) - len(pending) % 8
+                file.write(np.packbits(pending[:full], bitorder='little').tobytes())
+                pending = pending[full:]
+
+        if len(pending):
+            file.write(np.packbits(pending, bitorder='little').tobytes())
+
+
+def open_maze(path, writable=False):
+    """
+    Open a maze file as a Grid. COLORS files are memory mapped, and the color buffer of the grid is a view of the
+    mapping, so the tiles are read from the file as they are used. BITMAP files are unpacked into memory.
+
+    :param path: path of the maze file
+    :param writable: if True, changes to the color buffer of a COLORS file are written back to the file
+    :return: tuple on the form (grid, header)
+    """
+    with open(path, 'r+b' if writable else 'rb') as file:
+        header = MazeHeader.unpack(file.read(HEADER.size))
+        if HEADER.size + header.data_size() > file.seek(0, 2):
+            raise MazeFileError("maze file is truncated")
+
+        if header.encoding == COLORS:
+            # the mapping stays valid after the file is closed
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+            colors = memoryview(mapping)[HEADER.size:HEADER.size + header.size].cast('b')
+        else:
+            bits = np.memmap(file, dtype=np.uint8, mode='r', offset=HEADER.size, shape=(header.data_size(),))
+            colors = array('b', np.unpackbits(bits, count=header.size, bitorder='little').tobytes())
+
+    grid = Grid(header.box_width, header.box_height, colors=colors)
+    if header.encoding == BITMAP or writable:
+        grid.set_endpoints(header.start_idx, header.end_idx)
+    else:
+        # a read only mapping can not be written to, the endpoints were stored with their color codes
+        grid.start_idx, grid.end_idx = header.start_idx, header.end_idx
+
+    return grid, header
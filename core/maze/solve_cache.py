@@ -0,0 +1,90 @@
+"""
+Cache of solve results, so solving the same maze with the same algorithm again returns right away. Results are keyed
+by a hash of the walls of the maze rather than by the grid instance, so the tiles colored by earlier searches do not
+matter, and a result is never returned for a maze with other walls. The gui clears the cache whenever the maze is
+edited, cleared or loaded (see MazeHandler._edit), so it only holds the searches of the mazes generated since then.
+"""
+import hashlib
+from collections import OrderedDict
+
+# default memory limit of a cache in bytes
+MAX_CACHE_BYTES = 64 << 20
+
+
+def solve_key(grid, algorithm, *options):
+    """
+    Get the cache key of solving a maze.
+
+    :param grid: Grid instance
+    :param algorithm: name of the algorithm
+    :param options: any other hashable values the result depends on
+    :return: hashable key
+    """
+    walls = hashlib.blake2b(grid.get_walls().bits, digest_size=16).digest()
+    return (walls, grid.box_width, grid.start_idx, grid.end_idx, algorithm, *options)
+
+
+class SolveCache:
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        """
+        Initialize a new SolveCache instance.
+
+        :param max_bytes: memory limit of the cached results, the least recently used results are dropped once it is
+        exceeded
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        # key -> (result, size in bytes), in the order they were last used
+        self.__results = OrderedDict()
+
+    def __len__(self):
+        return len(self.__results)
+
+    def get(self, key):
+        """
+        Get a cached result.
+
+        :param key: key of the result, see solve_key
+        :return: the result, None if it is not cached
+        """
+        entry = self.__results.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.__results.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, result, nbytes):
+        """
+        Add a result to the cache. Results larger than the memory limit are not cached.
+
+        :param key: key of the result, see solve_key
+        :param result: the result
+        :param nbytes: estimated size of the result in bytes
+        :return: None
+        """
+        if nbytes > self.max_bytes:
+            return
+
+        previous = self.__results.pop(key, None)
+        if previous is not None:
+            self.nbytes -= previous[1]
+
+        self.__results[key] = (result, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            self.nbytes -= self.__results.popitem(last=False)[1][1]
+
+    def clear(self):
+        """
+        Drop every cached result, e.g. after the maze was edited.
+
+        :return: None
+        """
+        self.__results.clear()
+        self.nbytes = 0
@@ -0,0 +1,112 @@
+import sys
+import time
+
+from core.maze.a_star import AStar
+from core.maze.bfs import BFS
+from core.maze.jps import JumpPointSearch
+from core.maze.lpa_star import LPAStar
+from core.maze.solve_cache import solve_key
+
+# algorithm name -> (solver class, search method). The names match the text_table indexes used by the gui.
+ALGORITHMS = {
+    'bfs': (BFS, BFS.search_shortest_path),
+    'bi_bfs': (BFS, BFS.search_bidirectional),
+    'a_star': (AStar, AStar.search),
+    'jps': (JumpPointSearch, JumpPointSearch.search),
+    'lpa_star': (LPAStar, LPAStar.search),
+}
+
+
+class SolveResult:
+    def __init__(self, algorithm, path, expanded, elapsed, cpu_time, trace=None):
+        """
+        Initialize a new SolveResult instance.
+
+        :param algorithm: name of the algorithm that produced the result
+        :param path: list of tile indexes from start to end, empty if no path exists
+        :param expanded: number of tiles expanded by the search
+        :param elapsed: wall clock time of the search in seconds
+        :param cpu_time: cpu time of the search in seconds
+        :param trace: list of (idx, color) steps if the search was traced, None otherwise
+        """
+        self.algorithm = algorithm
+        self.path = path
+        self.expanded = expanded
+        self.elapsed = elapsed
+        self.cpu_time = cpu_time
+        self.trace = trace
+
+    @property
+    def path_length(self):
+        """
+        Get the number of steps in the shortest path.
+
+        :return: number of steps from start to end, -1 if no path exists
+        """
+        return len(self.path) - 1
+
+    def get_size(self):
+        """
+        Estimate the memory used by the path and the trace of the result.
+
+        :return: number of bytes
+        """
+        # every element is a reference to an int, and every step of the trace a tuple of two
+        size = sys.getsizeof(self.path) + 28 * len(self.path)
+        if self.trace is not None:
+            size += sys.getsizeof(self.trace) + (sys.getsizeof((0, 0)) + 2 * 28) * len(self.trace)
+        return size
+
+    def __repr__(self):
+        return f"SolveResult({self.algorithm}, path_length={self.path_length}, expanded={self.expanded}, " \
+               f"elapsed={self.elapsed:.6f})"
+
+
+def create_solver(grid, algorithm, frontier=None):
+    """
+    Create the solver instance used to run an algorithm on a grid.
+
+    :param grid: Grid instance
+    :param algorithm: name of the algorithm, see ALGORITHMS
+    :param frontier: frontier class to use instead of the default of the algorithm, see core.maze.frontier
+    :return: solver instance
+    """
+    solver_class = ALGORITHMS[algorithm][0]
+    if frontier is None:
+        return solver_class(grid.start_idx, grid.end_idx, grid.size, grid.box_height, grid.box_width)
+    return solver_class(grid.start_idx, grid.end_idx, grid.size, grid.box_height, grid.box_width, frontier)
+
+
+def solve(grid, algorithm, trace=False, frontier=None, cache=None):
+    """
+    Find the shortest path between the start and end tile of a grid, running the algorithm to completion without
+    animating it. The grid is not modified.
+
+    :param grid: Grid instance
+    :param algorithm: name of the algorithm, see ALGORITHMS
+    :param trace: if True, record every (idx, color) step of the search in the result
+    :param frontier: frontier class to use instead of the default of the algorithm, see core.maze.frontier
+    :param cache: SolveCache instance, if given a result for a maze with the same walls, endpoints and options is
+    returned from the cache, with the timings of the run that produced it. Results must not be modified.
+    :return: SolveResult instance
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm '{algorithm}', expected one of {', '.join(ALGORITHMS)}")
+
+    if cache is not None:
+        key = solve_key(grid, algorithm, trace, frontier.__name__ if frontier is not None else None)
+        result = cache.get(key)
+        if result is None:
+            result = solve(grid, algorithm, trace, frontier)
+            cache.put(key, result, result.get_size())
+        return result
+
+    search = ALGORITHMS[algorithm][1]
+    solver = create_solver(grid, algorithm, frontier)
+    steps = [] if trace else None
+
+    start_time, start_cpu = time.perf_counter(), time.process_time()
+    path, expanded = search(solver, grid.colors, steps)
+    elapsed, cpu_time = time.perf_counter() - start_time, time.process_time() - start_cpu
+
+    return SolveResult(algorithm, path, expanded, elapsed, cpu_time, steps)
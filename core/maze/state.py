@@ -0,0 +1,95 @@
+"""
+Compact containers for the per-tile state of the maze generators and solvers. On large mazes this state, not the
+color buffer, dominates the memory use: an array('l') of parent indexes or distances costs 8 bytes per tile, and a
+bytearray of flags one byte per tile. Flags are therefore packed one bit per tile in a BitSet, and indexes use the
+smallest array type that fits the grid.
+"""
+from array import array
+
+import numpy as np
+
+
+class BitSet:
+    def __init__(self, size, bits=None):
+        """
+        Create a new BitSet instance, one bit per tile backed by a bytearray, where tile i is bit i % 8 of byte i // 8.
+        A BitSet can be indexed like the bytearray of flags it replaces, visited[i] = True and if visited[i]: ... both
+        work, at an eighth of the memory. Hot loops can read self.bits directly to save the method call.
+
+        :param size: number of tiles
+        :param bits: existing bytearray of (size + 7) // 8 bytes to use, by default every bit is cleared
+        """
+        self.size = size
+        self.bits = bytearray((size + 7) >> 3) if bits is None else bits
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.size
+        return self.bits[i >> 3] >> (i & 7) & 1
+
+    def __setitem__(self, i, value):
+        if i < 0:
+            i += self.size
+        if value:
+            self.bits[i >> 3] |= 1 << (i & 7)
+        else:
+            self.bits[i >> 3] &= ~(1 << (i & 7))
+
+    def __contains__(self, i):
+        if i < 0:
+            i += self.size
+        return self.bits[i >> 3] >> (i & 7) & 1 == 1
+
+    def add(self, i):
+        """
+        Set the bit of a tile. Like a bytearray, negative indexes count from the end.
+
+        :param i: index of the tile
+        :return: None
+        """
+        if i < 0:
+            i += self.size
+        self.bits[i >> 3] |= 1 << (i & 7)
+
+    def count(self):
+        """
+        Count the set bits.
+
+        :return: number of tiles in the set
+        """
+        return int(np.unpackbits(np.frombuffer(self.bits, dtype=np.uint8)).sum())
+
+
+def pack_walls(colors):
+    """
+    Pack the walls (color code 1) of a color buffer into a BitSet.
+
+    :param colors: color buffer of a grid, any buffer of signed bytes
+    :return: BitSet instance with the bits of the walls set
+    """
+    view = np.frombuffer(colors, dtype=np.int8)
+    return BitSet(len(view), bytearray(np.packbits(view == 1, bitorder='little').tobytes()))
+
+
+def index_array(size, value):
+    """
+    Create an array of integers for every tile, e.g. parent indexes or distances, that are all between -1 and size.
+
+    :param size: number of tiles
+    :param value: initial value of every element
+    :return: array of length size
+    """
+    return array(index_typecode(size), [value]) * size
+
+
+def index_typecode(size):
+    """
+    Get the array typecode for integers between -1 and size, four bytes per element for any grid of up to 2^31 tiles.
+
+    :param size: number of tiles
+    :return: array typecode
+    """
+    return 'i' if size < 2 ** 31 - 1 else 'q'
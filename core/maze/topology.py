@@ -0,0 +1,75 @@
+from functools import lru_cache
+
+# bit flags marking which neighbours of a tile exist
+WEST, EAST, NORTH, SOUTH = 1, 2, 4, 8
+
+# direction codes used by the maze builder, in the same order as the flags above
+DIRECTIONS = ((WEST, -2), (EAST, -1), (NORTH, 1), (SOUTH, 2))
+
+
+class Topology:
+    def __init__(self, box_width, box_height):
+        """
+        Precompute the neighbour table of a grid. Every tile gets a bit mask of the neighbours that lie within the
+        grid, and every possible mask maps to a tuple of index offsets. Finding the neighbours of tile i is then a
+        single lookup, offsets[masks[i]], instead of bounds and modulo checks for every expanded tile.
+
+        Use get_topology to share one instance between everything working on grids of the same size.
+
+        :param box_width: number of columns in the grid
+        :param box_height: number of rows in the grid
+        """
+        self.box_width = box_width
+        self.box_height = box_height
+        self.size = box_width * box_height
+
+        # bit mask of the existing neighbours of each tile, built one row at a time
+        if box_width == 1:
+            row = bytes([NORTH | SOUTH])
+        else:
+            row = bytes([EAST | NORTH | SOUTH]) + bytes([WEST | EAST | NORTH | SOUTH]) * (box_width - 2) + \
+                  bytes([WEST | NORTH | SOUTH])
+        top = bytes(m & ~NORTH for m in row)
+        bottom = bytes(m & ~SOUTH for m in row)
+
+        if box_height == 1:
+            self.masks = bytearray(m & ~(NORTH | SOUTH) for m in row)
+        else:
+            self.masks = bytearray(top + row * (box_height - 2) + bottom)
+
+        offset = {WEST: -1, EAST: 1, NORTH: -box_width, SOUTH: box_width}
+
+        # offsets[mask] contains the index offsets of the neighbours in the order west, east, north, south
+        self.offsets = tuple(tuple(offset[flag] for flag, _ in DIRECTIONS if mask & flag) for mask in range(16))
+
+        # coded_offsets[mask] pairs the same offsets with a direction code from 1 to 4, and steps[code] is the offset
+        # of that code. A search can then remember the direction it reached a tile from in one byte per tile instead of
+        # the index of the previous tile, 0 meaning not reached, and find the previous tile as i - steps[code].
+        self.coded_offsets = tuple(tuple((offset[flag], code) for code, (flag, _) in enumerate(DIRECTIONS, 1)
+                                         if mask & flag) for mask in range(16))
+        self.steps = (0,) + tuple(offset[flag] for flag, _ in DIRECTIONS)
+
+        # directions[mask] contains (offset, direction code) pairs in the same order, as used by the maze builder
+        self.directions = tuple(tuple((offset[flag], direction) for flag, direction in DIRECTIONS if mask & flag)
+                                for mask in range(16))
+
+    def get_neighbours(self, i):
+        """
+        Get the indexes of all neighbours of a tile, regardless of their color.
+
+        :param i: index of the tile
+        :return: list of neighbour indexes
+        """
+        return [i + o for o in self.offsets[self.masks[i]]]
+
+
+@lru_cache(maxsize=8)
+def get_topology(box_width, box_height):
+    """
+    Get the shared Topology instance of a grid size, building it on first use.
+
+    :param box_width: number of columns in the grid
+    :param box_height: number of rows in the grid
+    :return: Topology instance
+    """
+    return Topology(box_width, box_height)
@@ -0,0 +1,658 @@
+"""
+Recording and replay of the events of the maze generators and solvers. A trace stores the state of the grid before
+the run and every (idx, color) event the run yielded, so it can be replayed, and scrubbed backward and forward, without
+running the algorithm again.
+
+The events are stored in blocks of BLOCK_EVENTS events. Every event is one varint holding the zigzag encoded
+difference to the index of the previous event, shifted left by 8 bits, with the new color code of the tile in bits 4-7
+and its previous color code in bits 0-3, so events can be undone as well. Maze generation events are followed by a
+second varint holding their number of increments. Consecutive events mostly touch neighbouring tiles, so an event takes
+two to three bytes. The delta encoding starts over at every block, so any block can be decoded on its own, and seeking
+only decodes the blocks between the target position and the current position or the closest keyframe. Keyframes of
+the grid are taken every KEYFRAME_BLOCKS blocks while recording and replaying, see core.maze.keyframes. They are not
+stored in trace files.
+
+File layout (little endian): header, the walls before the first event packed one bit per tile (see
+core.maze.state.pack_walls), the block index and the event data.
+Header: magic b'AVTR', version (u8), kind (u8), reserved (u16), box_width (u32), box_height (u32), start_idx (u64),
+end_idx (u64), seed (i64, -1 if unknown), number of events (u64), events per block (u32), number of blocks (u32),
+algorithm name (16 bytes, ascii, zero padded).
+Block index: per block, the offset of its first byte in the event data (u64) and the number of increments before it
+(u64).
+"""
+import mmap
+import struct
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+
+from core.maze.grid import Grid
+from core.maze.keyframes import KeyframeCache
+from core.maze.state import pack_walls
+
+MAGIC = b'AVTR'
+VERSION = 1
+
+# kinds of traces, maze generations store the increments of every event
+SEARCH = 0
+MAZE = 1
+
+# number of events per block
+BLOCK_EVENTS = 4096
+# number of decoded blocks kept in memory by a Trace, the least recently used blocks are dropped first
+MAX_BLOCKS = 64
+# increments per event of a search, see core.event.event_handler
+SEARCH_INCREMENTS = 5
+# number of blocks between keyframes, see core.maze.keyframes
+KEYFRAME_BLOCKS = 8
+# restoring a keyframe copies the whole color buffer, which is about as much work as applying one event per this
+# number of tiles
+RESTORE_TILES = 64
+
+HEADER = struct.Struct('<4sBBHIIQQqQII16s')
+BLOCK = struct.Struct('<QQ')
+
+
+class TraceFileError(ValueError):
+    pass
+
+
+class TraceHeader:
+    def __init__(self, box_width, box_height, start_idx, end_idx, algorithm, kind=SEARCH, seed=None, events=0,
+                 block_events=BLOCK_EVENTS, blocks=0):
+        """
+        Initialize a new TraceHeader instance, describing a recorded run.
+
+        :param box_width: number of columns in the maze
+        :param box_height: number of rows in the maze
+        :param start_idx: index of the start tile
+        :param end_idx: index of the end tile
+        :param algorithm: name of the algorithm, e.g. 'bfs' or 'kruskal'
+        :param kind: SEARCH or MAZE
+        :param seed: seed of the maze generation, None if unknown
+        :param events: number of events
+        :param block_events: number of events per block
+        :param blocks: number of blocks
+        """
+        self.box_width = box_width
+        self.box_height = box_height
+        self.size = box_width * box_height
+        self.start_idx = start_idx
+        self.end_idx = end_idx
+        self.algorithm = algorithm
+        self.kind = kind
+        self.seed = seed
+        self.events = events
+        self.block_events = block_events
+        self.blocks = blocks
+
+    def pack(self):
+        """
+        Encode the header.
+
+        :return: bytes of length HEADER.size
+        """
+        seed = -1 if self.seed is None else self.seed
+        return HEADER.pack(MAGIC, VERSION, self.kind, 0, self.box_width, self.box_height, self.start_idx, self.end_idx,
+                           seed, self.events, self.block_events, self.blocks, self.algorithm.encode('ascii'))
+
+    @staticmethod
+    def unpack(data):
+        """
+        Decode a header.
+
+        :param data: the first HEADER.size bytes of a trace file
+        :return: TraceHeader instance
+        """
+        if len(data) < HEADER.size:
+            raise TraceFileError("file is too short to be a trace file")
+
+        magic, version, kind, _, box_width, box_height, start_idx, end_idx, seed, events, block_events, blocks, \
+            algorithm = HEADER.unpack(data)
+        if magic != MAGIC:
+            raise TraceFileError("not a trace file")
+        if version != VERSION:
+            raise TraceFileError(f"unsupported trace file version {version}")
+        if kind not in (SEARCH, MAZE):
+            raise TraceFileError(f"unknown trace kind {kind}")
+
+        return TraceHeader(box_width, box_height, start_idx, end_idx, algorithm.rstrip(b'\0').decode('ascii'), kind,
+                           None if seed < 0 else seed, events, block_events, blocks)
+
+
+def encode_varints(values):
+    """
+    Encode unsigned integers as varints, 7 bits per byte with the high bit set on every byte but the last.
+
+    :param values: numpy uint64 array
+    :return: bytes
+    """
+    # number of bytes of every varint
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in range(7, 64, 7):
+        lengths += values >= np.uint64(1 << shift)
+
+    starts = np.cumsum(lengths) - lengths
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max(initial=0))):
+        more = lengths > k
+        groups = (values[more] >> np.uint64(7 * k)) & np.uint64(0x7f)
+        out[starts[more] + k] = groups | np.where(lengths[more] > k + 1, 0x80, 0).astype(np.uint64)
+    return out.tobytes()
+
+
+def decode_varints(data):
+    """
+    Decode a sequence of varints, see encode_varints.
+
+    :param data: bytes-like object holding whole varints
+    :return: numpy uint64 array
+    """
+    data = np.frombuffer(data, dtype=np.uint8)
+    if not len(data):
+        return np.zeros(0, dtype=np.uint64)
+
+    # the last byte of every varint has the high bit cleared
+    last = data < 0x80
+    starts = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    # position of every byte within its varint
+    shifts = np.arange(len(data)) - np.repeat(starts, np.diff(np.append(starts, len(data))))
+
+    groups = (data & 0x7f).astype(np.uint64) << (7 * shifts).astype(np.uint64)
+    return np.add.reduceat(groups, starts)
+
+
+def _signed_nibbles(nibbles):
+    """
+    Sign extend 4 bit color codes, so the start (-1) and end (-2) codes survive the round trip.
+
+    :param nibbles: numpy array of the low 4 bits of color codes
+    :return: numpy int8 array of color codes
+    """
+    return ((nibbles.astype(np.int8) ^ 8) - 8).astype(np.int8)
+
+
+class TraceRecorder:
+    def __init__(self, grid, algorithm, kind=SEARCH, seed=None, block_events=BLOCK_EVENTS):
+        """
+        Initialize a new TraceRecorder instance, which records the events of a run on a grid. The recorder keeps its
+        own copy of the color of every tile, so it knows the color an event replaces without reading the grid, which
+        the algorithm may be changing on another thread. The copy is only made once the first event is recorded, so
+        it is made by the thread running the algorithm rather than the one creating the recorder.
+
+        :param grid: Grid instance in its state before the first event, only its size and endpoints are used for MAZE
+        traces. The walls of the grid must not change until the first event is recorded.
+        :param algorithm: name of the algorithm
+        :param kind: SEARCH for events on the form (idx, color code), MAZE for events on the form (idx, increments) of
+        the maze generators, which carve the tile, i.e. set its color code to 0
+        :param seed: seed of the maze generation, None if unknown
+        :param block_events: number of events per block
+        """
+        self.header = TraceHeader(grid.box_width, grid.box_height, grid.start_idx, grid.end_idx, algorithm, kind,
+                                  seed, block_events=block_events)
+
+        # the grid is read by __start, which sets the walls, colors and keyframes below
+        self.__grid = grid
+        self.__walls = None
+        self.__colors = None
+        self.__keyframes = None
+
+        self.__data = bytearray()
+        self.__blocks = array('Q')
+        self.__increments = 0
+
+        # events of the block being recorded
+        self.__indexes = array('q')
+        self.__values = array('q')
+
+    def __len__(self):
+        return self.header.events + len(self.__indexes)
+
+    def __start(self):
+        """
+        Copy the state of the grid before the first event, unless it was already copied.
+
+        :return: None
+        """
+        if self.__colors is not None:
+            return
+
+        # only walls and open tiles are stored, replaying restores the same state from them. The maze generators carve
+        # a grid filled with walls.
+        if self.header.kind == SEARCH:
+            self.__walls = self.__grid.get_walls()
+        else:
+            self.__walls = pack_walls(np.ones(self.header.size, dtype=np.int8))
+        self.__grid = None
+
+        self.__colors = np.frombuffer(Trace.initial_colors(self.header, self.__walls.bits), dtype=np.int8)
+        self.__keyframes = KeyframeCache(self.header.size)
+        self.__keyframes.add(0, self.__colors)
+
+    def push(self, idx, value):
+        """
+        Record an event.
+
+        :param idx: index of the tile
+        :param value: new color code of the tile for SEARCH traces, number of increments for MAZE traces
+        :return: None
+        """
+        self.__start()
+        self.__indexes.append(idx)
+        self.__values.append(value)
+        if len(self.__indexes) == self.header.block_events:
+            self.__flush()
+
+    def record(self, events):
+        """
+        Record the events of a run while passing them on, e.g. recorder.record(bfs.bfs_shortest_path(grid)). Only
+        the events are stored while the run goes on, they are encoded a block at a time.
+
+        :param events: iterable of (idx, value) tuples, see push
+        :return: yields the events
+        """
+        self.__start()
+        indexes, values, block_events = self.__indexes, self.__values, self.header.block_events
+        for idx, value in events:
+            indexes.append(idx)
+            values.append(value)
+            if len(indexes) == block_events:
+                self.__flush()
+            yield idx, value
+
+    def __flush(self):
+        """
+        Encode the events of the block being recorded and start a new block.
+
+        :return: None
+        """
+        n = len(self.__indexes)
+        if not n:
+            return
+
+        # copies, the arrays are cleared below
+        indexes = np.array(self.__indexes, dtype=np.int64)
+        values = np.array(self.__values, dtype=np.int64)
+        if self.header.kind == MAZE:
+            new = np.zeros(n, dtype=np.int8)
+            increments = int(values.sum())
+        else:
+            new = values.astype(np.int8)
+            increments = SEARCH_INCREMENTS * n
+
+        # the color an event replaces is the color of the previous event on the same tile, or the color of the tile
+        # before the block. Sorting the events by tile, while keeping their order, puts those events next to each other.
+        order = np.argsort(indexes, kind='stable')
+        tiles, sorted_new = indexes[order], new[order]
+        first = np.concatenate(([True], tiles[1:] != tiles[:-1]))
+        last = np.concatenate((first[1:], [True]))
+
+        colors = self.__colors
+        old = np.empty(n, dtype=np.int8)
+        old[order] = np.where(first, colors[tiles], np.concatenate(([0], sorted_new[:-1])))
+        colors[tiles[last]] = sorted_new[last]
+
+        deltas = np.diff(indexes, prepend=0)
+        codes = ((deltas << 1) ^ (deltas >> 63)).astype(np.uint64) << np.uint64(8)
+        codes |= ((new.view(np.uint8) & 15) << 4 | old.view(np.uint8) & 15).astype(np.uint64)
+        if self.header.kind == MAZE:
+            codes = np.stack((codes, values.astype(np.uint64)), axis=1).ravel()
+
+        self.__blocks.extend((len(self.__data), self.__increments))
+        self.__data += encode_varints(codes)
+        self.__increments += increments
+
+        self.header.events += n
+        self.header.blocks += 1
+        if self.header.blocks % KEYFRAME_BLOCKS == 0:
+            self.__keyframes.add(self.header.events, colors)
+        # cleared in place, record holds on to the arrays
+        del self.__indexes[:]
+        del self.__values[:]
+
+    def get_trace(self):
+        """
+        Finish the recording.
+
+        :return: Trace instance replaying the recorded events
+        """
+        self.__start()
+        self.__flush()
+        return Trace(self.header, self.__walls.bits, self.__blocks.tobytes(), bytes(self.__data), self.__keyframes)
+
+
+class Trace:
+    def __init__(self, header, walls, blocks, data, keyframes=None):
+        """
+        Initialize a new Trace instance, which replays recorded events on a grid.
+
+        :param header: TraceHeader instance
+        :param walls: bytes-like object, the walls before the first event packed one bit per tile
+        :param blocks: bytes-like object, the block index
+        :param data: bytes-like object, the encoded events
+        :param keyframes: KeyframeCache instance holding the keyframes taken while recording, by default keyframes are
+        only taken while replaying. Keyframes are taken every KEYFRAME_BLOCKS blocks.
+        """
+        self.header = header
+        self.__walls = walls
+        self.__blocks = np.frombuffer(blocks, dtype=np.uint64).reshape(-1, 2)
+        self.__data = data
+
+        # decoded blocks by their number, in the order they were last used
+        self.__decoded = OrderedDict()
+        self.keyframes = KeyframeCache(header.size) if keyframes is None else keyframes
+
+        self.grid = None
+        self.position = 0
+
+    def __len__(self):
+        return self.header.events
+
+    @staticmethod
+    def initial_colors(header, walls):
+        """
+        Get the color codes of the tiles before the first event.
+
+        :param header: TraceHeader instance
+        :param walls: bytes-like object, the walls packed one bit per tile
+        :return: array of signed bytes
+        """
+        colors = np.unpackbits(np.frombuffer(walls, dtype=np.uint8), count=header.size, bitorder='little')
+        colors = array('b', colors.tobytes())
+        colors[header.start_idx] = -1
+        colors[header.end_idx] = -2
+        return colors
+
+    def bind(self, grid=None):
+        """
+        Replay the trace on a grid, starting from the state before the first event.
+
+        :param grid: Grid instance of the same size as the trace, by default a new one is created
+        :return: numpy array of the indexes of the tiles that changed
+        """
+        header = self.header
+        if grid is None:
+            grid = Grid(header.box_width, header.box_height)
+        elif (grid.box_width, grid.box_height) != (header.box_width, header.box_height):
+            raise ValueError(f"the trace is {header.box_width}x{header.box_height} tiles, the grid is "
+                             f"{grid.box_width}x{grid.box_height}")
+
+        initial = np.frombuffer(self.initial_colors(header, self.__walls), dtype=np.int8)
+        colors = grid.get_view()
+        changed = np.flatnonzero(colors != initial)
+        colors[changed] = initial[changed]
+        grid.start_idx, grid.end_idx = header.start_idx, header.end_idx
+
+        self.grid = grid
+        self.position = 0
+        self.keyframes.add(0, colors)
+        return changed
+
+    def _decode_block(self, b):
+        """
+        Decode a block of events, or get it from the cache of decoded blocks.
+
+        :param b: number of the block
+        :return: tuple on the form (indexes, new colors, old colors, cumulative increments) of numpy arrays
+        """
+        decoded = self.__decoded
+        block = decoded.get(b)
+        if block is not None:
+            decoded.move_to_end(b)
+            return block
+
+        block = decoded[b] = self.__decode(b)
+        if len(decoded) > MAX_BLOCKS:
+            decoded.popitem(last=False)
+        return block
+
+    def __decode(self, b):
+        """
+        Decode a block of events, checking that it holds the number of events given by the header and that they are
+        on tiles of the grid.
+
+        :param b: number of the block
+        :return: tuple on the form (indexes, new colors, old colors, cumulative increments) of numpy arrays
+        """
+        header = self.header
+        start = int(self.__blocks[b, 0])
+        end = int(self.__blocks[b + 1, 0]) if b + 1 < len(self.__blocks) else len(self.__data)
+        data = memoryview(self.__data)[start:end]
+        values = decode_varints(data)
+
+        # every block but the last holds block_events events, each one varint or two for maze generations
+        events = min(header.block_events, header.events - b * header.block_events)
+        if len(values) != events * (2 if header.kind == MAZE else 1) or data[-1] >= 0x80:
+            raise TraceFileError(f"block {b} of the trace is damaged")
+
+        if header.kind == MAZE:
+            values, increments = values[0::2], values[1::2]
+        else:
+            increments = np.full(len(values), SEARCH_INCREMENTS, dtype=np.uint64)
+
+        deltas = (values >> np.uint64(8)).astype(np.int64)
+        indexes = np.cumsum((deltas >> 1) ^ -(deltas & 1))
+        if indexes.min() < 0 or indexes.max() >= header.size:
+            raise TraceFileError(f"block {b} of the trace has events outside of the maze")
+        codes = (values & np.uint64(0xff)).astype(np.uint8)
+
+        return (indexes, _signed_nibbles(codes >> 4), _signed_nibbles(codes & 15),
+                np.cumsum(increments) + self.__blocks[b, 1])
+
+    def validate(self):
+        """
+        Check that the trace is intact: the number of blocks matches the number of events, the blocks lie one after
+        the other in the event data, and every block decodes to its number of events on tiles of the grid. The blocks
+        are decoded without being kept.
+
+        :return: None
+        """
+        header, offsets = self.header, self.__blocks[:, 0]
+        if header.block_events <= 0 or header.blocks != -(-header.events // header.block_events) or \
+                len(offsets) != header.blocks:
+            raise TraceFileError(f"the trace has {header.blocks} blocks of {header.block_events} events, which does "
+                                 f"not match its {header.events} events")
+        if len(offsets) and (offsets[0] != 0 or (offsets[1:] <= offsets[:-1]).any() or
+                             offsets[-1] >= len(self.__data)):
+            raise TraceFileError("the block index of the trace is damaged")
+
+        for b in range(header.blocks):
+            self.__decode(b)
+
+    def _get_events(self, start, end):
+        """
+        Decode the events in a range.
+
+        :param start: position of the first event
+        :param end: position after the last event
+        :return: tuple on the form (indexes, new colors, old colors) of numpy arrays
+        """
+        n = self.header.block_events
+        parts = []
+        for b in range(start // n, (end - 1) // n + 1):
+            indexes, new, old, _ = self._decode_block(b)
+            lo, hi = max(start - b * n, 0), min(end - b * n, n)
+            parts.append((indexes[lo:hi], new[lo:hi], old[lo:hi]))
+
+        if len(parts) == 1:
+            return parts[0]
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    def seek(self, position):
+        """
+        Move the replay to a position. The events in between are applied to the grid, or undone when moving backward,
+        starting from the current position or from the closest keyframe, whichever is less work. Each touched tile is
+        only written once, with its color at the new position.
+
+        :param position: number of events applied after the move, clamped to between 0 and len(self)
+        :return: numpy array of the indexes of the tiles that changed
+        """
+        if self.grid is None:
+            self.bind()
+
+        position = min(max(position, 0), len(self))
+        if position == self.position:
+            return np.zeros(0, dtype=np.int64)
+
+        view = self.grid.get_view()
+        distance = abs(position - self.position)
+        keyframe = None
+        for candidate in self.keyframes.nearest(position):
+            if candidate is not None and abs(position - candidate) + self.header.size // RESTORE_TILES < distance:
+                keyframe, distance = candidate, abs(position - candidate) + self.header.size // RESTORE_TILES
+
+        if keyframe is None:
+            return self._move(position, view)
+
+        previous = view.copy()
+        self.keyframes.restore(keyframe, view)
+        self.position = keyframe
+        self._move(position, view)
+        return np.flatnonzero(view != previous)
+
+    def _move(self, position, view):
+        """
+        Apply or undo the events between the current position and another position, taking the missing keyframes
+        on the way.
+
+        :param position: number of events applied after the move
+        :param view: numpy view of the color buffer of the grid
+        :return: numpy array of the indexes of the tiles that changed
+        """
+        interval = self.header.block_events * KEYFRAME_BLOCKS
+        changed = []
+        while self.position != position:
+            if position > self.position:
+                end = min(position, (self.position // interval + 1) * interval)
+            else:
+                end = max(position, (self.position - 1) // interval * interval)
+
+            changed.append(self._apply(end, view))
+            if end % interval == 0:
+                self.keyframes.add(end, view)
+
+        if len(changed) < 2:
+            return changed[0] if changed else np.zeros(0, dtype=np.int64)
+        return np.unique(np.concatenate(changed))
+
+    def _apply(self, position, view):
+        """
+        Apply or undo the events between the current position and another position.
+
+        :param position: number of events applied after the move
+        :param view: numpy view of the color buffer of the grid
+        :return: numpy array of the indexes of the tiles that changed
+        """
+        if position > self.position:
+            indexes, colors, _ = self._get_events(self.position, position)
+            # the last event of every tile decides its new color
+            tiles, last = np.unique(indexes[::-1], return_index=True)
+            colors = colors[len(indexes) - 1 - last]
+        else:
+            indexes, _, colors = self._get_events(position, self.position)
+            # the first event of every tile holds its color before the range
+            tiles, first = np.unique(indexes, return_index=True)
+            colors = colors[first]
+
+        changed = colors != view[tiles]
+        tiles = tiles[changed]
+        view[tiles] = colors[changed]
+
+        self.position = position
+        return tiles
+
+    def step(self, steps):
+        """
+        Move the replay forward, or backward for a negative number of steps.
+
+        :param steps: number of events to move
+        :return: numpy array of the indexes of the tiles that changed
+        """
+        return self.seek(self.position + steps)
+
+    def get_increments(self, position=None):
+        """
+        Get the number of increments the algorithm had performed at a position.
+
+        :param position: number of events, defaults to the current position
+        :return: number of increments
+        """
+        position = self.position if position is None else position
+        if position <= 0:
+            return 0
+        n = self.header.block_events
+        b = (position - 1) // n
+        return int(self._decode_block(b)[3][position - 1 - b * n])
+
+    def copy(self):
+        """
+        Get a new Trace replaying the same events. The encoded events are shared, the keyframes and decoded blocks
+        collected by this trace while it is replayed are not.
+
+        :return: Trace instance, not bound to a grid
+        """
+        return Trace(self.header, self.__walls, self.__blocks, self.__data)
+
+    def get_size(self):
+        """
+        Get the size of the trace in a trace file.
+
+        :return: number of bytes
+        """
+        return HEADER.size + len(self.__walls) + self.__blocks.nbytes + len(self.__data)
+
+    def save(self, path):
+        """
+        Write the trace to a trace file.
+
+        :param path: path of the trace file
+        :return: None
+        """
+        with open(path, 'wb') as file:
+            file.write(self.header.pack())
+            file.write(self.__walls)
+            file.write(self.__blocks.tobytes())
+            file.write(self.__data)
+
+
+def open_trace(path):
+    """
+    Open a trace file. The events are memory mapped, and only decoded block by block as they are replayed. The file is
+    validated once when it is opened, see Trace.validate.
+
+    :param path: path of the trace file
+    :return: Trace instance
+    """
+    with open(path, 'rb') as file:
+        header = TraceHeader.unpack(file.read(HEADER.size))
+        walls_size = (header.size + 7) // 8
+        data_start = HEADER.size + walls_size + header.blocks * BLOCK.size
+        if data_start > file.seek(0, 2):
+            raise TraceFileError("trace file is truncated")
+
+        # the mapping stays valid after the file is closed
+        mapping = memoryview(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+
+    walls = mapping[HEADER.size:HEADER.size + walls_size]
+    blocks = mapping[HEADER.size + walls_size:data_start]
+    trace = Trace(header, walls, blocks, mapping[data_start:])
+    trace.validate()
+    return trace
+
+
+def record_trace(grid, events, algorithm, kind=SEARCH, seed=None):
+    """
+    Run an algorithm to completion and record its events.
+
+    :param grid: Grid instance the algorithm runs on, in its state before the first event
+    :param events: generator of the algorithm, yielding (idx, value) tuples, see TraceRecorder.push
+    :param algorithm: name of the algorithm
+    :param kind: SEARCH or MAZE
+    :param seed: seed of the maze generation, None if unknown
+    :return: Trace instance
+    """
+    recorder = TraceRecorder(grid, algorithm, kind, seed)
+    for _ in recorder.record(events):
+        pass
+    return recorder.get_trace()
@@ -0,0 +1,198 @@
+import cProfile
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Profiler:
+    def __init__(self, window=600):
+        """
+        Initialize a new Profiler instance, which collects timings and counters from the hot paths of the application:
+        timers keep the durations of their last window measurements to compute percentiles, and counters keep a
+        running total to compute rates. While disabled, every method returns right away, so the instrumentation can
+        stay in place at the cost of one attribute lookup.
+
+        :param window: number of measurements kept per timer
+        """
+        self.enabled = False
+        self.__window = window
+
+        # timer name -> durations in seconds, oldest first
+        self.__timers = {}
+        # counter name -> total count, and the totals at the time of the last call to get_rates
+        self.__counters = {}
+        self.__last_counters = {}
+        self.__last_rate_time = time.perf_counter()
+
+        self.__session = None
+        self.__session_path = None
+
+    def enable(self, session_path=None):
+        """
+        Start collecting measurements.
+
+        :param session_path: if given, the main thread is also profiled with cProfile, and the statistics are written
+        to this file by disable. Load them with pstats or a viewer such as snakeviz.
+        :return: None
+        """
+        self.enabled = True
+        if session_path:
+            self.__session_path = session_path
+            self.__session = cProfile.Profile()
+            self.__session.enable()
+
+    def disable(self):
+        """
+        Stop collecting measurements, and write the cProfile statistics if a session path was given.
+
+        :return: None
+        """
+        self.enabled = False
+        if self.__session is not None:
+            self.__session.disable()
+            self.__session.dump_stats(self.__session_path)
+            self.__session = None
+
+    def record(self, name, seconds):
+        """
+        Add a measurement to a timer.
+
+        :param name: name of the timer
+        :param seconds: measured duration
+        :return: None
+        """
+        if self.enabled:
+            timer = self.__timers.get(name)
+            if timer is None:
+                timer = self.__timers[name] = deque(maxlen=self.__window)
+            timer.append(seconds)
+
+    @contextmanager
+    def _measure(self, name):
+        """
+        Time the body of a with statement, see measure.
+
+        :param name: name of the timer
+        :return: context manager
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start_time)
+
+    def measure(self, name):
+        """
+        Time the body of a with statement, e.g. with profiler.measure('draw_maze'): ...
+
+        :param name: name of the timer
+        :return: context manager
+        """
+        return self._measure(name) if self.enabled else _NOT_MEASURED
+
+    def count(self, name, n=1):
+        """
+        Add to a counter.
+
+        :param name: name of the counter
+        :param n: number to add
+        :return: None
+        """
+        if self.enabled:
+            self.__counters[name] = self.__counters.get(name, 0) + n
+
+    def timed(self, iterable, name, batch=256):
+        """
+        Time how long an iterable, e.g. the generator of an algorithm, takes to produce its items. Only the time spent
+        inside the iterable is measured, not the time the consumer spends on the items, and one measurement is
+        recorded per batch of items.
+
+        :param iterable: iterable to time
+        :param name: name of the timer, the items are also counted in a counter of the same name
+        :param batch: number of items per measurement
+        :return: yields the items of the iterable
+        """
+        iterator = iter(iterable)
+        elapsed, n = 0.0, 0
+        while True:
+            start_time = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                break
+            elapsed += time.perf_counter() - start_time
+            n += 1
+
+            if n == batch:
+                self.record(name, elapsed)
+                self.count(name, n)
+                elapsed, n = 0.0, 0
+            yield item
+
+        if n:
+            self.record(name, elapsed)
+            self.count(name, n)
+
+    def get_stats(self, name):
+        """
+        Get the statistics of a timer.
+
+        :param name: name of the timer
+        :return: dictionary with the keys n, mean, p50, p95, p99 and max in seconds, None if nothing was measured
+        """
+        samples = sorted(self.__timers.get(name, ()))
+        if not samples:
+            return None
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(p * len(samples)))]
+
+        return {'n': len(samples), 'mean': sum(samples) / len(samples), 'p50': percentile(0.5),
+                'p95': percentile(0.95), 'p99': percentile(0.99), 'max': samples[-1]}
+
+    def get_rates(self):
+        """
+        Get the rate of every counter since the last call.
+
+        :return: dictionary of counter name -> count per second
+        """
+        now = time.perf_counter()
+        elapsed = max(now - self.__last_rate_time, 1e-9)
+        # the worker thread may add counters meanwhile, so work on a copy
+        counters = dict(self.__counters)
+        rates = {name: (total - self.__last_counters.get(name, 0)) / elapsed for name, total in counters.items()}
+
+        self.__last_counters = counters
+        self.__last_rate_time = now
+        return rates
+
+    def report(self):
+        """
+        Summarize the timers and counter rates.
+
+        :return: list of lines of text
+        """
+        lines = [f"{'ms':<12}{'mean':>7}{'p50':>7}{'p95':>7}{'p99':>7}{'max':>8}"]
+        for name in sorted(self.__timers):
+            stats = self.get_stats(name)
+            if stats:
+                lines.append(f"{name:<12}{stats['mean'] * 1000:>7.2f}{stats['p50'] * 1000:>7.2f}"
+                             f"{stats['p95'] * 1000:>7.2f}{stats['p99'] * 1000:>7.2f}{stats['max'] * 1000:>8.2f}")
+
+        for name, rate in sorted(self.get_rates().items()):
+            lines.append(f"{name + '/s':<12}{rate:>14,.0f}")
+        return lines
+
+
+class _NotMeasured:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NOT_MEASURED = _NotMeasured()
+
+# shared by the whole application, enabled by the gui from the config
+profiler = Profiler()
@@ -0,0 +1,77 @@
+import time
+
+
+class FrameScheduler:
+    def __init__(self, tick, speed=1.0, budget=0.5):
+        """
+        Initialize a new FrameScheduler instance, which decides how many steps of an animated event to perform each
+        frame. The number of steps follows the real time elapsed between frames, so the animation runs at the same
+        speed regardless of the frame rate, and is capped by the measured cost of a step, so a frame never spends more
+        than its share of time on steps.
+
+        :param tick: target number of frames per second
+        :param speed: float multiplier of speed, where 1.0 is one step per frame at the target frame rate
+        :param budget: fraction of a frame that may be spent on steps
+        """
+        self.__tick = tick
+        self.__speed = speed
+        self.budget = budget / tick
+
+        # fractional number of steps owed since the last frame
+        self.__debt = 0.0
+        # moving average of the number of seconds a single step takes, None until measured
+        self.__step_cost = None
+        self.__last_time = None
+
+    def set_speed(self, speed):
+        """
+        Change the speed of the animation.
+
+        :param speed: float multiplier of speed, e.g 1.0, 0.1, 3.4
+        :return: None
+        """
+        self.__speed = speed
+
+    def pause(self):
+        """
+        Call on every frame without an active event, so the idle time is not made up for once the next event starts.
+
+        :return: None
+        """
+        self.__last_time = None
+        self.__debt = 0.0
+
+    def get_steps(self):
+        """
+        Get the number of steps to perform this frame.
+
+        :return: number of steps
+        """
+        now = time.perf_counter()
+        # the first frame of an event is assumed to be on time
+        elapsed = now - self.__last_time if self.__last_time is not None else 1 / self.__tick
+        self.__last_time = now
+
+        self.__debt += elapsed * self.__speed * self.__tick
+        steps = int(self.__debt)
+
+        # only perform the steps that fit in the budget, and forget the rest rather than trying to catch up later
+        if self.__step_cost:
+            steps = min(steps, max(1, int(self.budget / self.__step_cost)))
+            self.__debt = min(self.__debt - steps, 1.0)
+        else:
+            self.__debt -= steps
+
+        return steps
+
+    def record(self, steps, elapsed):
+        """
+        Measure the cost of a step.
+
+        :param steps: number of steps performed
+        :param elapsed: number of seconds spent performing them
+        :return: None
+        """
+        if steps > 0:
+            cost = elapsed / steps
+            self.__step_cost = cost if self.__step_cost is None else 0.8 * self.__step_cost + 0.2 * cost
@@ -2,6 +2,7 @@ import pygame as pg
 
 import gui.constants as c
 from gui.colors import Color
+from gui.dirty_rects import dirty_rects
 
 
 class Button:
@@ -52,7 +53,7 @@ class Button:
         :param screen: pygame screen object
         :return: None
         """
-        pg.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height), 0)
+        dirty_rects.add(pg.draw.rect(screen, self.color, (self.x, self.y, self.width, self.height), 0))
         pg.draw.rect(screen, (0, 0, 0), (self.x, self.y, self.width, self.height), 2)
 
         if self.text != '':
@@ -4,6 +4,7 @@ import math
 
 import gui.constants as c
 from gui.colors import Color
+from gui.dirty_rects import dirty_rects
 
 
 class Slider:
@@ -44,7 +45,7 @@ class Slider:
         :return: None
         """
         # Make sure we erase the background every time the slider moves
-        pg.draw.rect(screen, Color.BACKGROUND, self.__background_rect)
+        dirty_rects.add(pg.draw.rect(screen, Color.BACKGROUND, self.__background_rect))
 
         pg.draw.rect(screen, Color.DEFAULT_BTN, self.__slider_rect)
 
@@ -58,7 +59,8 @@ class Slider:
 
         # display slider value if specified
         if self.text:
-            self.font.render_to(screen, (self.text_x, self.text_y), f"{self.text}: {self.__value:.2f}")
+            text_rect = self.font.render_to(screen, (self.text_x, self.text_y), f"{self.text}: {self.__value:.2f}")
+            dirty_rects.add(text_rect)
 
     def _update_value(self, x):
         """
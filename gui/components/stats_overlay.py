@@ -0,0 +1,53 @@
+import pygame as pg
+import pygame.freetype
+
+import gui.constants as c
+from gui.colors import Color
+from gui.dirty_rects import dirty_rects
+
+
+class StatsOverlay:
+
+    def __init__(self, x, y, width, line_height=16, interval=0.5):
+        """
+        Initialize a new StatsOverlay instance, a block of text showing the measurements of the profiler.
+
+        :param x: x position
+        :param y: y position
+        :param width: width of the overlay
+        :param line_height: height of each line of text
+        :param interval: number of seconds between redraws, rendering text every frame would itself show up in the
+        measurements
+        """
+        self.x = x
+        self.y = y
+        self.width = width
+        self.line_height = line_height
+        self.interval = interval
+
+        self.font = pygame.freetype.SysFont(c.FONT, 12, bold=True)
+        self.__rect = pg.Rect(x, y, width, 0)
+        self.__next_draw = 0.0
+
+    def draw(self, screen, get_lines, now):
+        """
+        Draw lines of text to the screen, replacing the previous ones, if the redraw interval has passed.
+
+        :param screen: pygame screen instance
+        :param get_lines: function returning the list of lines of text, only called when the overlay is drawn
+        :param now: current time in seconds
+        :return: True if the overlay was drawn, False otherwise
+        """
+        if now < self.__next_draw:
+            return False
+        self.__next_draw = now + self.interval
+        lines = get_lines()
+
+        # clear the previous lines, which may have been more than the new ones
+        dirty_rects.add(pg.draw.rect(screen, Color.BACKGROUND, self.__rect))
+        self.__rect = pg.Rect(self.x, self.y, self.width, len(lines) * self.line_height)
+
+        for i, line in enumerate(lines):
+            self.font.render_to(screen, (self.x, self.y + i * self.line_height), line)
+        dirty_rects.add(self.__rect)
+        return True
@@ -3,6 +3,7 @@ import pygame.freetype
 
 import gui.constants as c
 from gui.colors import Color
+from gui.dirty_rects import dirty_rects
 
 
 class TextTable:
@@ -46,8 +47,8 @@ class TextTable:
         :return: None
         """
         font, rect, y, text, value = self.text_table[index]
-        pg.draw.rect(screen, Color.BACKGROUND, rect)
-        font.render_to(screen, (self.x, y), f"{text}: {value}")
+        dirty_rects.add(pg.draw.rect(screen, Color.BACKGROUND, rect))
+        dirty_rects.add(font.render_to(screen, (self.x, y), f"{text}: {value}"))
 
     def increment_value(self, index, increment=1):
         """
@@ -19,16 +19,28 @@ PADX = None         # Global padding in the y direction
 PADY = None         # Global padding in the x direction
 BOX_SIZE = None     # Size of each individual box representing the _maze
 BORDER_SIZE = None  # Thickness of the application borders
+MAZE_WIDTH = None   # Number of columns in the _maze, 0 to fit the _maze to the window
+MAZE_HEIGHT = None  # Number of rows in the _maze, 0 to fit the _maze to the window
+PROFILING = None    # Show the profiler measurements in the window
+PROFILE_PATH = None  # File to write the cProfile statistics of the session to, empty for none
+SOLVE_CACHE_MB = None  # Memory limit of the cached search results in megabytes
 
 default_config = {
     "tick": 60,
     "pad_x": 4,
     "pad_y": 4,
     "box_size": 20,
-    "border_size": 2
+    "border_size": 2,
+    "maze_width": 0,
+    "maze_height": 0,
+    "profiling": False,
+    "profile_path": "",
+    "solve_cache_mb": 64
 }
 
 cfg_path = "config.yml"
+maze_path = "maze.avm"  # file the maze is saved to and loaded from, see core.maze.maze_file
+trace_path = "trace.avt"  # file the trace of the last run is saved to and replayed from, see core.maze.trace
 
 
 def load_config():
@@ -36,7 +48,7 @@ def load_config():
     Loads the config.yml file. If the file does not exist, a default configuration file is created.
     """
     # All constants are in the global scope
-    global TICK, PADX, PADY, BOX_SIZE, BORDER_SIZE
+    global TICK, PADX, PADY, BOX_SIZE, BORDER_SIZE, MAZE_WIDTH, MAZE_HEIGHT, PROFILING, PROFILE_PATH, SOLVE_CACHE_MB
 
     if not os.path.exists(cfg_path):
         _create_config(cfg_path)
@@ -58,7 +70,7 @@ def load_config():
             continue
 
         if not default_config.keys() == config.keys():
-            _create_config()
+            _create_config(cfg_path)
             config = None
 
     for key, value in config.items():
@@ -72,6 +84,16 @@ def load_config():
             BOX_SIZE = value
         elif key == "border_size":
             BORDER_SIZE = value
+        elif key == "maze_width":
+            MAZE_WIDTH = value
+        elif key == "maze_height":
+            MAZE_HEIGHT = value
+        elif key == "profiling":
+            PROFILING = value
+        elif key == "profile_path":
+            PROFILE_PATH = value
+        elif key == "solve_cache_mb":
+            SOLVE_CACHE_MB = value
 
 
 def _create_config(path):
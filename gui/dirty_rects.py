@@ -0,0 +1,60 @@
+import pygame as pg
+
+
+class DirtyRects:
+    def __init__(self, max_rects=64):
+        """
+        Initialize a new DirtyRects instance, which collects the areas of the screen that were drawn to since the last
+        display update. Passing only these areas to pg.display.update is far cheaper than pushing the entire window
+        every tick, which matters on large displays where most ticks only change a handful of tiles.
+
+        :param max_rects: number of separate rects to keep before collapsing them into a single bounding rect, since
+        updating hundreds of small scattered rects is slower than updating the area surrounding them.
+        """
+        self.__max_rects = max_rects
+        self.__rects = []
+        self.__collapsed = False
+
+    def add(self, rect):
+        """
+        Mark an area of the screen as changed. Rects overlapping an already marked area are merged with it.
+
+        :param rect: pygame Rect, or rect-style tuple (x, y, width, height)
+        :return: None
+        """
+        rect = pg.Rect(rect)
+        rects = self.__rects
+
+        if self.__collapsed:
+            rects[0].union_ip(rect)
+            return
+
+        i = rect.collidelist(rects)
+        # the area is already marked, most commonly the same tile drawn several times in one tick
+        if i >= 0 and rects[i].contains(rect):
+            return
+
+        # merge with every rect we overlap, the union may in turn overlap other rects
+        while i >= 0:
+            rect.union_ip(rects.pop(i))
+            i = rect.collidelist(rects)
+
+        rects.append(rect)
+
+        if len(rects) > self.__max_rects:
+            rects[:] = [rects[0].unionall(rects[1:])]
+            self.__collapsed = True
+
+    def flush(self):
+        """
+        Get the changed areas, and start collecting from scratch.
+
+        :return: list of pygame Rects to pass to pg.display.update
+        """
+        rects, self.__rects = self.__rects, []
+        self.__collapsed = False
+        return rects
+
+
+# shared by all gui components, flushed by the main loop once per tick
+dirty_rects = DirtyRects()
@@ -0,0 +1,237 @@
+"""
+Headless rendering of scripted algorithm demos, for machines without a display such as CI and render servers. The
+application is drawn to an offscreen surface through the SDL dummy video driver, every action of the script runs at
+full speed without waiting for the clock, and the frames are written as an image sequence or raw RGB video.
+
+Usage: python -m gui.headless [--size 80x50] [--box-size 12] [--seed 0] [--script dfs bfs bi_bfs a_star jps]
+                              [--steps 40] [--hold 30] [--frames DIR | --raw]
+
+Raw frames are written to stdout, e.g. to encode a video with ffmpeg:
+python -m gui.headless --raw | ffmpeg -f rawvideo -pix_fmt rgb24 -s WIDTHxHEIGHT -r 60 -i - -pix_fmt yuv420p demo.mp4
+where the frame size is printed to stderr when the render starts.
+"""
+import argparse
+import os
+import sys
+import time
+
+# must be set before pygame is imported, the greeting of pygame would otherwise end up in the raw video on stdout
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+
+import gui.constants as c
+from core.benchmark.solvers import parse_size
+from core.event.event_handler import EventHandler
+from core.maze.a_star import AStar
+from core.maze.bfs import BFS
+from core.maze.jps import JumpPointSearch
+from core.maze.lpa_star import LPAStar
+from core.maze.maze_builder import MazeBuilder, GENERATORS
+from gui.dirty_rects import dirty_rects
+from gui.main import draw_background, initialize_text_table
+from gui.maze_handler import MazeHandler
+
+# script actions running a search, mapped to the EventHandler methods starting them, the maze generators in
+# core.maze.maze_builder.GENERATORS are actions as well
+SEARCHES = {
+    'bfs': 'new_bfs_event',
+    'bi_bfs': 'new_bidirectional_bfs_event',
+    'a_star': 'new_a_star_event',
+    'jps': 'new_jps_event',
+}
+
+# width of the text table to the right of the maze
+TABLE_WIDTH = 280
+
+
+class ImageSequence:
+    def __init__(self, directory):
+        """
+        Initialize a new ImageSequence instance, writing every frame to a numbered PNG file.
+
+        :param directory: directory of the images, created if it does not exist
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.frames = 0
+
+    def write(self, screen):
+        """
+        Write a frame.
+
+        :param screen: surface to write
+        :return: None
+        """
+        self.frames += 1
+        pg.image.save(screen, os.path.join(self.directory, f"frame_{self.frames:06d}.png"))
+
+    def close(self):
+        pass
+
+
+class RawVideo:
+    def __init__(self, stream):
+        """
+        Initialize a new RawVideo instance, writing every frame to a stream as raw 24 bit RGB pixels, row by row.
+
+        :param stream: binary stream, e.g. sys.stdout.buffer or the stdin of an encoder process
+        """
+        self.stream = stream
+        self.frames = 0
+
+    def write(self, screen):
+        """
+        Write a frame.
+
+        :param screen: surface to write
+        :return: None
+        """
+        self.frames += 1
+        self.stream.write(pg.image.tostring(screen, 'RGB'))
+
+    def close(self):
+        self.stream.flush()
+
+
+class NoOutput:
+    def __init__(self):
+        """
+        Initialize a new NoOutput instance, which only counts the frames, e.g. to check that a script runs in CI.
+        """
+        self.frames = 0
+
+    def write(self, screen):
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+def configure(box_width, box_height, box_size):
+    """
+    Set the constants of the application for a maze of an explicit size, instead of sizing it from the display and
+    the config file.
+
+    :param box_width: number of columns in the maze
+    :param box_height: number of rows in the maze
+    :param box_size: width/height of each tile in pixels
+    :return: size of the screen on the form (width, height)
+    """
+    c.TICK = c.default_config["tick"]
+    c.PADX = c.default_config["pad_x"]
+    c.PADY = c.default_config["pad_y"]
+    c.BORDER_SIZE = c.default_config["border_size"]
+    c.BOX_SIZE = box_size
+    c.MAZE_WIDTH, c.MAZE_HEIGHT = box_width, box_height
+
+    c.WIDTH, c.HEIGHT = box_width * box_size, box_height * box_size
+    c.MAZE_LOC = (c.PADX + c.BORDER_SIZE, c.PADY + c.BORDER_SIZE)
+
+    # room for the text table to the right of the maze. Video encoders expect even frame sizes.
+    width = c.WIDTH + 2 * c.BORDER_SIZE + 4 * c.PADX + TABLE_WIDTH
+    height = max(c.HEIGHT + 2 * c.BORDER_SIZE + 2 * c.PADY, 200)
+    c.SCREEN_WIDTH, c.SCREEN_HEIGHT = width + width % 2, height + height % 2
+    return c.SCREEN_WIDTH, c.SCREEN_HEIGHT
+
+
+def render(script, output, box_width, box_height, box_size=12, seed=None, steps=40, hold=30):
+    """
+    Run a script of maze generations and searches, and write a frame after every steps steps.
+
+    :param script: list of actions, names of GENERATORS or SEARCHES
+    :param output: ImageSequence, RawVideo or NoOutput instance
+    :param box_width: number of columns in the maze
+    :param box_height: number of rows in the maze
+    :param box_size: width/height of each tile in pixels
+    :param seed: seed of the maze generation, None for different mazes every run
+    :param steps: number of steps of the algorithms per frame
+    :param hold: number of frames to repeat the result of every action
+    :return: None
+    """
+    for action in script:
+        if action not in GENERATORS and action not in SEARCHES:
+            raise ValueError(f"unknown action '{action}', expected one of {', '.join((*GENERATORS, *SEARCHES))}")
+
+    size = configure(box_width, box_height, box_size)
+    pg.display.set_mode((1, 1))
+    screen = pg.Surface(size)
+    draw_background(screen)
+
+    maze_builder = MazeBuilder(box_width, box_height, seed)
+    maze = maze_builder.get_maze()
+    maze_handler = MazeHandler(screen, maze)
+
+    bfs = BFS(*maze_builder.export_maze())
+    a_star = AStar(*maze_builder.export_maze())
+    jps = JumpPointSearch(*maze_builder.export_maze())
+    lpa_star = LPAStar(*maze_builder.export_maze())
+    text_table, indexes = initialize_text_table(screen)
+
+    event_handler = EventHandler(maze, maze_handler, maze_builder, bfs, a_star, jps, lpa_star, indexes, text_table,
+                                 screen)
+    maze_handler.draw_maze()
+
+    def write_frame():
+        # nothing is shown on a display, so the changed areas are only collected to be dropped
+        dirty_rects.flush()
+        output.write(screen)
+
+    for action in script:
+        if action in GENERATORS:
+            event_handler.new_maze_event(action)
+        else:
+            getattr(event_handler, SEARCHES[action])()
+
+        # every frame performs exactly steps steps, waiting for the worker thread when it falls behind, so the
+        # frames do not depend on the speed of the machine
+        while event_handler.is_active():
+            performed = 0
+            while performed < steps and event_handler.is_active():
+                performed += event_handler.next(steps - performed)
+            write_frame()
+
+        for _ in range(hold):
+            write_frame()
+
+    output.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a scripted demo of the maze algorithms without a display.")
+    parser.add_argument("--size", type=parse_size, default=(80, 50), help="maze size on the form WIDTHxHEIGHT")
+    parser.add_argument("--box-size", type=int, default=12, help="width/height of each tile in pixels")
+    parser.add_argument("--seed", type=int, help="seed of the maze generation")
+    parser.add_argument("--script", nargs='+', choices=(*GENERATORS, *SEARCHES), default=['dfs', *SEARCHES],
+                        help="actions to run in order, defaults to a dfs maze followed by every search")
+    parser.add_argument("--steps", type=int, default=40, help="number of algorithm steps per frame")
+    parser.add_argument("--hold", type=int, default=30, help="number of frames to show the result of every action")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--frames", help="write the frames as PNG images to this directory")
+    output.add_argument("--raw", action='store_true', help="write the frames as raw RGB video to stdout")
+    args = parser.parse_args()
+
+    if args.frames:
+        writer = ImageSequence(args.frames)
+    elif args.raw:
+        writer = RawVideo(sys.stdout.buffer)
+    else:
+        writer = NoOutput()
+
+    pg.init()
+    box_width, box_height = args.size
+    width, height = configure(box_width, box_height, args.box_size)
+    print(f"rendering {width}x{height} frames", file=sys.stderr)
+
+    start_time = time.perf_counter()
+    render(args.script, writer, box_width, box_height, args.box_size, args.seed, args.steps, args.hold)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"{writer.frames} frames in {elapsed:.2f} s ({writer.frames / elapsed:.1f} frames per second)",
+          file=sys.stderr)
+    pg.quit()
+
+
+if __name__ == '__main__':
+    main()
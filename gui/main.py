@@ -1,3 +1,5 @@
+import time
+
 import pygame as pg
 import pygame.freetype
 
@@ -6,15 +8,38 @@ from core.event.event_handler import EventHandler
 from core.maze.a_star import AStar
 from core.maze.maze_builder import MazeBuilder
 from core.maze.bfs import BFS
-from core.timing.tick_timing import get_time_sync_list
+from core.maze.jps import JumpPointSearch
+from core.maze.lpa_star import LPAStar
+from core.maze.solve_cache import SolveCache
+from core.timing.profiler import profiler
+from core.timing.scheduler import FrameScheduler
 from gui.colors import Color
 from gui.components.button import Button
 from gui.components.slider import Slider
+from gui.components.stats_overlay import StatsOverlay
 from gui.components.text_table import TextTable
+from gui.dirty_rects import dirty_rects
 from gui.maze_handler import MazeHandler, get_direction
 
 event_queue = None
 
+# number of pixels the view of the maze moves per tick while an arrow key is held down
+SCROLL_SPEED = 16
+# fraction of the length of a replay it moves per press of a scrub key
+SCRUB_STEP = 0.05
+
+
+def draw_background(screen):
+    """
+    Draw the background of the application and the border surrounding the maze.
+
+    :param screen: pygame screen instance
+    :return: None
+    """
+    pg.draw.rect(screen, Color.BACKGROUND, screen.get_rect())
+    pg.draw.rect(screen, Color.BORDER,
+                 pg.Rect(c.PADX, c.PADY, c.WIDTH + c.BORDER_SIZE * 2, c.HEIGHT + c.BORDER_SIZE * 2))
+
 
 def initialize_text_table(screen):
     """
@@ -39,6 +64,8 @@ def initialize_text_table(screen):
     indexes['bfs'] = table.add_text_variable("bfs")
     indexes['bi_bfs'] = table.add_text_variable("bidirectional bfs")
     indexes['a_star'] = table.add_text_variable("A*")
+    indexes['jps'] = table.add_text_variable("jump point search")
+    indexes['lpa_star'] = table.add_text_variable("live path (LPA*)")
 
     # draw the table to the screen
     table.draw_table(screen)
@@ -80,6 +107,10 @@ def initialize_components(event_handler, screen):
 
     buttons.append(Button(Color.DEFAULT_BTN, (x_pos, first_row), 50, 30, "A*"))
     buttons[3].set_on_click(lambda: event_handler.new_a_star_event())
+    x_pos += 50 + 2 * c.PADX
+
+    buttons.append(Button(Color.DEFAULT_BTN, (x_pos, first_row), 60, 30, "JPS"))
+    buttons[4].set_on_click(lambda: event_handler.new_jps_event())
 
     # iterate over the buttons and sliders and draw them to the screen.
     for btn in buttons:
@@ -101,16 +132,22 @@ def run(screen, clock):
     :return: None
     """
 
+    # the entire window is drawn before the first update
+    dirty_rects.add(screen.get_rect())
+
     # Instantiate the different helper classes and core logic to be executed when the user performs a certain action.
     maze_builder = MazeBuilder()
     maze = maze_builder.get_maze()
-    maze_handler = MazeHandler(screen, maze, maze_builder.get_endpoints())
+    maze_handler = MazeHandler(screen, maze, SolveCache(c.SOLVE_CACHE_MB << 20))
 
     bfs = BFS(*maze_builder.export_maze())
     a_star = AStar(*maze_builder.export_maze())
+    jps = JumpPointSearch(*maze_builder.export_maze())
+    lpa_star = LPAStar(*maze_builder.export_maze())
     text_table, indexes = initialize_text_table(screen)
 
-    event_handler = EventHandler(maze, maze_handler, maze_builder, bfs, a_star, indexes, text_table, screen)
+    event_handler = EventHandler(maze, maze_handler, maze_builder, bfs, a_star, jps, lpa_star, indexes, text_table,
+                                 screen)
 
     # draw the maze to the screen
     maze_handler.draw_maze()
@@ -119,16 +156,32 @@ def run(screen, clock):
     initial_shift_pos = None
     pressed_keys = {"shift": False}
 
+    # keys generating a new maze with each of the maze generation algorithms
+    maze_keys = {pg.K_1: 'dfs', pg.K_2: 'kruskal', pg.K_3: 'prim', pg.K_4: 'eller'}
+    # keys moving a replay backward and forward, by a fraction of its length
+    scrub_keys = {pg.K_LEFTBRACKET: -SCRUB_STEP, pg.K_RIGHTBRACKET: SCRUB_STEP}
+    # keys jumping to the start and end of a replay
+    seek_keys = {pg.K_HOME: 0, pg.K_END: 1}
+
     # create and draw all sliders and buttons
     buttons, sliders = initialize_components(event_handler, screen)
 
-    # total updates performed, used for modulo and timing operations
-    ticks = 0
-    # default logic operations to perform per tick of 1.0 speed
-    ops_per_tick = get_time_sync_list(1.0)
+    # decides how many steps of the active event to perform each tick, based on the speed slider
+    scheduler = FrameScheduler(c.TICK, sliders[0].get_value())
+
+    # the profiler measurements are shown below the text table
+    overlay = None
+    if profiler.enabled:
+        x_pos = c.WIDTH + 3*c.PADX + 2 * c.BORDER_SIZE
+        overlay = StatsOverlay(x_pos, text_table.last_y + text_table.height + 4*c.PADY, c.SCREEN_WIDTH - x_pos - c.PADX)
+    last_frame = None
 
     # Application main loop
     while c.running:
+        now = time.perf_counter()
+        if last_frame is not None:
+            profiler.record('frame', now - last_frame)
+        last_frame = now
 
         for event in pg.event.get():
             mouse_pos = pg.mouse.get_pos()
@@ -144,6 +197,22 @@ def run(screen, clock):
                     initial_shift_pos = pg.mouse.get_pos()
                 if event.key == pg.K_c:
                     maze_handler.clear_maze()
+                if event.key == pg.K_l:
+                    event_handler.toggle_live_path()
+                if event.key == pg.K_s and event.mod & pg.KMOD_CTRL:
+                    maze_handler.save_maze(c.maze_path)
+                if event.key == pg.K_o and event.mod & pg.KMOD_CTRL:
+                    maze_handler.load_maze(c.maze_path)
+                if event.key == pg.K_t and event.mod & pg.KMOD_CTRL:
+                    event_handler.save_trace(c.trace_path)
+                if event.key == pg.K_r and event.mod & pg.KMOD_CTRL:
+                    event_handler.new_replay_event(c.trace_path)
+                if event.key in scrub_keys:
+                    event_handler.scrub(scrub_keys[event.key])
+                if event.key in seek_keys:
+                    event_handler.seek(seek_keys[event.key])
+                if event.key in maze_keys:
+                    event_handler.new_maze_event(maze_keys[event.key])
 
             elif event.type == pg.KEYUP:
                 if event.key == pg.K_LSHIFT or event.key == pg.K_RSHIFT:
@@ -165,8 +234,17 @@ def run(screen, clock):
                         # erase a wall from the screen
                         maze_handler.draw_box_by_pos(event.pos, 0)
 
+            # mouse wheel, zoom the view of the maze in or out around the cursor
+            elif event.type == pg.MOUSEWHEEL:
+                if maze_handler.viewport.rect.collidepoint(mouse_pos):
+                    maze_handler.zoom(event.y, mouse_pos)
+
             # user moved the cursor
             elif event.type == pg.MOUSEMOTION:
+                # drag the view of the maze while the middle mouse button is held down
+                if event.buttons[1] == 1:
+                    maze_handler.scroll(-event.rel[0], -event.rel[1])
+
                 # compute hover events and highlight buttons if cursor is above them.
                 for btn in buttons:
                     btn.hover(screen, mouse_pos)
@@ -176,7 +254,7 @@ def run(screen, clock):
                     for slider in sliders:
                         if slider.on_slider(event.pos):
                             slider.handle_event(screen, event.pos[0])
-                    ops_per_tick = get_time_sync_list(sliders[0].get_value())
+                    scheduler.set_speed(sliders[0].get_value())
 
                 if not maze_handler.is_locked():
 
@@ -200,19 +278,40 @@ def run(screen, clock):
                         elif event.buttons[2] == 1:
                             maze_handler.draw_box_line(event.pos, event.rel, 0)
 
+        # move the view of the maze while the arrow keys are held down
+        keys = pg.key.get_pressed()
+        dx = (keys[pg.K_RIGHT] - keys[pg.K_LEFT]) * SCROLL_SPEED
+        dy = (keys[pg.K_DOWN] - keys[pg.K_UP]) * SCROLL_SPEED
+        if dx or dy:
+            maze_handler.scroll(dx, dy)
+
         # if there is an active event ongoing, get the next generator call.
         if event_handler.is_active():
-            # perform a certain number of iterations based on the ops_per_tick determined by the speed slider
-            for i in range(ops_per_tick[ticks % 60]):
-                event_handler.next()
-        # update the display
-        pg.display.update()
-        # increment total ticks
-        ticks += 1
+            # perform the steps that are due since the last tick, never spending more than the scheduler's budget on
+            # them, which leaves time for drawing and handling user input
+            start_time = time.perf_counter()
+            steps = event_handler.next(scheduler.get_steps(), scheduler.budget)
+            elapsed = time.perf_counter() - start_time
+            scheduler.record(steps, elapsed)
+            profiler.record('events', elapsed)
+            profiler.count('steps', steps)
+        else:
+            scheduler.pause()
+
+        if overlay is not None:
+            overlay.draw(screen, profiler.report, now)
+
+        # update the parts of the display that were drawn to since the last tick
+        with profiler.measure('display'):
+            pg.display.update(dirty_rects.flush())
 
         # sleep to achieve c.TICK updates per second
         clock.tick(c.TICK)
 
+    if profiler.enabled:
+        print("\n".join(profiler.report()))
+        profiler.disable()
+
     # exit application
     pg.quit()
 
@@ -225,6 +324,8 @@ if __name__ == '__main__':
 
     # Load config.yml and initialize constants
     c.load_config()
+    if c.PROFILING:
+        profiler.enable(c.PROFILE_PATH)
     screen_info = pg.display.Info()
 
     # Get the width and the height of the active screen
@@ -250,10 +351,7 @@ if __name__ == '__main__':
 
     c.MAZE_LOC = (c.PADX + c.BORDER_SIZE, c.PADY + c.BORDER_SIZE)
 
-    pg.draw.rect(screen, Color.BACKGROUND, pg.Rect(0, 0, width, height))
-    # Draw the _maze border
-    pg.draw.rect(screen, Color.BORDER,
-                 pg.Rect(c.PADX, c.PADY, c.WIDTH + c.BORDER_SIZE * 2, c.HEIGHT + c.BORDER_SIZE * 2))
+    draw_background(screen)
     Button.screen = screen
 
     # Application main loop
@@ -1,11 +1,9 @@
-import pygame as pg
-
 import gui.constants as c
-from gui.colors import Color
-
-
-def get_color_by_code(code):
-    return Color.colors.get(code, Color.WALL)
+from core.maze import maze_file
+from core.maze.solve_cache import SolveCache
+from core.timing.profiler import profiler
+from gui.tile_renderer import TileRenderer
+from gui.viewport import Viewport
 
 
 def get_direction(initial_pos, new_pos):
@@ -30,22 +28,55 @@ def get_direction(initial_pos, new_pos):
 
 
 class MazeHandler:
-    def __init__(self, screen, maze, endpoints):
+    def __init__(self, screen, maze, solve_cache=None):
         """
         Initialize the _maze handler
         :param screen: pygame screen object
-        :param maze: _maze list
-        :param endpoints: tuple containing start and end coordinates for the _maze
+        :param maze: Grid instance shared with the maze builder and the algorithms
+        :param solve_cache: SolveCache instance holding the results of the searches on the _maze, cleared whenever the
+        user edits the _maze. By default a cache with the default memory limit is created.
         """
         self.screen = screen
         self.maze = maze
+        self.solve_cache = SolveCache() if solve_cache is None else solve_cache
 
-        self._endpoints = endpoints
-        self.__endpoint_lock = False  # Signifies weather the user can draw over the start/endpoint or not
+        # the maze area of the window shows the part of the _maze chosen by the viewport
+        self.viewport = Viewport((*c.MAZE_LOC, c.WIDTH, c.HEIGHT), maze.box_width, maze.box_height, c.BOX_SIZE)
+        self.__renderer = TileRenderer(screen, maze, self.viewport)
 
-        self.box_width = c.WIDTH // c.BOX_SIZE
         self.__locked = False
 
+        # called with the list of tiles that changed between wall and walkable after the user edited the _maze,
+        # or with None if the entire _maze changed
+        self.__on_edit = lambda tiles: None
+        self.__edited = []
+
+    def set_on_edit(self, func):
+        """
+        Set the function to call whenever the user adds or removes walls.
+        :param func: function taking a list of changed tile indexes, or None if the entire _maze changed
+        :return: None
+        """
+        self.__on_edit = func
+
+    def _notify_edit(self):
+        """
+        Pass the tiles edited since the last call to the on edit function.
+        :return: None
+        """
+        if self.__edited:
+            edited, self.__edited = self.__edited, []
+            self._edit(edited)
+
+    def _edit(self, tiles):
+        """
+        Handle an edit of the walls of the _maze, the cached search results of the _maze are no longer valid.
+        :param tiles: list of changed tile indexes, or None if the entire _maze changed
+        :return: None
+        """
+        self.solve_cache.clear()
+        self.__on_edit(tiles)
+
     def lock(self):
         """
         Stop the user from being able to alter the _maze
@@ -67,56 +98,48 @@ class MazeHandler:
         """
         return self.__locked
 
-    def _draw_maze_box(self, x, y, color_code):
+    def draw_box_by_pos(self, pos, color_code):
         """
-        Draw a box to a screen.
-        :param x: x coordinate of the box
-        :param y: y coordinate of the box
-        :param color_code: color code determining what color the box should be
+        Draws a box to the screen
+        :param pos: (x,y) tuple containing position of the box
+        :param color_code: integer representing what color the box should be
         :return: None
         """
-        #  We are only allowed do draw over endpoint boxes if endpoint lock is false
-        if (x, y) not in self._endpoints or not self.__endpoint_lock:
-            pg.draw.rect(self.screen, Color.BOX_BORDER, (x, y, c.BOX_SIZE, c.BOX_SIZE))
-            pg.draw.rect(self.screen, get_color_by_code(color_code), (x + 1, y + 1, c.BOX_SIZE - 2, c.BOX_SIZE - 2))
+        i = self._get_idx_by_pos(pos)
+        if i is not None:
+            self._set_box(i, color_code)
+        self._notify_edit()
 
-    def draw_box_by_pos(self, pos, color_code):
+    def _set_box(self, i, color_code):
         """
-        Draws a box to the screen
-        :param pos: (x,y) tuple containing position of the box
-        :param color_code: see get_color_by_code, integer representing what color the box should be
+        Update the color code of a box and draw it to the screen. The start and end boxes are not editable.
+        :param i: index of the box
+        :param color_code: integer representing what color the box should be
         :return: None
         """
-        box = self._get_box_by_pos(pos)
-        if box:
-            box[2] = color_code
-            self._draw_maze_box(box[0], box[1], color_code)
+        if i == self.maze.start_idx or i == self.maze.end_idx:
+            return
+        if (self.maze.colors[i] == 1) != (color_code == 1):
+            self.__edited.append(i)
+        self.maze.colors[i] = color_code
+        self.__renderer.draw(i)
 
-    def _get_box_by_pos(self, pos):
+    def _get_idx_by_pos(self, pos):
         """
-        Get the box object by a given position tuple
+        Get the box index by a given position tuple
         :param pos: position tuple on the form (x,y)
-        :return: box object (list on the form [x, y, color_code])
+        :return: index of the box, None if the position is outside the _maze
         """
-        if pos[0] <= c.MAZE_LOC[0] or pos[0] >= c.MAZE_LOC[0] + c.WIDTH or pos[1] <= c.MAZE_LOC[1] or pos[1] >= \
-                c.MAZE_LOC[1] + c.HEIGHT:
-            return None
-        x = (pos[0] - c.MAZE_LOC[0]) // c.BOX_SIZE
-        y = (pos[1] - c.MAZE_LOC[1]) // c.BOX_SIZE
-        return self.maze[self.box_width * y + x]
+        return self.viewport.get_idx_by_pos(pos)
 
-    def _get_box_by_offset_pos(self, x, y):
+    def _get_idx_by_offset_pos(self, x, y):
         """
-        Get the box object at a x, and y coordinate that are already offset by the c.MAZE_LOC offset.
+        Get the box index at a x, and y coordinate that are already offset by the c.MAZE_LOC offset.
         :param x: offset x coordinate
         :param y: offset y coordinate
-        :return:
+        :return: index of the box, None if the position is outside the _maze
         """
-        if x <= 0 or x >= c.WIDTH or y <= 0 or y >= c.HEIGHT:
-            return None
-        x //= c.BOX_SIZE
-        y //= c.BOX_SIZE
-        return self.maze[self.box_width * y + x]
+        return self.viewport.get_idx_by_offset_pos(x, y)
 
     def draw_straight_line(self, original_direction, pos, rel_pos, color_code):
         """
@@ -140,19 +163,18 @@ class MazeHandler:
         # Moving west/east and draw a line
         if dx != 0:
             a = 1 if rx > 0 else -1
-            for xx in range(0, rx, a * c.BOX_SIZE):
-                box = self._get_box_by_offset_pos(x + xx, oc)
-                if box:  # If we found a box, draw it to the screen
-                    box[2] = color_code
-                    self._draw_maze_box(box[0], box[1], color_code)
+            for xx in range(0, rx, a * self.viewport.tile_size):
+                i = self._get_idx_by_offset_pos(x + xx, oc)
+                if i is not None:  # If we found a box, draw it to the screen
+                    self._set_box(i, color_code)
         # Moving south/north and draw a line
         else:
             a = 1 if ry > 0 else -1
-            for yy in range(0, ry, a * c.BOX_SIZE):
-                box = self._get_box_by_offset_pos(oc, y + yy)
-                if box:  # If we found a box, draw it to the screen
-                    box[2] = color_code
-                    self._draw_maze_box(box[0], box[1], color_code)
+            for yy in range(0, ry, a * self.viewport.tile_size):
+                i = self._get_idx_by_offset_pos(oc, y + yy)
+                if i is not None:  # If we found a box, draw it to the screen
+                    self._set_box(i, color_code)
+        self._notify_edit()
 
     def draw_box_line(self, pos, rel_pos, color_code):
         """
@@ -160,7 +182,7 @@ class MazeHandler:
 
         :param pos: final known cursor position
         :param rel_pos: relative movement from initial cursor position
-        :param color_code: integer representing what color the box should be, see get_color_by_code for more info
+        :param color_code: integer representing what color the box should be, see Color.colors for more info
         :return:
         """
         self.draw_box_by_pos(pos, color_code)  # Draw the initial box to the screen
@@ -173,7 +195,7 @@ class MazeHandler:
         rx *= -1
         ry *= -1
 
-        prev_box = self._get_box_by_offset_pos(x, y)  # Get the previous box object at the current position
+        prev_box = self._get_idx_by_offset_pos(x, y)  # Get the previous box index at the current position
         if abs(rx) < abs(ry):  # Check if we have more relative movement in the x or y direction.
             ax = rx / abs(ry)  # Determines the slope of the x variable (between 0.0 and 1.0)
             # Determine sign of iteration, if ry is negative, the iterator must be -1
@@ -183,11 +205,10 @@ class MazeHandler:
             # For each iteration, we iterate +-1 in the y direction, along with ax in the x direction
             for yy in range(a, ry, a):
                 # Get the box at the current position
-                box = self._get_box_by_offset_pos(x + int(xx), y + yy)
-                if box and box != prev_box:  # If we found a new box, draw it to the screen
-                    prev_box = box
-                    box[2] = color_code
-                    self._draw_maze_box(box[0], box[1], color_code)
+                i = self._get_idx_by_offset_pos(x + int(xx), y + yy)
+                if i is not None and i != prev_box:  # If we found a new box, draw it to the screen
+                    prev_box = i
+                    self._set_box(i, color_code)
                 xx += ax
         elif abs(rx) > abs(ry):
             # Same logic as above
@@ -195,12 +216,34 @@ class MazeHandler:
             yy = ay
             a = 1 if rx > 0 else -1
             for xx in range(a, rx, a):
-                box = self._get_box_by_offset_pos(x + xx, y + int(yy))
-                if box and box != prev_box:
-                    prev_box = box
-                    box[2] = color_code
-                    self._draw_maze_box(box[0], box[1], color_code)
+                i = self._get_idx_by_offset_pos(x + xx, y + int(yy))
+                if i is not None and i != prev_box:
+                    prev_box = i
+                    self._set_box(i, color_code)
                 yy += ay
+        self._notify_edit()
+
+    def scroll(self, dx, dy):
+        """
+        Move the view of the _maze by a number of pixels.
+
+        :param dx: pixels to move right, negative to move left
+        :param dy: pixels to move down, negative to move up
+        :return: None
+        """
+        if self.viewport.scroll(dx, dy):
+            self.__renderer.draw_view()
+
+    def zoom(self, steps, pos=None):
+        """
+        Zoom the view of the _maze in or out.
+
+        :param steps: number of zoom steps, positive to zoom in and negative to zoom out
+        :param pos: screen position (x,y) to zoom towards, defaults to the center of the view
+        :return: None
+        """
+        if self.viewport.zoom(steps, pos):
+            self.__renderer.draw_view()
 
     def draw_box_by_idx(self, i):
         """
@@ -210,11 +253,8 @@ class MazeHandler:
         :param i: index of the box to draw
         :return: None
         """
-        box = self.maze[i]
-        self._draw_maze_box(box[0], box[1], box[2])
-
-    def set_maze(self, maze):
-        self.maze = maze
+        profiler.count('tiles')
+        self.__renderer.draw(i)
 
     def remove_grey_tiles(self):
         """
@@ -222,9 +262,7 @@ class MazeHandler:
 
         :return: None
         """
-        self.maze = [[box[0], box[1], box[2]] if box[2] not in (2, 3, 4, 5)
-                     else [box[0], box[1], 0] for box in self.maze]
-        self.draw_maze()
+        self.draw_changed_tiles(self.maze.replace((2, 3, 4, 5), 0))
 
     def remove_all_colored_tiles(self):
         """
@@ -232,8 +270,7 @@ class MazeHandler:
 
         :return: None
         """
-        self.maze = [[box[0], box[1], box[2]] if box[2] < 3 else [box[0], box[1], 0] for box in self.maze]
-        self.draw_maze()
+        self.draw_changed_tiles(self.maze.replace((3, 4, 5, 6), 0))
 
     def reset_maze(self):
         """
@@ -241,8 +278,7 @@ class MazeHandler:
 
         :return: None
         """
-        self.maze = [[box[0], box[1], box[2]] if box[2] < 0 else [box[0], box[1], 1] for box in self.maze]
-        self.draw_maze()
+        self.draw_changed_tiles(self.maze.fill(1))
 
     def clear_maze(self):
         """
@@ -251,15 +287,69 @@ class MazeHandler:
         :return: None
         """
         if not self.is_locked():
-            self.maze = [[box[0], box[1], box[2]] if box[2] < 0 else [box[0], box[1], 0] for box in self.maze]
+            self.draw_changed_tiles(self.maze.fill(0))
+            self._edit(None)
+
+    def save_maze(self, path):
+        """
+        Save the _maze to a maze file.
+
+        :param path: path of the maze file
+        :return: None
+        """
+        try:
+            maze_file.save_maze(path, self.maze)
+        except OSError as e:
+            print(f"Could not save the maze to {path}: {e}")
+
+    def load_maze(self, path):
+        """
+        Load a _maze saved with save_maze. The _maze must have the same size and endpoints as the current one.
+
+        :param path: path of the maze file
+        :return: None
+        """
+        if self.is_locked():
+            return
+
+        try:
+            grid, _ = maze_file.open_maze(path)
+        except (OSError, maze_file.MazeFileError) as e:
+            print(f"Could not load the maze from {path}: {e}")
+            return
+
+        if (grid.box_width, grid.box_height) != (self.maze.box_width, self.maze.box_height):
+            print(f"Could not load the maze from {path}: the maze is {grid.box_width}x{grid.box_height} tiles, "
+                  f"expected {self.maze.box_width}x{self.maze.box_height}")
+            return
+        if (grid.start_idx, grid.end_idx) != (self.maze.start_idx, self.maze.end_idx):
+            print(f"Could not load the maze from {path}: the maze has its endpoints at tiles {grid.start_idx} and "
+                  f"{grid.end_idx}, expected {self.maze.start_idx} and {self.maze.end_idx}")
+            return
+
+        self.maze.get_view()[:] = grid.get_view()
+        self.draw_maze()
+        self._edit(None)
+
+    def draw_changed_tiles(self, indexes):
+        """
+        Redraw the tiles that changed after a bulk update of the _maze. When a large part of the _maze changed, a full
+        redraw is cheaper than drawing the tiles one by one.
+
+        :param indexes: collection of changed tile indexes
+        :return: None
+        """
+        profiler.count('tiles', len(indexes))
+        if len(indexes) * 8 > self.maze.size:
             self.draw_maze()
+        elif len(indexes):
+            with profiler.measure('draw_tiles'):
+                self.__renderer.draw_tiles(indexes)
 
     def draw_maze(self):
         """
-        Draw the _maze to the screen based on the values in the _maze list.
+        Draw the _maze to the screen based on the color codes in the _maze grid.
         :return: None
         """
-        for box in self.maze:
-            self._draw_maze_box(box[0], box[1], box[2])
-
-        self.__endpoint_lock = True
+        with profiler.measure('draw_maze'):
+            self.__renderer.draw_all()
@@ -0,0 +1,274 @@
+from collections import OrderedDict
+
+import numpy as np
+import pygame as pg
+
+from gui.colors import Color
+from gui.dirty_rects import dirty_rects
+
+# width/height of a chunk in pixels, the number of tiles per chunk is chosen to match it at every tile size
+CHUNK_PIXELS = 256
+# number of rendered chunks kept in memory, the least recently drawn chunks are dropped first
+MAX_CHUNKS = 128
+# above this number of changed tiles, the chunks they lie in are rendered again instead of drawing the tiles one by one
+BATCH_TILES = 256
+# smallest tile size at which the tile borders are drawn, smaller tiles are only filled
+MIN_BORDER_SIZE = 4
+
+
+class TileRenderer:
+    def __init__(self, screen, grid, viewport):
+        """
+        Initialize a new TileRenderer instance, which draws the part of a grid shown by a viewport. The grid is split
+        into square chunks of tiles, and every chunk is rendered to its own surface the first time it is shown. The
+        rendered chunks are cached, so scrolling only blits the cached chunks in view, and the cost of drawing scales
+        with the size of the view rather than the size of the grid. Single tiles are drawn by blitting pre-rendered
+        tile surfaces, both to the screen and to the cached chunk they lie in.
+
+        :param screen: pygame screen object
+        :param grid: Grid instance to draw
+        :param viewport: Viewport instance deciding which part of the grid is shown
+        """
+        self.__screen = screen
+        self.__grid = grid
+        self.__viewport = viewport
+
+        # fill color of every color code, indexed by the color code as an unsigned byte (so -1 becomes 255)
+        self.__palette = np.empty((256, 3), dtype=np.uint8)
+        self.__palette[:] = Color.WALL
+        for code, color in Color.colors.items():
+            self.__palette[code & 0xff] = color
+
+        # rendered chunks by their (column, row), in the order they were last drawn
+        self.__chunks = OrderedDict()
+        self._set_tile_size(viewport.tile_size)
+
+    def _set_tile_size(self, size):
+        """
+        Prepare the tile and chunk surfaces for a tile size, dropping the chunks rendered at the previous size.
+
+        :param size: width/height of each tile in pixels
+        :return: None
+        """
+        self.__tile_size = size
+        self.__chunk_tiles = max(1, CHUNK_PIXELS // size)
+
+        # one pre-rendered tile (border and fill) per color code, unknown color codes are drawn as walls
+        self.__tiles = {code: self._render_tile(color) for code, color in Color.colors.items()}
+        self.__wall = self._render_tile(Color.WALL)
+
+        self.__grid_lines = self._render_grid_lines() if size >= MIN_BORDER_SIZE else None
+        self.__chunks.clear()
+
+    def _render_tile(self, color):
+        """
+        Render a single tile with the given fill color.
+
+        :param color: rgb tuple of the fill color
+        :return: pygame Surface of the size of one tile
+        """
+        size = self.__tile_size
+        # use the pixel format of the screen, so blitting the tile needs no conversion
+        tile = pg.Surface((size, size), 0, self.__screen)
+        if size >= MIN_BORDER_SIZE:
+            tile.fill(Color.BOX_BORDER)
+            tile.fill(color, (1, 1, size - 2, size - 2))
+        else:
+            tile.fill(color)
+        return tile
+
+    def _render_grid_lines(self):
+        """
+        Render the borders of every tile in a chunk to a single surface, where the inside of the tiles is transparent.
+
+        :return: pygame Surface of the size of a chunk
+        """
+        size = self.__tile_size
+
+        # a pixel is part of a border if it lies in the outermost row or column of its tile
+        border = np.arange(self.__chunk_tiles * size) % size
+        border = (border == 0) | (border == size - 1)
+
+        # surfarray arrays are indexed [x, y]
+        transparent = (255, 0, 255) if Color.BOX_BORDER != (255, 0, 255) else (0, 255, 0)
+        pixels = np.empty((len(border), len(border), 3), dtype=np.uint8)
+        pixels[:] = transparent
+        pixels[border[:, None] | border[None, :]] = Color.BOX_BORDER
+
+        grid_lines = pg.surfarray.make_surface(pixels).convert(self.__screen)
+        grid_lines.set_colorkey(transparent)
+        return grid_lines
+
+    def _render_chunk(self, key):
+        """
+        Render every tile of a chunk. Rather than drawing the tiles one by one, the color codes are mapped through the
+        palette to an image with one pixel per tile, which is scaled up to the size of the chunk and covered by the
+        pre-rendered tile borders.
+
+        :param key: tuple on the form (column, row) of the chunk
+        :return: pygame Surface
+        """
+        grid, n, size = self.__grid, self.__chunk_tiles, self.__tile_size
+        x0, y0 = key[0] * n, key[1] * n
+        x1, y1 = min(x0 + n, grid.box_width), min(y0 + n, grid.box_height)
+
+        # view the color buffer as unsigned bytes, surfarray arrays are indexed [x, y]
+        codes = grid.get_view().view(np.uint8).reshape(grid.box_height, grid.box_width)[y0:y1, x0:x1]
+        pixels = self.__palette[codes.T]
+
+        # the start and end tiles may currently hold other color codes, see _get_tile
+        for i, code in ((grid.start_idx, -1), (grid.end_idx, -2)):
+            x, y = i % grid.box_width, i // grid.box_width
+            if x0 <= x < x1 and y0 <= y < y1:
+                pixels[x - x0, y - y0] = Color.colors[code]
+
+        chunk = pg.surfarray.make_surface(pixels)
+        if size > 1:
+            chunk = pg.transform.scale(chunk, ((x1 - x0) * size, (y1 - y0) * size))
+        chunk = chunk.convert(self.__screen)
+
+        if self.__grid_lines is not None:
+            chunk.blit(self.__grid_lines, (0, 0))
+        return chunk
+
+    def _get_chunk(self, key):
+        """
+        Get the rendered surface of a chunk, rendering it if it is not cached.
+
+        :param key: tuple on the form (column, row) of the chunk
+        :return: pygame Surface
+        """
+        chunks = self.__chunks
+        chunk = chunks.get(key)
+        if chunk is None:
+            chunk = chunks[key] = self._render_chunk(key)
+            if len(chunks) > MAX_CHUNKS:
+                chunks.popitem(last=False)
+        else:
+            chunks.move_to_end(key)
+        return chunk
+
+    def _get_chunk_pos(self, key):
+        """
+        Get the screen position of a chunk, which may lie partly outside the view.
+
+        :param key: tuple on the form (column, row) of the chunk
+        :return: tuple on the form (x, y)
+        """
+        viewport, span = self.__viewport, self.__chunk_tiles * self.__tile_size
+        return viewport.rect.x + key[0] * span - viewport.x, viewport.rect.y + key[1] * span - viewport.y
+
+    def _get_visible_chunks(self):
+        """
+        Get the chunks that are at least partly visible.
+
+        :return: list of tuples on the form (column, row)
+        """
+        n = self.__chunk_tiles
+        x0, y0, x1, y1 = self.__viewport.get_visible_tiles()
+        return [(cx, cy) for cy in range(y0 // n, (y1 - 1) // n + 1) for cx in range(x0 // n, (x1 - 1) // n + 1)]
+
+    def _get_tile(self, i):
+        """
+        Get the surface to draw for a tile. The start and end tiles are always drawn in their own color, even while an
+        algorithm temporarily uses them as ordinary tiles.
+
+        :param i: index of the tile
+        :return: pygame Surface
+        """
+        if i == self.__grid.start_idx:
+            return self.__tiles[-1]
+        if i == self.__grid.end_idx:
+            return self.__tiles[-2]
+        return self.__tiles.get(self.__grid.colors[i], self.__wall)
+
+    def _blit_to_view(self, blits):
+        """
+        Blit surfaces to the screen, cut off at the edges of the view.
+
+        :param blits: list of tuples on the form (surface, position)
+        :return: None
+        """
+        screen = self.__screen
+        clip = screen.get_clip()
+        screen.set_clip(self.__viewport.rect)
+        for rect in screen.blits(blits):
+            if rect.width and rect.height:
+                dirty_rects.add(rect)
+        screen.set_clip(clip)
+
+    def draw(self, i):
+        """
+        Draw a single tile to the screen.
+
+        :param i: index of the tile
+        :return: None
+        """
+        self.draw_tiles((i,))
+
+    def draw_tiles(self, indexes):
+        """
+        Draw a collection of tiles to the screen. Up to BATCH_TILES tiles are blitted one by one to the screen and the
+        cached chunks, more tiles invalidate the chunks they lie in, and the visible ones are rendered again.
+
+        :param indexes: collection of tile indexes
+        :return: None
+        """
+        if self.__tile_size != self.__viewport.tile_size:
+            self.draw_view()
+            return
+
+        w, n, size = self.__grid.box_width, self.__chunk_tiles, self.__tile_size
+        if len(indexes) > BATCH_TILES:
+            indexes = np.asarray(indexes if isinstance(indexes, np.ndarray) else list(indexes))
+            keys = set(zip(((indexes % w) // n).tolist(), ((indexes // w) // n).tolist()))
+            for key in keys:
+                self.__chunks.pop(key, None)
+            self.draw_view(keys)
+            return
+
+        viewport, chunks = self.__viewport, self.__chunks
+        x0, y0, x1, y1 = viewport.get_visible_tiles()
+        blits = []
+        for i in indexes:
+            tile = self._get_tile(i)
+            x, y = i % w, i // w
+            chunk = chunks.get((x // n, y // n))
+            if chunk is not None:
+                chunk.blit(tile, ((x % n) * size, (y % n) * size))
+            if x0 <= x < x1 and y0 <= y < y1:
+                blits.append((tile, viewport.get_pos(i)))
+
+        if blits:
+            self._blit_to_view(blits)
+
+    def draw_view(self, keys=None):
+        """
+        Draw the visible part of the grid to the screen from the cached chunks, rendering the chunks that are missing.
+
+        :param keys: set of chunks to draw if they are visible, defaults to every visible chunk
+        :return: None
+        """
+        viewport = self.__viewport
+        if self.__tile_size != viewport.tile_size:
+            self._set_tile_size(viewport.tile_size)
+            keys = None
+
+        if keys is None:
+            # the area of the view not covered by the maze, when the maze is smaller than the view
+            width, height = viewport.get_maze_size()
+            if width < viewport.rect.width or height < viewport.rect.height:
+                self.__screen.fill(Color.BACKGROUND, viewport.rect)
+                dirty_rects.add(viewport.rect)
+
+        self._blit_to_view([(self._get_chunk(key), self._get_chunk_pos(key)) for key in self._get_visible_chunks()
+                            if keys is None or key in keys])
+
+    def draw_all(self):
+        """
+        Render the grid again from scratch, after most of its tiles changed.
+
+        :return: None
+        """
+        self.__chunks.clear()
+        self.draw_view()
@@ -0,0 +1,141 @@
+import pygame as pg
+
+# how much one step of the mouse wheel zooms in or out
+ZOOM_FACTOR = 1.25
+
+
+class Viewport:
+    def __init__(self, rect, box_width, box_height, tile_size, max_tile_size=64):
+        """
+        Initialize a new Viewport instance, the camera deciding which part of the maze is shown in the maze area of the
+        window. The maze is laid out in maze pixels, where tile i covers tile_size pixels in both directions starting
+        at (i % box_width * tile_size, i // box_width * tile_size), and the viewport shows the maze pixels from
+        (x, y) onwards. The number of tiles in the maze is independent of the size of the window.
+
+        :param rect: area of the screen the maze is drawn to, pygame Rect or rect-style tuple
+        :param box_width: number of columns in the maze
+        :param box_height: number of rows in the maze
+        :param tile_size: initial width/height of each tile in pixels
+        :param max_tile_size: largest tile size the user can zoom in to
+        """
+        self.rect = pg.Rect(rect)
+        self.box_width = box_width
+        self.box_height = box_height
+
+        # the user can zoom out until the entire maze fits in the view, or every tile is a single pixel
+        self.min_tile_size = max(1, min(self.rect.width // box_width, self.rect.height // box_height, tile_size))
+        self.max_tile_size = max(max_tile_size, tile_size)
+        self.tile_size = tile_size
+
+        # maze pixel shown in the top left corner of the view
+        self.x = 0
+        self.y = 0
+
+    def get_maze_size(self):
+        """
+        Get the size of the maze in pixels at the current tile size.
+
+        :return: tuple on the form (width, height)
+        """
+        return self.box_width * self.tile_size, self.box_height * self.tile_size
+
+    def _clamp(self):
+        """
+        Keep the view inside the maze. If the maze is smaller than the view it is shown in the top left corner.
+
+        :return: None
+        """
+        width, height = self.get_maze_size()
+        self.x = max(0, min(self.x, width - self.rect.width))
+        self.y = max(0, min(self.y, height - self.rect.height))
+
+    def scroll(self, dx, dy):
+        """
+        Move the view by a number of pixels.
+
+        :param dx: pixels to move right, negative to move left
+        :param dy: pixels to move down, negative to move up
+        :return: True if the view moved, False otherwise
+        """
+        old = self.x, self.y
+        self.x += int(dx)
+        self.y += int(dy)
+        self._clamp()
+        return (self.x, self.y) != old
+
+    def zoom(self, steps, pos=None):
+        """
+        Zoom in or out, keeping the maze pixel below pos in place.
+
+        :param steps: number of zoom steps, positive to zoom in and negative to zoom out
+        :param pos: screen position (x,y) to zoom towards, defaults to the center of the view
+        :return: True if the tile size changed, False otherwise
+        """
+        tile_size = self.tile_size
+        for _ in range(abs(steps)):
+            # every step changes the tile size by at least one pixel, so small tiles do not get stuck
+            if steps > 0:
+                tile_size = max(tile_size + 1, round(tile_size * ZOOM_FACTOR))
+            else:
+                tile_size = min(tile_size - 1, round(tile_size / ZOOM_FACTOR))
+        tile_size = max(self.min_tile_size, min(tile_size, self.max_tile_size))
+
+        if tile_size == self.tile_size:
+            return False
+
+        px, py = (pos[0] - self.rect.x, pos[1] - self.rect.y) if pos else (self.rect.width // 2, self.rect.height // 2)
+        scale = tile_size / self.tile_size
+        self.x = round((self.x + px) * scale) - px
+        self.y = round((self.y + py) * scale) - py
+        self.tile_size = tile_size
+        self._clamp()
+        return True
+
+    def get_idx_by_pos(self, pos):
+        """
+        Get the index of the tile at a screen position.
+
+        :param pos: screen position on the form (x,y)
+        :return: index of the tile, None if the position is outside the view or the maze
+        """
+        if not self.rect.collidepoint(pos):
+            return None
+        return self.get_idx_by_offset_pos(pos[0] - self.rect.x, pos[1] - self.rect.y)
+
+    def get_idx_by_offset_pos(self, x, y):
+        """
+        Get the index of the tile at a position relative to the top left corner of the view.
+
+        :param x: x coordinate relative to the view
+        :param y: y coordinate relative to the view
+        :return: index of the tile, None if the position is outside the view or the maze
+        """
+        if x < 0 or x >= self.rect.width or y < 0 or y >= self.rect.height:
+            return None
+        x = (self.x + x) // self.tile_size
+        y = (self.y + y) // self.tile_size
+        if x >= self.box_width or y >= self.box_height:
+            return None
+        return self.box_width * y + x
+
+    def get_pos(self, i):
+        """
+        Get the screen position of a tile, which may lie outside the view.
+
+        :param i: index of the tile
+        :return: tuple on the form (x, y)
+        """
+        return (self.rect.x + (i % self.box_width) * self.tile_size - self.x,
+                self.rect.y + (i // self.box_width) * self.tile_size - self.y)
+
+    def get_visible_tiles(self):
+        """
+        Get the columns and rows of the tiles that are at least partly visible.
+
+        :return: tuple on the form (x0, y0, x1, y1), the visible tiles are the columns x0 to x1 - 1 of the rows y0 to
+        y1 - 1
+        """
+        size = self.tile_size
+        return (self.x // size, self.y // size,
+                min(self.box_width, -(-(self.x + self.rect.width) // size)),
+                min(self.box_height, -(-(self.y + self.rect.height) // size)))
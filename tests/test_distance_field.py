@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+from core.benchmark.distance_field import bfs_distances
+from core.benchmark.mazes import cleared_maze, generated_maze, sketched_maze
+from core.maze.distance_field import distance_field
+from core.maze.solver import solve
+
+MAZES = [cleared_maze(31, 21), cleared_maze(2, 9)] + [sketched_maze(31, 21, seed) for seed in range(3)] + \
+        [generated_maze(31, 21, seed) for seed in range(3)]
+
+
+@pytest.mark.parametrize('grid', MAZES)
+def test_distance_field_matches_bfs(grid):
+    field = distance_field(grid)
+    assert field.tolist() == bfs_distances(grid, grid.start_idx).tolist()
+
+    # every tile on the shortest path is as far from the start as its position on the path
+    result = solve(grid, 'bfs')
+    if result.path:
+        assert field[result.path].tolist() == list(range(len(result.path)))
+    else:
+        assert field[grid.end_idx] == -1
+
+
+def test_distance_field_from_another_source():
+    grid = generated_maze(21, 15, 1)
+    assert np.array_equal(distance_field(grid, grid.end_idx), bfs_distances(grid, grid.end_idx))
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from core.benchmark.mazes import generated_maze, sketched_maze
+from core.maze.frontier import BucketFrontier, FifoFrontier, HeapFrontier
+from core.maze.solver import solve
+
+
+def drain(frontier):
+    """
+    Pop every item of a frontier.
+
+    :param frontier: frontier instance
+    :return: list of the items in the order they were popped
+    """
+    items = []
+    while frontier:
+        items.append(frontier.pop())
+    return items
+
+
+def test_fifo_frontier_ignores_priorities():
+    frontier = FifoFrontier()
+    for item, priority in ((1, 5), (2, 0), (3, 9)):
+        frontier.push(item, priority)
+    assert drain(frontier) == [1, 2, 3]
+
+
+@pytest.mark.parametrize('frontier_class', [HeapFrontier, BucketFrontier])
+def test_priority_frontiers_pop_in_order(frontier_class):
+    rng = random.Random(0)
+    pushed = [(rng.randrange(20), item) for item in range(200)]
+    frontier = frontier_class()
+    for priority, item in pushed:
+        frontier.push(item, priority)
+
+    # items with equal priority come out in the order they were pushed
+    assert drain(frontier) == [item for _, item in sorted(pushed)]
+
+
+def test_bucket_frontier_accepts_lower_priorities():
+    frontier = BucketFrontier()
+    frontier.push(1, 4)
+    assert frontier.pop() == 1
+    frontier.push(2, 6)
+    frontier.push(3, 2)
+    assert drain(frontier) == [3, 2]
+    with pytest.raises(IndexError):
+        frontier.pop()
+
+
+@pytest.mark.parametrize('grid', [generated_maze(31, 21, seed) for seed in range(3)] +
+                         [sketched_maze(31, 21, seed) for seed in range(3)])
+def test_solvers_find_the_same_path_length_with_every_frontier(grid):
+    length = solve(grid, 'bfs').path_length
+    for algorithm in ('bfs', 'bi_bfs', 'a_star'):
+        for frontier in (HeapFrontier, BucketFrontier):
+            assert solve(grid, algorithm, frontier=frontier).path_length == length
@@ -0,0 +1,37 @@
+import pytest
+
+from core.benchmark.mazes import cleared_maze, sketched_maze, generated_maze
+from core.maze.frontier import FifoFrontier, HeapFrontier
+from core.maze.solver import solve
+
+MAZES = [cleared_maze(31, 21)] + [sketched_maze(31, 21, seed) for seed in range(5)] + \
+        [generated_maze(31, 21, seed, algorithm) for seed in range(5) for algorithm in ('dfs', 'prim')]
+
+
+def assert_walkable(grid, path):
+    """
+    Check that a path goes from start to end over open tiles, one step at a time.
+
+    :param grid: Grid instance
+    :param path: list of tile indexes
+    :return: None
+    """
+    assert path[0] == grid.start_idx and path[-1] == grid.end_idx
+    for a, b in zip(path, path[1:]):
+        assert abs(a - b) in (1, grid.box_width) and abs(a % grid.box_width - b % grid.box_width) <= 1
+        assert grid.colors[b] != 1
+
+
+@pytest.mark.parametrize('grid', MAZES)
+def test_jps_finds_shortest_paths(grid):
+    a_star = solve(grid, 'a_star')
+    for frontier in (None, HeapFrontier):
+        jps = solve(grid, 'jps', frontier=frontier)
+        assert jps.path_length == a_star.path_length
+        if jps.path:
+            assert_walkable(grid, jps.path)
+
+
+def test_jps_rejects_fifo_frontier():
+    with pytest.raises(ValueError):
+        solve(MAZES[0], 'jps', frontier=FifoFrontier)
@@ -0,0 +1,40 @@
+import numpy as np
+
+from core.maze.keyframes import PAGE_TILES, KeyframeCache
+from tests.test_trace import record_search
+
+
+def test_restore_shares_unchanged_pages():
+    colors = np.zeros(3 * PAGE_TILES, dtype=np.int8)
+    keyframes = KeyframeCache(len(colors))
+    keyframes.add(0, colors)
+    colors[PAGE_TILES + 5] = 4
+    keyframes.add(10, colors)
+
+    # only the changed page is stored again
+    assert keyframes.nbytes == 4 * PAGE_TILES
+    restored = np.ones(len(colors), dtype=np.int8)
+    keyframes.restore(0, restored)
+    assert not restored.any()
+    keyframes.restore(10, restored)
+    assert np.array_equal(restored, colors)
+    assert keyframes.nearest(5) == (0, 10) and keyframes.nearest(10) == (10, 10) and keyframes.nearest(11) == (10, None)
+
+
+def test_least_recently_used_keyframes_are_dropped():
+    keyframes = KeyframeCache(PAGE_TILES, max_bytes=2 * PAGE_TILES)
+    for position in range(4):
+        keyframes.add(position, np.full(PAGE_TILES, position, dtype=np.int8))
+
+    assert len(keyframes) == 2 and 0 not in keyframes and 3 in keyframes
+    assert keyframes.nbytes <= 2 * PAGE_TILES
+
+
+def test_seek_from_keyframes_matches_the_run():
+    trace, states = record_search()
+    # the recorder takes keyframes every few blocks, the seeks restore them
+    assert len(trace.keyframes) > 1
+    trace.bind()
+    for position in list(range(len(trace), -1, -7)) + list(range(0, len(trace) + 1, 11)):
+        trace.seek(position)
+        assert np.array_equal(trace.grid.get_view(), states[position])
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from core.maze.grid import Grid
+from core.maze.maze_builder import GENERATORS, MazeBuilder
+from tests.test_maze_file import assert_perfect
+
+SIZES = [(21, 15), (20, 14)]
+
+
+def generated(box_width, box_height, seed, algorithm):
+    """
+    Generate a maze tile by tile, and apply the carved tiles to a grid filled with walls like the gui does.
+
+    :return: Grid instance
+    """
+    maze_builder = MazeBuilder(box_width, box_height, seed)
+    grid = Grid(box_width, box_height)
+    grid.fill(1)
+    grid.set_endpoints(maze_builder.get_maze().start_idx, maze_builder.get_maze().end_idx)
+    for idx, _ in maze_builder.generate(algorithm):
+        grid.colors[idx] = 0
+    return grid
+
+
+@pytest.mark.parametrize('algorithm', GENERATORS)
+@pytest.mark.parametrize('size', SIZES)
+def test_generate_matches_build(size, algorithm):
+    for seed in range(3):
+        built = MazeBuilder(*size, seed).build(algorithm).get_view()
+        assert np.array_equal(generated(*size, seed, algorithm).get_view(), built)
+        assert np.array_equal(MazeBuilder(*size, seed).build(algorithm).get_view(), built)
+
+
+@pytest.mark.parametrize('algorithm', GENERATORS)
+def test_seeds_give_different_mazes(algorithm):
+    mazes = {MazeBuilder(21, 15, seed).build(algorithm).get_view().tobytes() for seed in range(5)}
+    assert len(mazes) == 5
+
+
+def test_only_the_first_maze_has_the_seed():
+    maze_builder = MazeBuilder(21, 15, 7)
+    first = maze_builder.build().get_view().copy()
+    assert maze_builder.maze_seed == 7
+    second = maze_builder.build().get_view()
+    assert maze_builder.maze_seed is None and not np.array_equal(first, second)
+
+
+@pytest.mark.parametrize('algorithm', ['kruskal', 'prim', 'eller'])
+def test_generators_build_perfect_mazes(algorithm):
+    # the endpoints are placed in the middle row, which is a row of cells when half the height is even
+    for seed in range(5):
+        assert_perfect(MazeBuilder(21, 17, seed).build(algorithm))
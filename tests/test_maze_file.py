@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from core.maze.distance_field import distance_field
+from core.maze.generators import connect_endpoints, eller_rows
+from core.maze.grid import Grid
+from core.maze.maze_builder import MazeBuilder
+from core.maze.maze_file import BITMAP, COLORS, MazeHeader, open_maze, save_maze, write_maze_rows
+
+SIZES = [(21, 15), (20, 15), (21, 14), (20, 14)]
+
+
+def reference_maze(box_width, box_height, seed, start_idx, end_idx):
+    """
+    Build the maze of eller_rows in memory, with its endpoints connected by connect_endpoints.
+
+    :return: Grid instance
+    """
+    rows = eller_rows(box_width, box_height, np.random.default_rng(seed))
+    grid = Grid(box_width, box_height)
+    grid.get_view()[:] = np.frombuffer(b''.join(rows), dtype=np.int8)
+    grid.set_endpoints(start_idx, end_idx)
+    for _ in connect_endpoints(grid):
+        pass
+    return grid
+
+
+def assert_perfect(grid):
+    """
+    Check that the open tiles of a maze form a tree: they are all connected, with one path between any two of them.
+
+    :param grid: Grid instance
+    :return: None
+    """
+    tiles = grid.get_view().reshape(grid.box_height, grid.box_width) != 1
+    edges = (tiles[:, 1:] & tiles[:, :-1]).sum() + (tiles[1:] & tiles[:-1]).sum()
+    assert edges == tiles.sum() - 1
+    assert (distance_field(grid) >= 0).sum() == tiles.sum()
+
+
+@pytest.mark.parametrize('encoding', [COLORS, BITMAP])
+def test_save_and_open(tmp_path, encoding):
+    grid = MazeBuilder(21, 15, 4).build('kruskal')
+    save_maze(tmp_path / 'maze.avm', grid, 4, encoding)
+    opened, header = open_maze(tmp_path / 'maze.avm')
+
+    assert (header.seed, header.start_idx, header.end_idx) == (4, grid.start_idx, grid.end_idx)
+    assert np.array_equal(opened.get_view() == 1, grid.get_view() == 1)
+    assert (opened.colors[opened.start_idx], opened.colors[opened.end_idx]) == (-1, -2)
+
+
+@pytest.mark.parametrize('encoding', [COLORS, BITMAP])
+@pytest.mark.parametrize('size', SIZES)
+def test_streamed_maze_matches_connect_endpoints(tmp_path, size, encoding):
+    w, h = size
+    # the endpoints of the gui, at both ends of the middle row, and at the ends of two neighbouring rows
+    for start_idx, end_idx in ((h // 2 * w, h // 2 * w + w - 1), (h // 2 * w, h // 2 * w - 1)):
+        for seed in range(3):
+            header = MazeHeader(w, h, start_idx, end_idx, seed, encoding)
+            write_maze_rows(tmp_path / 'maze.avm', header, eller_rows(w, h, np.random.default_rng(seed)))
+            opened, _ = open_maze(tmp_path / 'maze.avm')
+            reference = reference_maze(w, h, seed, start_idx, end_idx)
+
+            assert np.array_equal(opened.get_view() == 1, reference.get_view() == 1)
+            # with an even number of columns the end tile lies in the wall column, and connect_endpoints carves a
+            # passage along its row
+            if w % 2:
+                assert_perfect(opened)
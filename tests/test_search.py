@@ -0,0 +1,42 @@
+import pytest
+
+from core.benchmark.mazes import generated_maze, sketched_maze
+from core.maze.a_star import AStar
+from core.maze.bfs import BFS
+from core.maze.maze_builder import MazeBuilder
+
+MAZES = [generated_maze(31, 21, seed) for seed in range(3)] + [sketched_maze(31, 21, seed) for seed in range(3)]
+
+
+def solvers(grid):
+    """
+    Get the fast and the animated search of every solver.
+
+    :param grid: Grid instance
+    :return: list of tuples on the form (search, animated search)
+    """
+    args = (grid.start_idx, grid.end_idx, grid.size, grid.box_height, grid.box_width)
+    bfs, a_star = BFS(*args), AStar(*args)
+    return [(bfs.search_shortest_path, bfs.bfs_shortest_path), (bfs.search_bidirectional, bfs.bidirectional_bfs),
+            (a_star.search, a_star.a_star)]
+
+
+@pytest.mark.parametrize('grid', MAZES)
+def test_fast_search_matches_animated_search(grid):
+    lengths = set()
+    for search, animated in solvers(grid):
+        trace = []
+        path, _ = search(grid.colors, trace)
+        assert list(animated(grid)) == trace
+        lengths.add(len(path))
+
+    # every solver finds a shortest path
+    assert len(lengths) == 1
+
+
+def test_search_does_not_change_the_maze():
+    grid = MazeBuilder(31, 21, 2).build()
+    colors = bytes(grid.colors)
+    for search, _ in solvers(grid):
+        search(grid.colors)
+    assert bytes(grid.colors) == colors
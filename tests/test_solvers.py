@@ -0,0 +1,17 @@
+from core.benchmark.solvers import FIELDS, benchmark_maze, run
+from core.maze.solver import ALGORITHMS
+
+
+def test_algorithms_agree_on_the_path_length():
+    for seed in range(3):
+        rows = benchmark_maze(31, 21, 'dfs', seed, list(ALGORITHMS))
+        assert [row['algorithm'] for row in rows] == list(ALGORITHMS)
+        assert len({row['path_length'] for row in rows}) == 1
+
+
+def test_run_collects_a_row_per_maze_and_algorithm():
+    rows = run([(21, 15), (31, 21)], 2, ['bfs', 'a_star'], workers=2)
+    assert len(rows) == 2 * 2 * 2
+    assert all(set(row) == set(FIELDS) for row in rows)
+    assert [(row['box_width'], row['seed'], row['algorithm']) for row in rows] == \
+           [(w, seed, algorithm) for w in (21, 31) for seed in range(2) for algorithm in ('bfs', 'a_star')]
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from core.maze.bfs import BFS
+from core.maze.maze_builder import MazeBuilder
+from core.maze.trace import BLOCK, HEADER, MAZE, TraceFileError, TraceRecorder, open_trace
+
+
+def record_search(block_events=16):
+    """
+    Solve a small maze with BFS while recording it.
+
+    :param block_events: number of events per block of the trace
+    :return: tuple on the form (trace, list of the colors of the grid after every event)
+    """
+    maze_builder = MazeBuilder(21, 15, 3)
+    grid = maze_builder.build('dfs')
+    recorder = TraceRecorder(grid, 'bfs', block_events=block_events)
+    # the search only yields its events, they are applied like the gui does
+    view = grid.get_view()
+    states = [view.copy()]
+    for idx, color in recorder.record(BFS(*maze_builder.export_maze()).bfs_shortest_path(grid)):
+        view[idx] = color
+        states.append(view.copy())
+    return recorder.get_trace(), states
+
+
+def test_replay_matches_the_run():
+    trace, states = record_search()
+    assert len(trace) == len(states) - 1
+    trace.bind()
+    for position in range(1, len(trace) + 1):
+        trace.step(1)
+        assert np.array_equal(trace.grid.get_view(), states[position])
+
+
+def test_seek_matches_the_run(tmp_path):
+    trace, states = record_search()
+    trace.save(tmp_path / 'bfs.avt')
+    trace = open_trace(tmp_path / 'bfs.avt')
+    trace.bind()
+    rng = np.random.default_rng(0)
+    for position in rng.integers(0, len(trace) + 1, 50):
+        trace.seek(position)
+        assert np.array_equal(trace.grid.get_view(), states[position])
+
+
+def test_maze_trace_round_trip(tmp_path):
+    maze_builder = MazeBuilder(21, 15, 5)
+    recorder = TraceRecorder(maze_builder.get_maze(), 'prim', MAZE, 5, block_events=16)
+    for _ in recorder.record(maze_builder.generate('prim')):
+        pass
+    recorder.get_trace().save(tmp_path / 'prim.avt')
+
+    trace = open_trace(tmp_path / 'prim.avt')
+    assert trace.header.seed == 5
+    trace.bind()
+    trace.seek(len(trace))
+    assert np.array_equal(trace.grid.get_view(), MazeBuilder(21, 15, 5).build('prim').get_view())
+
+
+def damage(tmp_path, change):
+    """
+    Save a trace, change the bytes of the file, and open it again.
+
+    :param tmp_path: directory to save the trace to
+    :param change: function changing the bytearray of the file, given the offset of the block index and the data
+    :return: None
+    """
+    trace, _ = record_search()
+    trace.save(tmp_path / 'bfs.avt')
+    data = bytearray((tmp_path / 'bfs.avt').read_bytes())
+    blocks_start = HEADER.size + (trace.header.size + 7) // 8
+    change(data, blocks_start, blocks_start + trace.header.blocks * BLOCK.size)
+    (tmp_path / 'bfs.avt').write_bytes(data)
+    open_trace(tmp_path / 'bfs.avt')
+
+
+def test_truncated_trace_is_rejected(tmp_path):
+    def truncate(data, blocks_start, data_start):
+        del data[-3:]
+
+    with pytest.raises(TraceFileError):
+        damage(tmp_path, truncate)
+
+
+def test_damaged_block_index_is_rejected(tmp_path):
+    def swap_offsets(data, blocks_start, data_start):
+        data[blocks_start + BLOCK.size:blocks_start + 2 * BLOCK.size] = BLOCK.pack(10 ** 6, 0)
+
+    with pytest.raises(TraceFileError):
+        damage(tmp_path, swap_offsets)
+
+
+def test_events_outside_of_the_maze_are_rejected(tmp_path):
+    def move_first_event(data, blocks_start, data_start):
+        # a large delta moves the first event of the first block outside of the maze
+        data[data_start:data_start + 1] = b'\x80\xff\x7f'
+
+    with pytest.raises(TraceFileError):
+        damage(tmp_path, move_first_event)